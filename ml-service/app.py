@@ -1,46 +1,76 @@
 # =====================================================
 # QUIET LOGGING (NO JSON / NO ACCESS SPAM)
 # =====================================================
-import pandas as pd
+import asyncio
 import logging
 import os
-import io
+import shutil
+import tempfile
+import time
+import warnings
 import numpy as np
 import joblib
-from PIL import Image
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from contextlib import asynccontextmanager
+from typing import Any
+from fastapi import FastAPI, HTTPException, UploadFile, File, Body, Request, Header, Query, WebSocket
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, ValidationError
+
+from artifacts import current_export, export_kind, load_export
+from batching import MicroBatcher
+from bulk_score import CHUNK_ROWS, detect_format, feature_columns, iter_chunks, score_frame
+from drift import DriftMonitor
+from ecg_backend import build_backend
+from ecg_preprocess import (
+    MAX_UPLOAD_BYTES, BatchBuffer, ImageTooLarge, InvalidImage, StageStats,
+    decode_ecg_image, read_upload, render_signal, server_timing
+)
+from ecg_stream import FrameError, StreamTotals, serve_stream
+from explain import explanations
+from executors import ModelExecutor, Overloaded, DeadlineExceeded, deadline_from
+from inference import TabularModel, is_positive_label
+from log_pipeline import AuditLog, setup_logging
+from memory import MMAP_ENABLED, flat_cache_path, load_artifact
+from metrics import CONTENT_TYPE, METRICS, MODEL_SECONDS, MetricsMiddleware
+from prediction_cache import PredictionCache, cache_key
+from registry import ModelRegistry, artifact_version
+from shadow import ShadowEvaluator, defer_shadow, flush_shadow
+from symptoms import SymptomIndex, load_aliases, top_k
+from tree_engine import FlatForest, compile_trees
+from wire_formats import (
+    OPENAPI_EXTRA, MalformedBody, NegotiatedRoute, binary_body, decode_columns,
+    encode_response, record_values, response_format, validate_columns
+)
 
 # Silence uvicorn noise
 logging.getLogger("uvicorn.access").disabled = True
 logging.getLogger("uvicorn.error").setLevel(logging.ERROR)
 
-# Log ONLY real errors to file
-logging.basicConfig(
-    filename="medhive_errors.log",
-    level=logging.ERROR,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+# Log ONLY real errors to file, off the request path (see log_pipeline.py)
+LOGS = setup_logging("medhive_errors.log")
 
 print("🚀 MedHive backend starting (quiet mode)")
 
-# =====================================================
-# OPTIONAL TENSORFLOW (ECG)
-# =====================================================
-try:
-    from tensorflow.keras.models import load_model
-    from tensorflow.keras.preprocessing import image
-    TF_AVAILABLE = True
-except Exception:
-    TF_AVAILABLE = False
-    load_model = None
-    image = None
-
 # =====================================================
 # APP INIT
 # =====================================================
-app = FastAPI(title="MedHive AI Service")
+# Models load lazily on first use; MEDHIVE_WARMUP=1 (default) also loads
+# them in a background thread once the server is accepting connections.
+@asynccontextmanager
+async def lifespan(app):
+    if os.getenv("MEDHIVE_WARMUP", "1") == "1":
+        MODELS.warm_up()
+    # MEDHIVE_WATCH_MODELS=1 hot-reloads artifacts replaced in MODEL_DIR
+    if os.getenv("MEDHIVE_WATCH_MODELS", "0") == "1":
+        MODELS.watch(float(os.getenv("MEDHIVE_WATCH_INTERVAL_S", "2")))
+    yield
+
+app = FastAPI(title="MedHive AI Service", lifespan=lifespan)
+# Every route below is timed per stage and may take binary bodies
+# (wire_formats.py); must be set before routes are added
+app.router.route_class = NegotiatedRoute
+app.add_middleware(MetricsMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -64,9 +94,36 @@ print(f"📂 Models directory: {MODEL_DIR}")
 # =====================================================
 # SAFE MODEL LOADER
 # =====================================================
+# Tree ensembles run on the array-backed engine (tree_engine.py);
+# MEDHIVE_TREE_ENGINE=native keeps the plain sklearn estimator.
+TREE_ENGINE = os.getenv("MEDHIVE_TREE_ENGINE", "flat")
+
+def load_model_file(path):
+    # Pickle-free exports (see artifacts.py) win when they match the pickle;
+    # the native tree engine still needs the sklearn estimator itself
+    export = current_export(path)
+    if export is not None and (TREE_ENGINE == "flat" or export_kind(export) != "flat_forest"):
+        return load_export(export, mmap=MMAP_ENABLED)
+
+    # MEDHIVE_MMAP_MODELS=1 shares model arrays across workers (see memory.py)
+    version = artifact_version(path) if MMAP_ENABLED else None
+    flat_dir = flat_cache_path(path, version)
+    if MMAP_ENABLED and TREE_ENGINE == "flat" and os.path.isdir(flat_dir):
+        return FlatForest.load(flat_dir)
+
+    model = load_artifact(path, version)
+    if TREE_ENGINE != "flat":
+        return model
+
+    model = compile_trees(model)
+    if MMAP_ENABLED and isinstance(model, FlatForest):
+        model = FlatForest.load(model.save(flat_dir))
+    return model
+
 def load_model_safe(name):
+    path = os.path.join(MODEL_DIR, name)
     try:
-        model = joblib.load(os.path.join(MODEL_DIR, name))
+        model = load_model_file(path)
         print(f"✅ Loaded {name}")
         return model
     except Exception:
@@ -75,30 +132,209 @@ def load_model_safe(name):
         return None
 
 # =====================================================
-# LOAD MODELS
+# MODEL REGISTRY (see registry.py)
 # =====================================================
-symptom_model   = load_model_safe("disease_prediction_model.pkl")
-heart_model     = load_model_safe("heart_model.pkl")
-diabetes_model  = load_model_safe("diabetes_model_cleaned.pkl")
-liver_model     = load_model_safe("liver_model.pkl")
+# MEDHIVE_MODELS=heart,diabetes restricts which models this worker hosts
+HOSTED_MODELS = [n.strip() for n in os.getenv("MEDHIVE_MODELS", "").split(",") if n.strip()]
+if "symptom" in HOSTED_MODELS:
+    HOSTED_MODELS.append("symptom_columns")
+MODELS = ModelRegistry(hosted=HOSTED_MODELS or None)
 
-try:
-    symptom_columns = joblib.load(os.path.join(MODEL_DIR, "symptom_columns.pkl"))
-except Exception:
-    symptom_columns = []
+def load_tabular(name, filename, features):
+    model = load_model_safe(filename)
+    if model is None:
+        return None
+    # Checks the column order once and strips names (see inference.py)
+    runner = TabularModel(name, model, features)
+    runner.calibrate(np.zeros((1, getattr(model, "n_features_in_", 1))))
+    return runner
 
-# ECG
-ecg_model = None
-if TF_AVAILABLE:
-    try:
-        ecg_model = load_model(
-            os.path.join(MODEL_DIR, "ecg_heart_model_final.keras"),
-            compile=False
+def load_symptom_columns():
+    # Indexed once here so /predict never rescans the vocabulary
+    path = os.path.join(MODEL_DIR, "symptom_columns.pkl")
+    export = current_export(path)
+    columns = load_export(export) if export else joblib.load(path)
+    return SymptomIndex(columns, load_aliases(os.path.join(MODEL_DIR, "symptom_aliases.json")))
+
+def load_ecg_model():
+    # TensorFlow is only imported by workers that actually serve ECG
+    from tensorflow.keras.models import load_model
+
+    path = os.path.join(MODEL_DIR, "ecg_heart_model_final.keras")
+    model = load_model(path, compile=False)
+    print("✅ ECG model loaded")
+    # MEDHIVE_ECG_BACKEND=tflite|tflite-int8|xla (see ecg_backend.py)
+    return build_backend(model, path, artifact_version(path))
+
+# Canned inputs (from test_models.py) run through every freshly loaded
+# model before it starts serving, so a reload never hands a cold or
+# broken model to real traffic.
+WARM_INPUTS = {
+    "heart": [70, 1, 0, 160, 300, 1, 1, 100, 1, 3.0, 1, 2, 3],
+    "diabetes": [6, 148, 72, 35, 0, 33.6, 0.627, 50],
+    "liver": [52, 1, 2.4, 1.1, 230, 72, 68, 6.1, 3.0, 0.8],
+}
+
+def warm_tabular(name):
+    def warm(runner):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            runner.model.predict_proba(np.array([WARM_INPUTS[name]], dtype=float))
+    return warm
+
+def warm_ecg(model):
+    model.predict_on_batch(np.zeros((1, 224, 224, 3), dtype=np.float32))
+
+def model_path(filename):
+    return os.path.join(MODEL_DIR, filename)
+
+MODELS.register(
+    "symptom", lambda: load_model_safe("disease_prediction_model.pkl"),
+    path=model_path("disease_prediction_model.pkl")
+)
+MODELS.register(
+    "symptom_columns", load_symptom_columns,
+    path=model_path("symptom_columns.pkl")
+)
+MODELS.register(
+    "heart", lambda: load_tabular("heart", "heart_model.pkl", HEART_FEATURES),
+    path=model_path("heart_model.pkl"), warm=warm_tabular("heart")
+)
+MODELS.register(
+    "diabetes", lambda: load_tabular("diabetes", "diabetes_model_cleaned.pkl", DIABETES_FEATURES),
+    path=model_path("diabetes_model_cleaned.pkl"), warm=warm_tabular("diabetes")
+)
+MODELS.register(
+    "liver", lambda: load_tabular("liver", "liver_model.pkl", LIVER_FEATURES),
+    path=model_path("liver_model.pkl"), warm=warm_tabular("liver")
+)
+MODELS.register(
+    "ecg", load_ecg_model,
+    path=model_path("ecg_heart_model_final.keras"), warm=warm_ecg
+)
+
+TABULAR = ["heart", "diabetes", "liver"]
+
+# =====================================================
+# EXECUTORS (see executors.py)
+# =====================================================
+# Per-model pools sized by MEDHIVE_<NAME>_WORKERS / MEDHIVE_<NAME>_QUEUE.
+# ECG image decoding can move to processes with MEDHIVE_ECG_PREPROCESS_PROCESSES=1.
+EXECUTORS = {
+    "symptom": ModelExecutor.from_env("symptom", workers=2, queue_size=32),
+    "heart": ModelExecutor.from_env("heart", workers=2, queue_size=32),
+    "diabetes": ModelExecutor.from_env("diabetes", workers=2, queue_size=32),
+    "liver": ModelExecutor.from_env("liver", workers=2, queue_size=32),
+    "ecg": ModelExecutor.from_env("ecg", workers=1, queue_size=0),
+    "bulk": ModelExecutor.from_env("bulk", workers=1, queue_size=2),
+    # Shadow scoring is best-effort: full means the job is dropped
+    "shadow": ModelExecutor.from_env("shadow", workers=1, queue_size=2),
+    "ecg-preprocess": ModelExecutor.from_env(
+        "ecg-preprocess", workers=2, queue_size=16,
+        processes=os.getenv("MEDHIVE_ECG_PREPROCESS_PROCESSES", "0") == "1"
+    ),
+}
+
+def request_deadline(request):
+    # Clients may shorten (never extend) the server timeout via header
+    if not hasattr(request.state, "deadline"):
+        try:
+            timeout_s = float(request.headers["x-request-timeout"])
+        except (KeyError, ValueError):
+            timeout_s = None
+        request.state.deadline = deadline_from(timeout_s)
+    return request.state.deadline
+
+def backpressure(exc):
+    if isinstance(exc, Overloaded):
+        return HTTPException(
+            503, f"{exc.name} is busy, retry shortly",
+            headers={"Retry-After": str(exc.retry_after)}
         )
-        print("✅ ECG model loaded")
-    except Exception:
-        logging.error("ECG model load failed", exc_info=True)
-        print("❌ ECG model failed (see medhive_errors.log)")
+    return HTTPException(504, "Request deadline exceeded")
+
+async def run_on(name, request, fn, *args):
+    try:
+        return await EXECUTORS[name].run(fn, *args, deadline=request_deadline(request))
+    except (Overloaded, DeadlineExceeded) as e:
+        raise backpressure(e)
+
+# =====================================================
+# PREDICTION CACHE (see prediction_cache.py)
+# =====================================================
+# Resubmitted forms and ECG images are answered from cache; identical
+# requests in flight at the same time run the model once.
+PREDICTIONS = PredictionCache.from_env()
+
+async def cached_predict(name, request, score, features, explain=False):
+    async def compute():
+        results = await run_on(name, request, score, [features])
+        return results[0]
+
+    key = cache_key(name, MODELS.entries[name].version, features)
+    result = await PREDICTIONS.get_or_compute(key, compute)
+    # Cache hits are live traffic too
+    DRIFT.observe(name, [features], [result.get("probability")])
+    defer_shadow(request.scope.setdefault("state", {}), SHADOWS.get(name), [features], [result])
+    if explain:
+        # Explanations are never cached; the shared result is not mutated
+        explained = await run_on(name, request, explain_rows, name, [features])
+        result = {**result, "explanation": explained[0]}
+    return result
+
+# =====================================================
+# SHADOW CANDIDATES (see shadow.py)
+# =====================================================
+# MEDHIVE_SHADOW_HEART=candidate.pkl (absolute or relative to MODEL_DIR)
+# also scores MEDHIVE_SHADOW_HEART_RATE (default 0.1) of heart requests
+# with the candidate, on the "shadow" executor once the response is out.
+# Same for DIABETES and LIVER. Results: GET /shadow.
+SHADOWS = {}
+
+def load_candidate(name, path):
+    features = {"heart": HEART_FEATURES, "diabetes": DIABETES_FEATURES, "liver": LIVER_FEATURES}[name]
+    return load_tabular(f"{name}-shadow", path, features)
+
+for _name in TABULAR:
+    _path = os.getenv(f"MEDHIVE_SHADOW_{_name.upper()}")
+    if not _path or (HOSTED_MODELS and _name not in HOSTED_MODELS):
+        continue
+    MODELS.register(
+        f"{_name}-shadow", lambda name=_name, path=_path: load_candidate(name, path),
+        path=model_path(_path), warm=warm_tabular(_name)
+    )
+    SHADOWS[_name] = ShadowEvaluator(
+        _name, lambda name=_name: MODELS.get(f"{name}-shadow"),
+        rate=float(os.getenv(f"MEDHIVE_SHADOW_{_name.upper()}_RATE", "0.1")),
+        executor=EXECUTORS["shadow"], source=_path
+    )
+
+@METRICS.on_request
+def run_shadows(route, scope, status, seconds):
+    # Runs after the response has been sent
+    if "state" in scope:
+        flush_shadow(scope["state"])
+
+# Concurrent ECG uploads share one forward pass (see batching.py)
+ECG_MAX_BATCH_SIZE = int(os.getenv("MEDHIVE_ECG_MAX_BATCH_SIZE", "16"))
+ECG_MAX_WAIT_MS = float(os.getenv("MEDHIVE_ECG_MAX_WAIT_MS", "5"))
+ECG_MAX_QUEUE = int(os.getenv("MEDHIVE_ECG_MAX_QUEUE", "64"))
+
+def ecg_forward(X):
+    return MODELS.get("ecg").predict_on_batch(X)[:, 0]
+
+ecg_batcher = MicroBatcher(
+    "ecg", ecg_forward,
+    max_batch_size=ECG_MAX_BATCH_SIZE,
+    max_wait_ms=ECG_MAX_WAIT_MS,
+    executor=EXECUTORS["ecg"].pool,
+    max_queue=ECG_MAX_QUEUE,
+    # uint8 images are scaled straight into one reusable float32 batch
+    collate=BatchBuffer(ECG_MAX_BATCH_SIZE).collate
+)
+
+# "render" is only set for signal windows streamed over /ws/ecg
+ECG_STAGES = StageStats(["read", "decode", "resize", "render", "wait", "normalize", "infer"])
 
 # =====================================================
 # SCHEMAS
@@ -106,7 +342,12 @@ if TF_AVAILABLE:
 class SymptomInput(BaseModel):
     symptoms: list[str]
 
-class HeartInput(BaseModel):
+# Python's JSON parser reads NaN / Infinity; reject them per record like
+# wire_formats.validate_columns does for Arrow / MessagePack bodies
+class ClinicalInput(BaseModel):
+    model_config = ConfigDict(allow_inf_nan=False)
+
+class HeartInput(ClinicalInput):
     age: int
     sex: int
     cp: int
@@ -121,7 +362,7 @@ class HeartInput(BaseModel):
     ca: int
     thal: int
 
-class DiabetesInput(BaseModel):
+class DiabetesInput(ClinicalInput):
     Pregnancies: int
     Glucose: int
     BloodPressure: int
@@ -131,7 +372,7 @@ class DiabetesInput(BaseModel):
     DiabetesPedigreeFunction: float
     Age: int
 
-class LiverInput(BaseModel):
+class LiverInput(ClinicalInput):
     age: int
     gender: int
     total_bilirubin: float
@@ -143,26 +384,150 @@ class LiverInput(BaseModel):
     albumin: float
     ag_ratio: float
 
+# =====================================================
+# INPUT DRIFT (see drift.py)
+# =====================================================
+# Every scored heart/diabetes/liver record (single, batch, /screen) feeds
+# per-field sketches; GET /drift compares them with the reference in
+# MEDHIVE_DRIFT_REFERENCE. Bulk backfills are not live traffic and are
+# left out.
+DRIFT_REFERENCE = os.getenv("MEDHIVE_DRIFT_REFERENCE", os.path.join(MODEL_DIR, "drift_reference.json"))
+DRIFT = DriftMonitor(DRIFT_REFERENCE)
+DRIFT.register("heart", HeartInput.model_fields,
+               categorical={"sex", "cp", "fbs", "restecg", "exang", "slope", "ca", "thal"})
+DRIFT.register("diabetes", DiabetesInput.model_fields)
+DRIFT.register("liver", LiverInput.model_fields, categorical={"gender"})
+
 # =====================================================
 # SAFE PREDICT (NO CRASH)
 # =====================================================
-def safe_predict(model, features):
+def safe_predict_batch(runner, rows):
+    if runner is None:
+        raise HTTPException(503, "Model not loaded")
     try:
-        X = np.array(features, dtype=float).reshape(1, -1)
-        pred = int(model.predict(X)[0])
+        labels, positive = runner.predict(runner.assemble(rows))
+        preds = [int(p) for p in labels]
     except Exception:
         logging.error("Prediction failed", exc_info=True)
         raise HTTPException(500, "Model prediction failed")
 
-    try:
-        if hasattr(model, "predict_proba"):
-            prob = float(model.predict_proba(X)[0][1]) * 100
-        else:
-            prob = 100.0 if pred == 1 else 0.0
-    except Exception:
-        prob = 100.0 if pred == 1 else 0.0
+    if positive is not None:
+        probs = [float(p) * 100 for p in positive]
+    else:
+        probs = [100.0 if p == 1 else 0.0 for p in preds]
+
+    return preds, [round(p, 2) for p in probs]
+
+# =====================================================
+# BATCH HELPERS
+# =====================================================
+# One request, one feature matrix, one model call. Records that fail
+# schema validation are reported in place instead of failing the batch.
+MAX_BATCH_SIZE = int(os.getenv("MEDHIVE_MAX_BATCH_SIZE", "1024"))
+
+def validation_errors(exc):
+    return [
+        {"loc": list(err["loc"]), "msg": err["msg"], "type": err["type"]}
+        for err in exc.errors()
+    ]
+
+def run_batch(name, request, records, schema, features, score, explain=False):
+    if len(records) > MAX_BATCH_SIZE:
+        raise HTTPException(413, f"Batch too large (max {MAX_BATCH_SIZE} records)")
+
+    results = [None] * len(records)
+    indices, rows = [], []
+
+    for i, record in enumerate(records):
+        try:
+            data = schema.model_validate(record)
+        except ValidationError as e:
+            results[i] = {"index": i, "error": validation_errors(e)}
+            continue
+        indices.append(i)
+        rows.append(features(data))
+
+    return finish_batch(name, request, results, indices, rows, score, explain)
+
+def finish_batch(name, request, results, indices, rows, score, explain=False):
+    if len(rows):
+        scored = score(rows)
+        if explain:
+            for result, explanation in zip(scored, explain_rows(name, rows)):
+                result["explanation"] = explanation
+        for i, result in zip(indices, scored):
+            results[i] = {"index": i, **result}
+        DRIFT.observe(name, rows, [result.get("probability") for result in scored])
+        defer_shadow(request.scope.setdefault("state", {}), SHADOWS.get(name), rows, scored)
+
+    return {
+        "count": len(results),
+        "succeeded": len(rows),
+        "failed": len(results) - len(rows),
+        "results": results,
+    }
+
+# =====================================================
+# EXPLANATIONS (see explain.py)
+# =====================================================
+# ?explain=true on the heart/diabetes/liver routes adds per-feature
+# contributions keyed by API field name, from the explainer each model
+# builds at load time. Computed after the (possibly cached) prediction on
+# the model's executor, and never cached themselves.
+EXPLAIN_FIELDS = {
+    "heart": list(HeartInput.model_fields),
+    "diabetes": list(DiabetesInput.model_fields),
+    "liver": list(LiverInput.model_fields),
+}
+
+def explain_rows(name, rows):
+    runner = MODELS.get(name)
+    if runner is None:
+        raise HTTPException(503, f"{name.capitalize()} model not loaded")
+    if runner.explainer is None:
+        raise HTTPException(501, f"No explanations for the {name} model")
+    return explanations(runner.explainer, runner.assemble(rows), EXPLAIN_FIELDS[name])
+
+# =====================================================
+# BINARY BODIES (see wire_formats.py)
+# =====================================================
+# Arrow IPC / MessagePack requests on the tabular routes: validated per
+# column and scored as one matrix; JSON requests never reach this code.
+def binary_batch(name, request, body, fmt, schema, score, explain=False):
+    n, columns = decode_columns(body, fmt, list(schema.model_fields))
+    if n > MAX_BATCH_SIZE:
+        raise HTTPException(413, f"Batch too large (max {MAX_BATCH_SIZE} records)")
+    X, errors = validate_columns(columns, schema, n)
 
-    return pred, round(prob, 2)
+    results = [None] * n
+    valid = np.ones(n, dtype=bool)
+    for i, err in errors.items():
+        results[i] = {"index": i, "error": err}
+        valid[i] = False
+    return finish_batch(name, request, results, np.flatnonzero(valid).tolist(), X[valid], score, explain)
+
+def binary_record(body, fmt, schema):
+    n, columns = decode_columns(body, fmt, list(schema.model_fields))
+    if n != 1:
+        raise MalformedBody(f"expected one record, got {n}")
+    X, errors = validate_columns(columns, schema, 1)
+    if errors:
+        raise HTTPException(422, [{**e, "loc": ["body", *e["loc"]]} for e in errors[0]])
+    return record_values(X[0], schema)
+
+def binary_route(name, schema, score, batch=False):
+    async def handler(request, fmt):
+        body = await request.body()
+        out = response_format(request.headers.get("accept"), fmt)
+        explain = request.query_params.get("explain", "").lower() in ("1", "true", "on", "yes")
+        if await MODELS.aget(name) is None:
+            raise HTTPException(503, f"{name.capitalize()} model not loaded")
+        if batch:
+            payload = await run_on(name, request, binary_batch, name, request, body, fmt, schema, score, explain)
+        else:
+            payload = await cached_predict(name, request, score, binary_record(body, fmt, schema), explain)
+        return encode_response(payload, out)
+    return binary_body(handler)
 
 # =====================================================
 # ROUTES
@@ -173,46 +538,224 @@ def root():
 
 @app.get("/health")
 def health():
+    status = MODELS.status()
+    return {
+        **{name: s["state"] == "ready" for name, s in status.items()},
+        "models": status,
+    }
+
+@app.get("/stats")
+def stats():
+    return {
+        "inference": {
+            name: MODELS.entries[name].value.snapshot()
+            for name in TABULAR if MODELS.state(name) == "ready"
+        },
+        "batchers": {
+            "ecg": ecg_batcher.snapshot(),
+        },
+        "ecg_stages": ECG_STAGES.snapshot(),
+        "ecg_streams": ECG_STREAMS.snapshot(),
+        "cache": PREDICTIONS.snapshot(),
+        "logging": LOGS.snapshot(),
+        "audit": AUDIT_LOG.snapshot(),
+        "executors": {
+            name: executor.snapshot() for name, executor in EXECUTORS.items()
+        },
+    }
+
+# =====================================================
+# PROMETHEUS METRICS (see metrics.py)
+# =====================================================
+# Request/stage histograms are recorded by MetricsMiddleware; everything
+# /stats already tracks is exported at scrape time by this collector.
+@METRICS.collector
+def service_metrics():
+    status = MODELS.status()
+    executors = {name: executor.snapshot() for name, executor in EXECUTORS.items()}
+    batcher = ecg_batcher.snapshot()
+    cache = PREDICTIONS.snapshot()
+    streams = ECG_STREAMS.snapshot()
+    inference = {
+        name: MODELS.entries[name].value.snapshot()
+        for name in TABULAR if MODELS.state(name) == "ready"
+    }
+    return [
+        ("medhive_model_ready", "gauge", "1 if the model is loaded",
+         [({"model": name}, s["state"] == "ready") for name, s in status.items()]),
+        ("medhive_model_load_seconds", "gauge", "Time the last load took",
+         [({"model": name}, s["load_ms"] / 1000) for name, s in status.items() if "load_ms" in s]),
+        ("medhive_model_reloads_total", "counter", "Hot reloads",
+         [({"model": name}, s.get("reloads", 0)) for name, s in status.items()]),
+        ("medhive_inference_rows_total", "counter", "Rows scored",
+         [({"model": name}, s["rows"]) for name, s in inference.items()]),
+        ("medhive_executor_inflight", "gauge", "Jobs queued or running",
+         [({"executor": name}, s["inflight"]) for name, s in executors.items()]),
+        ("medhive_executor_rejected_total", "counter", "Jobs rejected as overloaded",
+         [({"executor": name}, s["rejected"]) for name, s in executors.items()]),
+        ("medhive_executor_expired_total", "counter", "Jobs past their deadline",
+         [({"executor": name}, s["expired"]) for name, s in executors.items()]),
+        ("medhive_batcher_queue_depth", "gauge", "Items waiting for a batch",
+         [({"batcher": "ecg"}, batcher["queue_depth"])]),
+        ("medhive_batcher_batches_total", "counter", "Forward passes",
+         [({"batcher": "ecg"}, batcher["batches"])]),
+        ("medhive_batcher_items_total", "counter", "Items batched",
+         [({"batcher": "ecg"}, batcher["items"])]),
+        ("medhive_ecg_stream_connections", "gauge", "Open /ws/ecg connections",
+         [({}, streams["active"])]),
+        ("medhive_ecg_stream_frames_total", "counter", "/ws/ecg frames by outcome",
+         [({"outcome": k}, streams[k]) for k in ("scored", "dropped", "errors")]),
+        ("medhive_cache_entries", "gauge", "Prediction cache entries",
+         [({}, cache["entries"])]),
+        ("medhive_cache_lookups_total", "counter", "Prediction cache lookups by result",
+         [({"result": r}, cache[r]) for r in ("hits", "shared_hits", "misses", "coalesced")]),
+        ("medhive_cache_evictions_total", "counter", "Prediction cache evictions",
+         [({}, cache["evictions"])]),
+    ]
+
+@app.get("/metrics")
+def metrics():
+    return Response(METRICS.render(), media_type=CONTENT_TYPE)
+
+# =====================================================
+# AUDIT LOG (see log_pipeline.py)
+# =====================================================
+# MEDHIVE_AUDIT=jsonl:<path>|sqlite:<path> records model, version, outcome
+# and latency for every prediction request - never the request content.
+AUDIT_LOG = AuditLog.from_env()
+
+AUDITED_ROUTES = {
+    "/predict": "symptom",
+    "/predict/heart": "heart",
+    "/predict/heart/batch": "heart",
+    "/predict/diabetes": "diabetes",
+    "/predict/diabetes/batch": "diabetes",
+    "/predict/liver": "liver",
+    "/predict/liver/batch": "liver",
+    "/predict/ecg": "ecg",
+    "/predict/{name}/bulk": None,
+    "/screen": "screen",
+}
+
+@METRICS.on_request
+def audit_request(route, scope, status, seconds):
+    if not AUDIT_LOG.enabled or route not in AUDITED_ROUTES:
+        return
+    model = AUDITED_ROUTES[route] or scope.get("path_params", {}).get("name")
+    entry = MODELS.entries.get(model)
+    AUDIT_LOG.record(route, model, entry.version if entry else None, status, seconds * 1000)
+
+# =====================================================
+# ADMIN: HOT RELOAD
+# =====================================================
+# Set MEDHIVE_ADMIN_TOKEN to require an X-Admin-Token header.
+ADMIN_TOKEN = os.getenv("MEDHIVE_ADMIN_TOKEN")
+
+@app.post("/admin/models/{name}/reload")
+def reload_model(name: str, wait: bool = False, x_admin_token: str | None = Header(None)):
+    if ADMIN_TOKEN and x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(403, "Invalid admin token")
+    if name not in MODELS.entries:
+        raise HTTPException(404, f"Unknown model {name}")
+    if MODELS.state(name) == "disabled":
+        raise HTTPException(409, f"{name} is not hosted by this worker")
+
+    if not wait:
+        MODELS.reload_async(name)
+        return JSONResponse({"model": name, "status": "reloading"}, status_code=202)
+
+    reloaded = MODELS.reload(name)
+    return {"model": name, "reloaded": reloaded, **MODELS.entries[name].status()}
+
+@app.get("/shadow")
+def shadow_report():
+    """
+    Candidate vs serving model on sampled live traffic.
+
+    Per model: how many requests were sampled, dropped (shadow executor
+    full) or failed, the share of rows where both models give the same
+    diagnosis, probability deltas (candidate - serving, in percentage
+    points) and the candidate's inference latency.
+    """
     return {
-        "symptom": symptom_model is not None,
-        "heart": heart_model is not None,
-        "diabetes": diabetes_model is not None,
-        "liver": liver_model is not None,
-        "ecg": ecg_model is not None,
+        name: {
+            **evaluator.snapshot(),
+            "state": MODELS.state(f"{name}-shadow"),
+            "version": MODELS.entries[f"{name}-shadow"].version,
+        }
+        for name, evaluator in SHADOWS.items()
     }
 
+@app.get("/drift")
+def drift():
+    """
+    Live input/probability distributions per model and field.
+
+    With a reference snapshot loaded, each field also carries PSI (over
+    the reference deciles or categories), KS and a status: ok, warn,
+    drift or insufficient_data. Fields at warn or worse are listed under
+    `drifted`.
+    """
+    return DRIFT.report()
+
+@app.post("/admin/drift/reference")
+def freeze_drift_reference(model: list[str] | None = Query(None), x_admin_token: str | None = Header(None)):
+    if ADMIN_TOKEN and x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(403, "Invalid admin token")
+    unknown = [name for name in model or [] if name not in DRIFT.models]
+    if unknown:
+        raise HTTPException(404, f"No drift monitor for {unknown}")
+
+    try:
+        reference = DRIFT.freeze(model)
+    except ValueError as e:
+        raise HTTPException(409, str(e))
+    return {"path": DRIFT.reference_path, "created": reference["created"], "models": sorted(reference["models"])}
+
 @app.get("/symptoms")
-def symptoms():
-    if not symptom_columns:
+async def symptoms(if_none_match: str | None = Header(None)):
+    index = await MODELS.aget("symptom_columns")
+    if not index:
+        raise HTTPException(503, "Symptom model unavailable")
+    # Pre-serialized at load; clients revalidate with If-None-Match
+    headers = {"ETag": index.etag, "Cache-Control": "public, max-age=60"}
+    if if_none_match and index.etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(index.list_body, media_type="application/json", headers=headers)
+
+@app.get("/symptoms/search")
+async def search_symptoms(q: str = "", limit: int = Query(10, ge=1, le=50)):
+    """Ranked autocomplete: prefix, word prefix, substring, then typo matches."""
+    index = await MODELS.aget("symptom_columns")
+    if not index:
         raise HTTPException(503, "Symptom model unavailable")
-    return {"symptoms": sorted(symptom_columns)}
+    return {"query": q, "results": index.search(q, limit)}
 
 # =====================================================
 # SYMPTOM PREDICTION
 # =====================================================
-@app.post("/predict")
-def predict_symptoms(data: SymptomInput):
+def score_symptoms(symptoms):
+    symptom_model = MODELS.get("symptom")
     if symptom_model is None:
         raise HTTPException(503, "Symptom model not loaded")
+    index = MODELS.get("symptom_columns")
+    if not index:
+        raise HTTPException(503, "Symptom model unavailable")
 
-    def norm(x): return x.lower().replace(" ", "_")
-    selected = set(map(norm, data.symptoms))
-    vector = [1 if norm(c) in selected else 0 for c in symptom_columns]
-
-    if sum(vector) == 0:
-        return {"matched": 0, "top_predictions": []}
+    ids, unrecognized = index.lookup(symptoms)
+    if not ids:
+        return {"matched": 0, "top_predictions": [], "unrecognized": unrecognized}
 
-    probs = symptom_model.predict_proba([vector])[0]
-    result = sorted(
-        [
-            {"disease": str(c), "probability": round(float(p) * 100, 2)}
-            for c, p in zip(symptom_model.classes_, probs)
-        ],
-        key=lambda x: x["probability"],
-        reverse=True
-    )[:3]
+    probs = index.predict_proba(symptom_model, ids)
+    return {
+        "matched": len(ids),
+        "top_predictions": top_k(probs, symptom_model.classes_, k=3),
+        "unrecognized": unrecognized,
+    }
 
-    return {"matched": sum(vector), "top_predictions": result}
+@app.post("/predict")
+def predict_symptoms(data: SymptomInput):
+    return score_symptoms(data.symptoms)
 
 # =====================================================
 # HEART
@@ -234,118 +777,460 @@ HEART_FEATURES = [
 ]
 
 
-# =====================================================
-# HEART
-# =====================================================
-@app.post("/predict/heart")
-def predict_heart(data: HeartInput):
-    if heart_model is None:
-        raise HTTPException(503, "Heart model not loaded")
+def heart_features(data):
+    return [
+        data.age,
+        data.sex,
+        data.cp,
+        data.trestbps,
+        data.chol,
+        data.fbs,
+        data.restecg,
+        data.thalach,
+        data.exang,
+        data.oldpeak,
+        data.slope,
+        data.ca,
+        data.thal
+    ]
 
+def score_heart(rows):
+    runner, version = MODELS.get_versioned("heart")
+    if runner is None:
+        raise HTTPException(503, "Heart model not loaded")
     try:
-        X = pd.DataFrame([[
-            data.age,
-            data.sex,
-            data.cp,
-            data.trestbps,
-            data.chol,
-            data.fbs,
-            data.restecg,
-            data.thalach,
-            data.exang,
-            data.oldpeak,
-            data.slope,
-            data.ca,
-            data.thal
-        ]], columns=HEART_FEATURES)
-
-        raw_pred = heart_model.predict(X)[0]
-        label = str(raw_pred).lower()
-
-        is_disease = label in ["presence", "disease", "yes", "1", "true"]
-
-        if hasattr(heart_model, "predict_proba"):
-            classes = [str(c).lower() for c in heart_model.classes_]
-            if "presence" in classes:
-                idx = classes.index("presence")
-                prob = float(heart_model.predict_proba(X)[0][idx]) * 100
-            else:
-                prob = 50.0
-        else:
-            prob = 100.0 if is_disease else 0.0
+        raw_preds, positive = runner.predict(runner.assemble(rows))
 
     except Exception as e:
         logging.error("Heart prediction failed", exc_info=True)
         raise HTTPException(500, f"Heart prediction failed: {e}")
 
-    return {
-        "prediction": "Heart Disease Detected" if is_disease else "No Heart Disease",
-        "probability": round(prob, 2),
-        "is_danger": prob >= 40,
-        "raw_model_label": raw_pred
-    }
+    results = []
+    for i, raw_pred in enumerate(raw_preds):
+        is_disease = is_positive_label(raw_pred)
+        if positive is not None:
+            prob = float(positive[i]) * 100
+        elif runner.has_proba:
+            prob = 50.0
+        else:
+            prob = 100.0 if is_disease else 0.0
+
+        results.append({
+            "prediction": "Heart Disease Detected" if is_disease else "No Heart Disease",
+            "probability": round(prob, 2),
+            "is_danger": prob >= 40,
+            "raw_model_label": raw_pred.item() if hasattr(raw_pred, "item") else raw_pred,
+            "model_version": version
+        })
+    return results
+
+# =====================================================
+# HEART
+# =====================================================
+@app.post("/predict/heart", openapi_extra=OPENAPI_EXTRA)
+@binary_route("heart", HeartInput, score_heart)
+async def predict_heart(data: HeartInput, request: Request, explain: bool = False):
+    if await MODELS.aget("heart") is None:
+        raise HTTPException(503, "Heart model not loaded")
+
+    return await cached_predict("heart", request, score_heart, heart_features(data), explain)
+
+@app.post("/predict/heart/batch", openapi_extra=OPENAPI_EXTRA)
+@binary_route("heart", HeartInput, score_heart, batch=True)
+async def predict_heart_batch(request: Request, records: list[Any] = Body(...), explain: bool = False):
+    """
+    Score many heart records with a single model call.
+
+    Results come back in request order; records that fail validation
+    carry an `error` list instead of a prediction. See
+    benchmarks/bench_batch.py for throughput against /predict/heart.
+    Arrow IPC and MessagePack bodies are accepted too (wire_formats.py).
+    explain=true adds per-feature contributions to each result
+    (explain.py).
+    """
+    if await MODELS.aget("heart") is None:
+        raise HTTPException(503, "Heart model not loaded")
+
+    return await run_on("heart", request, run_batch, "heart", request, records, HeartInput, heart_features, score_heart, explain)
 
 # =====================================================
 # DIABETES
 # =====================================================
-@app.post("/predict/diabetes")
-def predict_diabetes(data: DiabetesInput):
-    if diabetes_model is None:
-        raise HTTPException(503, "Diabetes model not loaded")
+# Training column names, in the order *_features() sends them
+DIABETES_FEATURES = [
+    "Pregnancies", "Glucose", "BloodPressure", "SkinThickness",
+    "Insulin", "BMI", "DiabetesPedigreeFunction", "Age"
+]
 
-    pred, prob = safe_predict(diabetes_model, [
+def diabetes_features(data):
+    return [
         data.Pregnancies, data.Glucose, data.BloodPressure,
         data.SkinThickness, data.Insulin, data.BMI,
         data.DiabetesPedigreeFunction, data.Age
-    ])
+    ]
 
-    return {
-        "prediction": "Diabetes Detected" if pred else "No Diabetes",
-        "probability": prob,
-        "is_danger": pred == 1,
-        "raw_model_label": pred
-    }
+def score_diabetes(rows):
+    runner, version = MODELS.get_versioned("diabetes")
+    preds, probs = safe_predict_batch(runner, rows)
+    return [
+        {
+            "prediction": "Diabetes Detected" if pred else "No Diabetes",
+            "probability": prob,
+            "is_danger": pred == 1,
+            "raw_model_label": pred,
+            "model_version": version
+        }
+        for pred, prob in zip(preds, probs)
+    ]
+
+@app.post("/predict/diabetes", openapi_extra=OPENAPI_EXTRA)
+@binary_route("diabetes", DiabetesInput, score_diabetes)
+async def predict_diabetes(data: DiabetesInput, request: Request, explain: bool = False):
+    if await MODELS.aget("diabetes") is None:
+        raise HTTPException(503, "Diabetes model not loaded")
+
+    return await cached_predict("diabetes", request, score_diabetes, diabetes_features(data), explain)
+
+@app.post("/predict/diabetes/batch", openapi_extra=OPENAPI_EXTRA)
+@binary_route("diabetes", DiabetesInput, score_diabetes, batch=True)
+async def predict_diabetes_batch(request: Request, records: list[Any] = Body(...), explain: bool = False):
+    """
+    Score many diabetes records with a single model call.
+
+    Same contract as /predict/heart/batch.
+    """
+    if await MODELS.aget("diabetes") is None:
+        raise HTTPException(503, "Diabetes model not loaded")
+
+    return await run_on("diabetes", request, run_batch, "diabetes", request, records, DiabetesInput, diabetes_features, score_diabetes, explain)
 
 # =====================================================
 # LIVER
 # =====================================================
-@app.post("/predict/liver")
-def predict_liver(data: LiverInput):
-    if liver_model is None:
-        raise HTTPException(503, "Liver model not loaded")
+LIVER_FEATURES = [
+    "Age", "Gender", "Total_Bilirubin", "Direct_Bilirubin",
+    "Alkaline_Phosphotase", "Alamine_Aminotransferase",
+    "Aspartate_Aminotransferase", "Total_Protiens", "Albumin",
+    "Albumin_and_Globulin_Ratio"
+]
 
-    pred, prob = safe_predict(liver_model, [
+def liver_features(data):
+    return [
         data.age, data.gender, data.total_bilirubin,
         data.direct_bilirubin, data.alkaline_phosphotase,
         data.alt, data.ast, data.total_proteins,
         data.albumin, data.ag_ratio
-    ])
+    ]
 
-    return {
-        "prediction": "Liver Disease Detected" if pred else "No Liver Disease",
-        "probability": prob,
-        "is_danger": pred == 1,
-        "raw_model_label": pred
-    }
+def score_liver(rows):
+    runner, version = MODELS.get_versioned("liver")
+    preds, probs = safe_predict_batch(runner, rows)
+    return [
+        {
+            "prediction": "Liver Disease Detected" if pred else "No Liver Disease",
+            "probability": prob,
+            "is_danger": pred == 1,
+            "raw_model_label": pred,
+            "model_version": version
+        }
+        for pred, prob in zip(preds, probs)
+    ]
+
+@app.post("/predict/liver", openapi_extra=OPENAPI_EXTRA)
+@binary_route("liver", LiverInput, score_liver)
+async def predict_liver(data: LiverInput, request: Request, explain: bool = False):
+    if await MODELS.aget("liver") is None:
+        raise HTTPException(503, "Liver model not loaded")
+
+    return await cached_predict("liver", request, score_liver, liver_features(data), explain)
+
+@app.post("/predict/liver/batch", openapi_extra=OPENAPI_EXTRA)
+@binary_route("liver", LiverInput, score_liver, batch=True)
+async def predict_liver_batch(request: Request, records: list[Any] = Body(...), explain: bool = False):
+    """
+    Score many liver records with a single model call.
+
+    Same contract as /predict/heart/batch.
+    """
+    if await MODELS.aget("liver") is None:
+        raise HTTPException(503, "Liver model not loaded")
+
+    return await run_on("liver", request, run_batch, "liver", request, records, LiverInput, liver_features, score_liver, explain)
 
 # =====================================================
 # ECG
 # =====================================================
-@app.post("/predict/ecg")
-async def predict_ecg(file: UploadFile = File(...)):
-    if ecg_model is None:
-        raise HTTPException(503, "ECG model unavailable")
+async def score_ecg(decode, payload, version, deadline, timings):
+    """Decode/render on the preprocess pool, then one batched forward pass."""
+    arr, decode_timings = await EXECUTORS["ecg-preprocess"].run(decode, payload, deadline=deadline)
+    timings.update(decode_timings)
 
-    contents = await file.read()
-    img = Image.open(io.BytesIO(contents)).convert("RGB").resize((224, 224))
-    arr = image.img_to_array(img) / 255.0
-    arr = np.expand_dims(arr, axis=0)
-
-    score = float(ecg_model.predict(arr)[0][0])
+    batch_timings = {}
+    score = float(await ecg_batcher.submit(arr, deadline=deadline, timings=batch_timings))
     diagnosis = "Disease" if score > 0.5 else "Normal"
 
+    timings.update(
+        wait=batch_timings.get("wait", 0.0),
+        normalize=batch_timings.get("collate", 0.0),
+        infer=batch_timings.get("forward", 0.0),
+    )
+    ECG_STAGES.record(timings)
+    for stage, ms in timings.items():
+        MODEL_SECONDS.observe(ms / 1000, "ecg", stage)
+
     return {
         "prediction": diagnosis,
         "confidence": round(score * 100, 2),
-        "raw_score": score
+        "raw_score": score,
+        "model_version": version
+    }
+
+@app.post("/predict/ecg")
+async def predict_ecg(request: Request, response: Response, file: UploadFile = File(...)):
+    if await MODELS.aget("ecg") is None:
+        raise HTTPException(503, "ECG model unavailable")
+
+    _, version = MODELS.get_versioned("ecg")
+    start = time.perf_counter()
+    try:
+        contents = await read_upload(file)
+    except ImageTooLarge as e:
+        raise HTTPException(413, f"ECG image too large: {e}")
+    timings = {"read": (time.perf_counter() - start) * 1000}
+
+    async def infer():
+        try:
+            return await score_ecg(decode_ecg_image, contents, version, request_deadline(request), timings)
+        except ImageTooLarge as e:
+            raise HTTPException(413, f"ECG image too large: {e}")
+        except InvalidImage as e:
+            raise HTTPException(400, f"Invalid ECG image: {e}")
+        except (Overloaded, DeadlineExceeded) as e:
+            raise backpressure(e)
+
+    result = await PREDICTIONS.get_or_compute(cache_key("ecg", version, contents), infer)
+    # Only the read stage is timed when the answer came from cache
+    response.headers["Server-Timing"] = server_timing(timings)
+    return result
+
+# =====================================================
+# ECG STREAMING (see ecg_stream.py)
+# =====================================================
+# One WebSocket per monitoring station. Frames go through the same
+# preprocess pool, batcher and prediction cache as /predict/ecg; each
+# frame gets its own server-side deadline (X-Request-Timeout is not
+# applied to a connection that lives for hours).
+ECG_STREAMS = StreamTotals()
+
+async def score_stream_frame(kind, payload):
+    _, version = MODELS.get_versioned("ecg")
+    if kind == "image":
+        if len(payload) > MAX_UPLOAD_BYTES:
+            raise FrameError(f"ECG image too large: upload exceeds {MAX_UPLOAD_BYTES} bytes")
+        decode, key = decode_ecg_image, payload
+    else:
+        try:
+            key = b"signal:" + np.asarray(payload, dtype=np.float64).tobytes()
+        except (TypeError, ValueError):
+            raise FrameError("Invalid ECG signal: samples must be numbers")
+        decode = render_signal
+
+    async def infer():
+        try:
+            return await score_ecg(decode, payload, version, deadline_from(None), {})
+        except InvalidImage as e:
+            raise FrameError(f"Invalid ECG {'image' if kind == 'image' else 'signal'}: {e}")
+        except Overloaded as e:
+            raise FrameError(f"{e.name} is busy, frame skipped")
+        except DeadlineExceeded:
+            raise FrameError("Frame deadline exceeded")
+
+    return await PREDICTIONS.get_or_compute(cache_key("ecg", version, key), infer)
+
+@app.websocket("/ws/ecg")
+async def stream_ecg(websocket: WebSocket):
+    await websocket.accept()
+    if await MODELS.aget("ecg") is None:
+        await websocket.close(code=1013, reason="ECG model unavailable")
+        return
+    await serve_stream(websocket, score_stream_frame, ECG_STREAMS)
+
+# =====================================================
+# MULTI-CONDITION SCREENING
+# =====================================================
+# One visit payload, every applicable model at once. Shared fields are
+# given once (age, sex) and mapped onto each schema's own names; a model
+# whose required fields are missing is skipped rather than failing.
+SHARED_FIELDS = {
+    "diabetes": {"Age": "age"},
+    "liver": {"gender": "sex"},
+}
+
+SCREENS = {
+    "heart": (HeartInput, heart_features, score_heart),
+    "diabetes": (DiabetesInput, diabetes_features, score_diabetes),
+    "liver": (LiverInput, liver_features, score_liver),
+}
+
+def screen_record(name, schema, payload):
+    shared = SHARED_FIELDS.get(name, {})
+    record, missing = {}, []
+    for field in schema.model_fields:
+        source = field if field in payload else shared.get(field, field)
+        if source in payload:
+            record[field] = payload[source]
+        else:
+            missing.append(field)
+    return record, missing
+
+async def timed(job):
+    start = time.perf_counter()
+    try:
+        result = {"status": "ok", "result": await job}
+    except HTTPException as e:
+        result = {"status": "error", "error": e.detail, "status_code": e.status_code}
+    result["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+@app.post("/screen")
+async def screen(request: Request, payload: dict[str, Any] = Body(...)):
+    """
+    Run every model the payload has inputs for, concurrently.
+
+    Takes the union of the heart, diabetes and liver fields (age and sex
+    once; `Age` and `gender` are filled from them) plus optional
+    `symptoms`. Each model reports ok / skipped (with the missing
+    fields) / invalid / error and its own latency.
+    """
+    start = time.perf_counter()
+    report, jobs = {}, {}
+
+    for name, (schema, features, score) in SCREENS.items():
+        record, missing = screen_record(name, schema, payload)
+        if missing:
+            report[name] = {"status": "skipped", "missing": missing}
+            continue
+        try:
+            data = schema.model_validate(record)
+        except ValidationError as e:
+            report[name] = {"status": "invalid", "error": validation_errors(e)}
+            continue
+        if await MODELS.aget(name) is None:
+            report[name] = {"status": "error", "error": f"{name} model not loaded", "status_code": 503}
+            continue
+        jobs[name] = cached_predict(name, request, score, features(data))
+
+    if "symptoms" in payload:
+        try:
+            data = SymptomInput.model_validate({"symptoms": payload["symptoms"]})
+        except ValidationError as e:
+            report["symptoms"] = {"status": "invalid", "error": validation_errors(e)}
+        else:
+            jobs["symptoms"] = run_on("symptom", request, score_symptoms, data.symptoms)
+    else:
+        report["symptoms"] = {"status": "skipped", "missing": ["symptoms"]}
+
+    results = await asyncio.gather(*[timed(job) for job in jobs.values()])
+    report.update(zip(jobs, results))
+    report = {name: report[name] for name in [*SCREENS, "symptoms"]}
+
+    flagged = [
+        name for name, r in report.items()
+        if r["status"] == "ok" and r["result"].get("is_danger")
+    ]
+    return {
+        "screened": [name for name, r in report.items() if r["status"] == "ok"],
+        "flagged": flagged,
+        "results": report,
+        "total_ms": round((time.perf_counter() - start) * 1000, 2),
     }
+
+# =====================================================
+# BULK FILE SCORING (see bulk_score.py)
+# =====================================================
+def bulk_columns(name, columns):
+    schema, _, _ = SCREENS[name]
+    runner = MODELS.get(name)
+    names = runner.feature_names if runner is not None else None
+    return feature_columns(columns, list(schema.model_fields), names)
+
+def score_bulk_chunk(name, df):
+    schema, _, score = SCREENS[name]
+    return score_frame(df, bulk_columns(name, df.columns), schema, score)
+
+def close_spool(chunks, spool):
+    # The chunk reader goes first: left to the garbage collector it would
+    # read from an already closed spool
+    if chunks is not None:
+        try:
+            chunks.close()
+        except ValueError:
+            # A cancelled stream left next() running in a worker thread;
+            # both are released once that call returns
+            return
+    spool.close()
+
+
+@app.post("/predict/{name}/bulk")
+async def predict_bulk(name: str, file: UploadFile = File(...), chunk_rows: int = Query(CHUNK_ROWS, ge=1, le=100_000)):
+    """
+    Score an uploaded CSV/Parquet file and stream the rows back as CSV.
+
+    The file is processed chunk_rows at a time on the "bulk" executor, so
+    memory stays flat regardless of size. Output is the input columns
+    plus prediction, probability, is_danger, raw_model_label,
+    model_version and error. Large backfills: use bulk_score.py.
+    """
+    if name not in SCREENS:
+        raise HTTPException(404, f"No bulk scoring for {name}")
+    if await MODELS.aget(name) is None:
+        raise HTTPException(503, f"{name} model not loaded")
+
+    # The upload is closed once this handler returns, before the response
+    # has streamed, so it is copied to a temp file the stream owns
+    spool = tempfile.TemporaryFile()
+    chunks = None
+    try:
+        await asyncio.to_thread(shutil.copyfileobj, file.file, spool)
+        spool.seek(0)
+
+        # The first chunk is checked and scored before streaming starts so
+        # bad files and a busy executor still get a proper status code
+        try:
+            chunks = iter_chunks(spool, detect_format(file.filename), chunk_rows)
+            first = await asyncio.to_thread(next, chunks, None)
+            if first is None:
+                raise ValueError("file has no rows")
+            bulk_columns(name, first.columns)
+        except RuntimeError as e:
+            raise HTTPException(415, str(e))
+        except ValueError as e:
+            raise HTTPException(400, f"Unreadable {name} file: {e}")
+
+        try:
+            scored = await EXECUTORS["bulk"].run(score_bulk_chunk, name, first)
+        except Overloaded as e:
+            raise backpressure(e)
+    except BaseException:
+        close_spool(chunks, spool)
+        raise
+
+    async def stream():
+        try:
+            yield scored.to_csv(index=False)
+            while (df := await asyncio.to_thread(next, chunks, None)) is not None:
+                while True:
+                    try:
+                        out = await EXECUTORS["bulk"].run(score_bulk_chunk, name, df)
+                        break
+                    except Overloaded as e:
+                        # Another upload holds the slot; wait rather than abort mid-stream
+                        await asyncio.sleep(e.retry_after)
+                yield out.to_csv(index=False, header=False)
+        finally:
+            close_spool(chunks, spool)
+
+    return StreamingResponse(
+        stream(), media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{name}_scores.csv"'}
+    )
@@ -0,0 +1,313 @@
+# =====================================================
+# PICKLE-FREE MODEL ARTIFACTS
+# =====================================================
+# Usage: python artifacts.py export [models/heart_model.pkl ...]
+#        python artifacts.py check  [models/heart_model.pkl ...]
+#
+# Each pickle in MODEL_DIR can be exported next to itself as
+# <name>.medhive/: a meta.json (format version, estimator class, params,
+# scalar attributes, the sha of the pickle it came from) plus one .npy
+# per fitted array. Loading is json.load + np.load - no unpickling, so
+# none of the NumPy 1.x/2.x pickle shims from test_numpy_fix.py, nothing
+# executed from the file, and arrays can be memory-mapped.
+#
+# Supported today:
+#   estimator   whitelisted sklearn linear models / scalers, rebuilt from
+#               their fitted attributes (coef_, mean_, classes_, ...)
+#   pipeline    a Pipeline of supported estimators
+#   flat_forest tree ensembles, stored as tree_engine.FlatForest arrays
+#   strings     plain lists of strings (symptom_columns.pkl)
+# Anything else is left as a pickle. load_model_file() in app.py uses an
+# export only if its source sha matches the pickle beside it (or the
+# pickle is gone), so a replaced pickle is never shadowed by a stale
+# export.
+import argparse
+import importlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from registry import artifact_version
+from tree_engine import FlatForest, compile_trees
+
+FORMAT = "medhive-model"
+FORMAT_VERSION = 1
+SUFFIX = ".medhive"
+
+# Only these classes are ever instantiated from meta.json
+ESTIMATORS = {
+    "sklearn.linear_model.LogisticRegression",
+    "sklearn.linear_model.LinearRegression",
+    "sklearn.linear_model.Ridge",
+    "sklearn.linear_model.RidgeClassifier",
+    "sklearn.preprocessing.StandardScaler",
+    "sklearn.preprocessing.MinMaxScaler",
+}
+
+
+class UnsupportedModel(Exception):
+    pass
+
+
+def export_dir(path):
+    root, _ = os.path.splitext(path)
+    return root + SUFFIX
+
+
+def _qualname(obj):
+    cls = type(obj)
+    module = cls.__module__
+    # sklearn.linear_model._logistic -> sklearn.linear_model
+    public = ".".join(p for p in module.split(".") if not p.startswith("_"))
+    return f"{public}.{cls.__name__}"
+
+
+def _jsonable(value):
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return True, value
+    return False, None
+
+
+# =====================================================
+# EXPORT
+# =====================================================
+def _export_estimator(model, directory, prefix):
+    name = _qualname(model)
+    if name not in ESTIMATORS:
+        raise UnsupportedModel(name)
+
+    params = {}
+    for key, value in model.get_params(deep=False).items():
+        ok, value = _jsonable(value)
+        if ok:
+            params[key] = value
+
+    attrs, arrays, object_arrays = {}, [], []
+    for key, value in vars(model).items():
+        if not key.endswith("_") or key.startswith("_"):
+            continue
+        if isinstance(value, np.ndarray):
+            if value.dtype == object:
+                # feature names / string classes; restored as object dtype
+                value = value.astype(str)
+                object_arrays.append(key)
+            np.save(os.path.join(directory, f"{prefix}{key}.npy"), value, allow_pickle=False)
+            arrays.append(key)
+            continue
+        ok, value = _jsonable(value)
+        if not ok:
+            raise UnsupportedModel(f"{name}.{key} is {type(value).__name__}")
+        attrs[key] = value
+
+    return {"class": name, "params": params, "attrs": attrs,
+            "arrays": arrays, "object_arrays": object_arrays, "prefix": prefix}
+
+
+def describe(model, directory):
+    """Write model's arrays into directory; returns the meta entry."""
+    if isinstance(model, list) and all(isinstance(s, str) for s in model):
+        return {"kind": "strings", "values": model}
+
+    flat = compile_trees(model)
+    if isinstance(flat, FlatForest):
+        flat.save(os.path.join(directory, "forest"))
+        return {"kind": "flat_forest", "class": _qualname(model)}
+
+    if type(model).__name__ == "Pipeline":
+        steps = []
+        for i, (step_name, step) in enumerate(model.steps):
+            if step is None or step == "passthrough":
+                raise UnsupportedModel("passthrough pipeline step")
+            steps.append({"name": step_name, **_export_estimator(step, directory, f"steps.{i}.")})
+        return {"kind": "pipeline", "steps": steps}
+
+    return {"kind": "estimator", **_export_estimator(model, directory, "")}
+
+
+def export(path, model=None):
+    """Export the pickle at path; returns the export directory."""
+    import joblib
+
+    if model is None:
+        model = joblib.load(path)
+
+    target = export_dir(path)
+    parent = os.path.dirname(os.path.abspath(target))
+    tmp = tempfile.mkdtemp(dir=parent, suffix=".tmp")
+    try:
+        meta = {
+            "format": FORMAT,
+            "format_version": FORMAT_VERSION,
+            "source": {"file": os.path.basename(path), "version": artifact_version(path)},
+            "exported_with": _library_versions(),
+            "model": describe(model, tmp),
+        }
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        os.replace(tmp, target)
+    finally:
+        if os.path.exists(tmp):
+            shutil.rmtree(tmp)
+    return target
+
+
+def _library_versions():
+    import sklearn
+
+    return {"numpy": np.__version__, "sklearn": sklearn.__version__}
+
+
+# =====================================================
+# IMPORT
+# =====================================================
+def read_meta(directory):
+    with open(os.path.join(directory, "meta.json")) as f:
+        meta = json.load(f)
+    if meta.get("format") != FORMAT:
+        raise ValueError(f"{directory} is not a {FORMAT} artifact")
+    if meta.get("format_version", 0) > FORMAT_VERSION:
+        raise ValueError(f"{directory} needs format version {meta['format_version']}, this loader reads {FORMAT_VERSION}")
+    return meta
+
+
+def current_export(path):
+    """The export for the pickle at path if it is up to date, else None."""
+    directory = export_dir(path)
+    if not os.path.isfile(os.path.join(directory, "meta.json")):
+        return None
+    try:
+        meta = read_meta(directory)
+    except (OSError, ValueError):
+        return None
+    if os.path.exists(path) and meta["source"].get("version") != artifact_version(path):
+        return None
+    return directory
+
+
+def _load_estimator(spec, directory, mmap_mode):
+    name = spec["class"]
+    if name not in ESTIMATORS:
+        raise UnsupportedModel(f"{name} is not an allowed estimator")
+    module, _, cls_name = name.rpartition(".")
+    cls = getattr(importlib.import_module(module), cls_name)
+
+    # Params this sklearn no longer knows are dropped, new ones default
+    accepted = cls().get_params(deep=False)
+    model = cls(**{k: v for k, v in spec["params"].items() if k in accepted})
+    for key, value in spec["attrs"].items():
+        setattr(model, key, value)
+    for key in spec["arrays"]:
+        arr = np.load(os.path.join(directory, f"{spec['prefix']}{key}.npy"), mmap_mode=mmap_mode, allow_pickle=False)
+        if key in spec["object_arrays"]:
+            arr = arr.astype(object)
+        setattr(model, key, arr)
+    return model
+
+
+def load_export(directory, mmap=False):
+    meta = read_meta(directory)
+    spec = meta["model"]
+    mmap_mode = "r" if mmap else None
+
+    if spec["kind"] == "strings":
+        return list(spec["values"])
+    if spec["kind"] == "flat_forest":
+        return FlatForest.load(os.path.join(directory, "forest"), mmap_mode=mmap_mode)
+    if spec["kind"] == "pipeline":
+        from sklearn.pipeline import Pipeline
+
+        return Pipeline([(s["name"], _load_estimator(s, directory, mmap_mode)) for s in spec["steps"]])
+    if spec["kind"] == "estimator":
+        return _load_estimator(spec, directory, mmap_mode)
+    raise UnsupportedModel(f"unknown artifact kind {spec['kind']!r}")
+
+
+def export_kind(directory):
+    return read_meta(directory)["model"]["kind"]
+
+
+# =====================================================
+# PARITY
+# =====================================================
+def parity_inputs(model, n=512, seed=0):
+    n_features = getattr(model, "n_features_in_", None)
+    if n_features is None:
+        return None
+    rng = np.random.default_rng(seed)
+    # Wide spread so every tree branch and both logistic tails are hit
+    return rng.normal(0, 1, (n, n_features)) * rng.choice([1, 10, 100], n_features)
+
+
+def check_parity(original, exported, X):
+    """Max abs difference in predict_proba (or predict) between the two.
+    Forests are checked against the sklearn estimator itself, not a
+    FlatForest compiled from it."""
+    if isinstance(original, list):
+        return 0.0 if original == exported else float("inf")
+    fn = "predict_proba" if hasattr(original, "predict_proba") else "predict"
+    a = np.asarray(getattr(original, fn)(X), dtype=float)
+    b = np.asarray(getattr(exported, fn)(X), dtype=float)
+    return float(np.abs(a - b).max()) if a.shape == b.shape else float("inf")
+
+
+def main(argv=None):
+    import warnings
+
+    import joblib
+
+    warnings.filterwarnings("ignore")
+    here = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Export MedHive pickles to the pickle-free format")
+    parser.add_argument("command", choices=["export", "check"])
+    parser.add_argument("pickles", nargs="*", help="default: every .pkl in models/")
+    args = parser.parse_args(argv)
+
+    models_dir = os.path.join(here, "models")
+    pickles = args.pickles or sorted(
+        os.path.join(models_dir, f) for f in os.listdir(models_dir) if f.endswith(".pkl")
+    )
+    failed = 0
+    for path in pickles:
+        name = os.path.basename(path)
+        try:
+            start = time.perf_counter()
+            original = joblib.load(path)
+            pickle_ms = (time.perf_counter() - start) * 1000
+
+            if args.command == "export":
+                export(path, original)
+            directory = current_export(path)
+            if directory is None:
+                print(f"❌ {name}: no up-to-date export")
+                failed += 1
+                continue
+
+            start = time.perf_counter()
+            exported = load_export(directory)
+            export_ms = (time.perf_counter() - start) * 1000
+
+            X = None if isinstance(original, list) else parity_inputs(original)
+            diff = check_parity(original, exported, X)
+            status = "✅" if diff == 0.0 else "❌"
+            failed += diff != 0.0
+            print(f"{status} {name}: {export_kind(directory)}, max diff {diff:g}, "
+                  f"load {pickle_ms:.1f} ms pickle -> {export_ms:.1f} ms export")
+        except UnsupportedModel as e:
+            print(f"⏭️  {name}: kept as pickle ({e})")
+        except Exception as e:
+            print(f"❌ {name}: {type(e).__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
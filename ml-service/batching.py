@@ -0,0 +1,175 @@
+# =====================================================
+# DYNAMIC MICRO-BATCHING
+# =====================================================
+# Requests enqueue one input each and await a future. A single consumer
+# task per event loop collects inputs until either max_batch_size items
+# are queued or the oldest one has waited max_wait_ms, then runs one
+# batched forward pass off the event loop and hands each caller its row.
+#
+# collate turns the queued items into the model input (np.stack by
+# default) and runs in the executor together with the forward pass.
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from executors import DeadlineExceeded, Overloaded
+
+
+class BatcherStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.batch_sizes = {}
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.forward_ms_total = 0.0
+        self.collate_ms_total = 0.0
+        self.errors = 0
+        self.rejected = 0
+        self.expired = 0
+
+    def record(self, size, waits_ms, forward_ms, ok, collate_ms=0.0):
+        with self._lock:
+            self.batches += 1
+            self.items += size
+            self.batch_sizes[size] = self.batch_sizes.get(size, 0) + 1
+            self.wait_ms_total += sum(waits_ms)
+            self.wait_ms_max = max(self.wait_ms_max, max(waits_ms))
+            self.forward_ms_total += forward_ms
+            self.collate_ms_total += collate_ms
+            if not ok:
+                self.errors += 1
+
+
+class MicroBatcher:
+    def __init__(self, name, predict_fn, max_batch_size=16, max_wait_ms=5.0,
+                 executor=None, max_queue=None, collate=None):
+        self.name = name
+        self.predict_fn = predict_fn
+        self.collate = collate or np.stack
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000
+        self.executor = executor
+        self.max_queue = max_queue
+        self.stats = BatcherStats()
+        self._loop = None
+        self._queue = None
+        self._task = None
+
+    def _ensure_started(self):
+        # One consumer per running loop. uvicorn has a single loop; test
+        # clients may spin up a fresh one per request.
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+
+    async def submit(self, item, deadline=None, timings=None):
+        # timings (a dict) receives this item's wait/collate/forward ms
+        self._ensure_started()
+        if self.max_queue is not None and self._queue.qsize() >= self.max_queue:
+            self.stats.rejected += 1
+            raise Overloaded(self.name)
+
+        future = self._loop.create_future()
+        await self._queue.put((item, future, time.perf_counter(), deadline, timings))
+
+        if deadline is None:
+            return await future
+        try:
+            return await asyncio.wait_for(future, deadline - time.monotonic())
+        except asyncio.TimeoutError:
+            self.stats.expired += 1
+            raise DeadlineExceeded(f"{self.name} deadline exceeded")
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            await self._flush(batch)
+
+    async def _flush(self, batch):
+        # Callers that timed out have cancelled their futures; skip them
+        now = time.monotonic()
+        live = []
+        for entry in batch:
+            _, future, _, deadline, _ = entry
+            if future.done():
+                continue
+            if deadline is not None and now > deadline:
+                self.stats.expired += 1
+                future.set_exception(DeadlineExceeded(f"{self.name} deadline exceeded"))
+                continue
+            live.append(entry)
+        if not live:
+            return
+        batch = live
+
+        flush_start = time.perf_counter()
+        waits_ms = [(flush_start - queued_at) * 1000 for _, _, queued_at, _, _ in batch]
+        ok = True
+        collate_ms = 0.0
+        try:
+            items = [item for item, _, _, _, _ in batch]
+            outputs, collate_ms = await self._loop.run_in_executor(self.executor, self._forward, items)
+        except Exception as e:
+            ok = False
+            for _, future, _, _, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            forward_ms = (time.perf_counter() - flush_start) * 1000 - collate_ms
+            for (_, future, _, _, timings), out, wait_ms in zip(batch, outputs, waits_ms):
+                if timings is not None:
+                    timings.update(wait=wait_ms, collate=collate_ms, forward=forward_ms)
+                if not future.done():
+                    future.set_result(out)
+
+        forward_ms = (time.perf_counter() - flush_start) * 1000 - collate_ms
+        self.stats.record(len(batch), waits_ms, forward_ms, ok, collate_ms)
+
+    def _forward(self, items):
+        start = time.perf_counter()
+        X = self.collate(items)
+        collate_ms = (time.perf_counter() - start) * 1000
+        return self.predict_fn(X), collate_ms
+
+    def snapshot(self):
+        s = self.stats
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "max_queue": self.max_queue,
+            "batches": s.batches,
+            "items": s.items,
+            "errors": s.errors,
+            "rejected": s.rejected,
+            "expired": s.expired,
+            "batch_size_histogram": dict(sorted(s.batch_sizes.items())),
+            "avg_batch_size": round(s.items / s.batches, 2) if s.batches else 0.0,
+            "wait_ms_avg": round(s.wait_ms_total / s.items, 3) if s.items else 0.0,
+            "wait_ms_max": round(s.wait_ms_max, 3),
+            "forward_ms_avg": round(s.forward_ms_total / s.batches, 3) if s.batches else 0.0,
+            "collate_ms_avg": round(s.collate_ms_total / s.batches, 3) if s.batches else 0.0,
+        }
@@ -0,0 +1,3 @@
+# Benchmarks and load tests for the ML service. Each module also runs as
+# a script (python benchmarks/<name>.py); run.py runs the whole suite and
+# compares the results against a stored baseline.
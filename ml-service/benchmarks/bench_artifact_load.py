@@ -0,0 +1,49 @@
+# =====================================================
+# MODEL LOAD TIME: PICKLE vs PICKLE-FREE EXPORT
+# =====================================================
+# Usage: python benchmarks/bench_artifact_load.py [repeats]
+#
+# Cold-ish load of every exported artifact in models/ three ways:
+# joblib.load of the pickle (plus compile_trees for forests, which is
+# what the service serves), load_export, and load_export memory-mapped.
+# Run `python artifacts.py export` first.
+import os
+import sys
+import time
+import warnings
+
+warnings.filterwarnings("ignore")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import joblib
+
+from artifacts import current_export, load_export
+from tree_engine import compile_trees
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+
+
+def best_ms(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    for name in sorted(f for f in os.listdir(MODEL_DIR) if f.endswith(".pkl")):
+        path = os.path.join(MODEL_DIR, name)
+        export = current_export(path)
+        if export is None:
+            print(f"{name:<28} no up-to-date export, skipped")
+            continue
+        pickle_ms = best_ms(lambda: compile_trees(joblib.load(path)), repeats)
+        export_ms = best_ms(lambda: load_export(export), repeats)
+        mapped_ms = best_ms(lambda: load_export(export, mmap=True), repeats)
+        print(
+            f"{name:<28} pickle: {pickle_ms:>8.2f} ms   export: {export_ms:>7.2f} ms   "
+            f"mmap: {mapped_ms:>7.2f} ms   speedup: {pickle_ms / mapped_ms:.0f}x"
+        )
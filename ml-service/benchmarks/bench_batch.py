@@ -0,0 +1,49 @@
+# =====================================================
+# SINGLE vs BATCH THROUGHPUT
+# =====================================================
+# Usage: python benchmarks/bench_batch.py [records]
+#
+# Scores the same N records through /predict/{model} one request at a
+# time and through /predict/{model}/batch in one request, in-process via
+# TestClient, and prints records/sec for both paths.
+import os
+import sys
+import time
+import warnings
+
+warnings.filterwarnings("ignore")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+
+from app import app, MODELS
+from test_batch import HEART, DIABETES, LIVER
+
+client = TestClient(app)
+
+
+def bench(model, samples, n):
+    records = [samples[i % len(samples)] for i in range(n)]
+
+    start = time.perf_counter()
+    for r in records:
+        client.post(f"/predict/{model}", json=r)
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    client.post(f"/predict/{model}/batch", json=records)
+    batch = time.perf_counter() - start
+
+    print(
+        f"{model:<9} n={n:<6} single: {n / single:>9.0f} rec/s   "
+        f"batch: {n / batch:>9.0f} rec/s   speedup: {single / batch:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    for model, samples in [("heart", HEART), ("diabetes", DIABETES), ("liver", LIVER)]:
+        if MODELS.get(model) is not None:
+            bench(model, samples, n)
+        else:
+            print(f"{model:<9} model not loaded, skipped")
@@ -0,0 +1,68 @@
+# =====================================================
+# EXPLANATION OVERHEAD
+# =====================================================
+# Usage: python benchmarks/bench_explain.py [repeats]
+#
+# For heart, diabetes and liver prints the best-of-N time of plain
+# inference (runner.predict) and of the attribution pass
+# (explain.explanations) at batch sizes 1, 32 and 1024, plus the
+# end-to-end /predict/{model} latency with and without ?explain=true.
+# Missing model files are replaced with synthetic models.
+import os
+import sys
+import time
+import warnings
+
+warnings.filterwarnings("ignore")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app import EXPLAIN_FIELDS, MODELS, app
+from benchmarks.synthetic import install_synthetic, records
+from explain import explanations
+
+BATCH_SIZES = [1, 32, 1024]
+
+client = TestClient(app)
+
+
+def best_ms(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def bench_model(name, repeats):
+    runner = MODELS.get(name)
+    rows = [list(r.values()) for r in records(name, max(BATCH_SIZES), seed=0)]
+    kind = type(runner.explainer).__name__
+    for n in BATCH_SIZES:
+        X = np.ascontiguousarray(rows[:n], dtype=np.float64)
+        predict = best_ms(lambda: runner.predict(X), repeats)
+        explain = best_ms(lambda: explanations(runner.explainer, X, EXPLAIN_FIELDS[name]), repeats)
+        print(
+            f"{name:<9} {kind:<16} n={n:<5} predict {predict:>8.3f} ms   "
+            f"explain {explain:>8.3f} ms   x{explain / predict:.1f}"
+        )
+
+    # End to end; a fresh record per call so the prediction cache never answers
+    fresh = iter(records(name, 2 * repeats, seed=1))
+
+    def post(explain):
+        client.post(f"/predict/{name}", json=next(fresh), params={"explain": explain})
+
+    plain = best_ms(lambda: post(False), repeats)
+    explained = best_ms(lambda: post(True), repeats)
+    print(f"{name:<9} /predict/{name}: {plain:.3f} ms, with explain {explained:.3f} ms (+{explained - plain:.3f} ms)")
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    install_synthetic(MODELS)
+    for name in EXPLAIN_FIELDS:
+        bench_model(name, repeats)
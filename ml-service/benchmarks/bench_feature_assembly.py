@@ -0,0 +1,62 @@
+# =====================================================
+# PER-REQUEST FEATURE ASSEMBLY: DATAFRAME vs NUMPY
+# =====================================================
+# Usage: python benchmarks/bench_feature_assembly.py [repeats]
+#
+# Single-record cost of the old heart path (a pandas DataFrame with
+# HEART_FEATURES columns, names re-checked by sklearn on every call)
+# against TabularModel.assemble + the name-stripped model, for each
+# tabular model.
+import os
+import sys
+import time
+import warnings
+
+warnings.filterwarnings("ignore")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import joblib
+import pandas as pd
+
+from app import DIABETES_FEATURES, HEART_FEATURES, LIVER_FEATURES, MODEL_DIR, WARM_INPUTS
+from inference import TabularModel
+
+MODELS = {
+    "heart": ("heart_model.pkl", HEART_FEATURES),
+    "diabetes": ("diabetes_model_cleaned.pkl", DIABETES_FEATURES),
+    "liver": ("liver_model.pkl", LIVER_FEATURES),
+}
+
+
+def best_us(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1e6
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    for name, (filename, features) in MODELS.items():
+        path = os.path.join(MODEL_DIR, filename)
+        if not os.path.exists(path):
+            print(f"{name}: model not found")
+            continue
+        row = [WARM_INPUTS[name]]
+
+        # Before: fitted names kept, DataFrame per request
+        named = joblib.load(path)
+        before = best_us(lambda: named.predict_proba(pd.DataFrame(row, columns=features)), repeats)
+        build = best_us(lambda: pd.DataFrame(row, columns=features), repeats)
+
+        # After: names checked once at load, contiguous reused buffer
+        runner = TabularModel(name, joblib.load(path), features)
+        after = best_us(lambda: runner.model.predict_proba(runner.assemble(row)), repeats)
+
+        print(
+            f"{name:<9} DataFrame path: {before:>8.1f} us (building frame {build:.1f} us)   "
+            f"NumPy path: {after:>8.1f} us   saved: {before - after:.1f} us/request"
+        )
@@ -0,0 +1,79 @@
+# =====================================================
+# MODEL INFERENCE AT SEVERAL BATCH SIZES
+# =====================================================
+# Usage: python benchmarks/bench_inference.py [repeats]
+#
+# Times each loaded model's forward pass alone (no HTTP, no executors)
+# for batch sizes 1..512 (ECG 1..16) and prints us per call and rows/s.
+# Missing models are replaced by synthetic stand-ins (see synthetic.py).
+import json
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+warnings.filterwarnings("ignore")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import synthetic
+
+TABULAR_BATCHES = (1, 8, 64, 512)
+SYMPTOM_BATCHES = (1,)
+ECG_BATCHES = (1, 4, 16)
+
+
+def best_us(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1e6
+
+
+def entry(us, rows):
+    return {"us_per_call": round(us, 2), "rows_per_s": round(rows / us * 1e6, 1)}
+
+
+def bench_models(registry, repeats=50, log=sys.stderr):
+    results = {}
+
+    for name in ("heart", "diabetes", "liver"):
+        runner = registry.get(name)
+        if runner is None:
+            continue
+        rows = [list(r.values()) for r in synthetic.records(name, max(TABULAR_BATCHES))]
+        results[name] = {}
+        for bs in TABULAR_BATCHES:
+            X = runner.assemble(rows[:bs])
+            results[name][str(bs)] = entry(best_us(lambda: runner.predict(X), repeats), bs)
+
+    model, index = registry.get("symptom"), registry.get("symptom_columns")
+    if model is not None and index:
+        ids = list(range(0, len(index), max(1, len(index) // 4)))[:4]
+        results["symptom"] = {"1": entry(best_us(lambda: index.predict_proba(model, ids), repeats), 1)}
+
+    ecg = registry.get("ecg")
+    if ecg is not None:
+        rng = np.random.default_rng(0)
+        results["ecg"] = {}
+        for bs in ECG_BATCHES:
+            X = rng.random((bs, 224, 224, 3), dtype=np.float32)
+            results["ecg"][str(bs)] = entry(best_us(lambda: ecg.predict_on_batch(X), max(3, repeats // 10)), bs)
+
+    for name, sizes in results.items():
+        line = "   ".join(f"bs={bs}: {r['us_per_call']:>9.1f} us" for bs, r in sizes.items())
+        print(f"{name:<9} {line}", file=log)
+    return results
+
+
+if __name__ == "__main__":
+    from app import MODELS
+
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    replaced = synthetic.install_synthetic(MODELS)
+    if replaced:
+        print(f"synthetic: {', '.join(replaced)}")
+    print(json.dumps(bench_models(MODELS, repeats), indent=2))
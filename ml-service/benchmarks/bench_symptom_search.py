@@ -0,0 +1,35 @@
+# =====================================================
+# SYMPTOM AUTOCOMPLETE LATENCY
+# =====================================================
+# Usage: python benchmarks/bench_symptom_search.py [repeats]
+#
+# Times SymptomIndex.search over the real vocabulary for short prefixes,
+# multi-word substrings and misspellings.
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import joblib
+
+from symptoms import SymptomIndex
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+QUERIES = ["f", "fev", "chest", "abdominal pain", "shortnes of breth", "diziness", "zzzz"]
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    columns = joblib.load(os.path.join(MODEL_DIR, "symptom_columns.pkl"))
+
+    start = time.perf_counter()
+    index = SymptomIndex(columns)
+    print(f"Index build: {(time.perf_counter() - start) * 1000:.1f} ms for {len(columns)} symptoms")
+
+    for q in QUERIES:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            results = index.search(q, 10)
+        us = (time.perf_counter() - start) / repeats * 1e6
+        print(f"{q!r:22} {us:8.1f} us  {len(results):2d} results")
@@ -0,0 +1,52 @@
+# =====================================================
+# FLAT TREE ENGINE vs SKLEARN
+# =====================================================
+# Usage: python benchmarks/bench_tree_engine.py [repeats]
+#
+# Times predict_proba of liver_model.pkl natively and through
+# tree_engine.FlatForest at batch sizes 1, 32 and 1024.
+import os
+import sys
+import time
+import warnings
+
+warnings.filterwarnings("ignore")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import joblib
+import numpy as np
+
+from test_tree_engine import liver_path, random_liver_rows
+from tree_engine import FlatForest
+
+BATCH_SIZES = [1, 32, 1024]
+
+
+def best_ms(fn, X, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    if not os.path.exists(liver_path):
+        sys.exit("Liver model not found.")
+
+    model = joblib.load(liver_path)
+    start = time.perf_counter()
+    flat = FlatForest.from_sklearn(model)
+    print(f"Converted {flat.n_trees} trees in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    rng = np.random.default_rng(0)
+    for n in BATCH_SIZES:
+        X = random_liver_rows(rng, n)
+        native = best_ms(model.predict_proba, X, repeats)
+        fast = best_ms(flat.predict_proba, X, repeats)
+        print(
+            f"batch {n:<5} sklearn: {native:>8.3f} ms   flat: {fast:>8.3f} ms   "
+            f"speedup: {native / fast:.1f}x"
+        )
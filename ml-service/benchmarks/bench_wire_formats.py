@@ -0,0 +1,92 @@
+# =====================================================
+# JSON vs MESSAGEPACK vs ARROW IPC
+# =====================================================
+# Usage: python benchmarks/bench_wire_formats.py [records] [repeats]
+#
+# For each body format on /predict/heart/batch prints bytes on the wire
+# (request and response) and CPU microseconds per record, both for the
+# decode + validate stage alone and for the whole request in-process via
+# TestClient (which includes the same client overhead for every format;
+# bodies are encoded once up front). Formats whose package is missing
+# are skipped.
+import json
+import os
+import sys
+import time
+import warnings
+
+warnings.filterwarnings("ignore")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+
+from app import HeartInput, MODELS, app, heart_features
+from benchmarks.synthetic import install_synthetic, records
+from wire_formats import ARROW, MSGPACK, decode_columns, validate_columns
+
+client = TestClient(app)
+FIELDS = list(HeartInput.model_fields)
+
+
+def encoders():
+    out = {"json": ("application/json", lambda recs: json.dumps(recs).encode())}
+    try:
+        import msgpack
+
+        out["msgpack"] = (MSGPACK, lambda recs: msgpack.packb({f: [r[f] for r in recs] for f in FIELDS}))
+    except ImportError:
+        print("msgpack not installed, skipped")
+    try:
+        import pyarrow as pa
+
+        def arrow(recs):
+            table = pa.table({f: [r[f] for r in recs] for f in FIELDS})
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            return sink.getvalue().to_pybytes()
+
+        out["arrow"] = (ARROW, arrow)
+    except ImportError:
+        print("pyarrow not installed, skipped")
+    return out
+
+
+def parse_and_validate(fmt, body):
+    if fmt == "json":
+        return [heart_features(HeartInput.model_validate(r)) for r in json.loads(body)]
+    n, columns = decode_columns(body, fmt, FIELDS)
+    return validate_columns(columns, HeartInput, n)
+
+
+def best_cpu(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.process_time()
+        fn()
+        best = min(best, time.process_time() - start)
+    return best
+
+
+def bench(n, repeats):
+    recs = records("heart", n, seed=0)
+    print(f"{'format':<9} {'request B':>10} {'response B':>11} {'parse us/rec':>13} {'request us/rec':>15}")
+    for fmt, (media_type, encode) in encoders().items():
+        body = encode(recs)
+        headers = {"Content-Type": media_type}
+        response = client.post("/predict/heart/batch", content=body, headers=headers)
+        assert response.status_code == 200, response.text
+
+        parse = best_cpu(lambda: parse_and_validate(fmt, body), repeats)
+        request = best_cpu(lambda: client.post("/predict/heart/batch", content=body, headers=headers), repeats)
+        print(
+            f"{fmt:<9} {len(body):>10} {len(response.content):>11} "
+            f"{parse / n * 1e6:>13.2f} {request / n * 1e6:>15.2f}"
+        )
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    install_synthetic(MODELS)
+    bench(n, repeats)
@@ -0,0 +1,224 @@
+# =====================================================
+# HTTP LOAD GENERATOR
+# =====================================================
+# Usage: python benchmarks/loadgen.py [--target inprocess|uvicorn|URL]
+#                                     [--requests N] [--concurrency C]
+#
+# Closed-loop load: C concurrent clients each send their next request as
+# soon as the previous one returns, until N requests per endpoint are
+# done. Endpoints run one after another so each gets its own latency
+# distribution (p50/p95/p99) and throughput.
+#
+# Targets: "inprocess" drives the ASGI app directly through httpx (no
+# sockets, measures the service code), "uvicorn" starts a local server
+# in a subprocess (adds HTTP parsing and the network stack), or any
+# base URL of an already running service. Every payload is generated
+# before the clock starts and is unique, so neither payload building nor
+# the prediction cache is part of the measurement.
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from benchmarks import synthetic
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENDPOINTS = ["heart", "diabetes", "liver", "heart-batch", "symptoms", "screen", "ecg"]
+BATCH_SIZE = 32
+
+
+def build_requests(endpoint, n, seed=0, symptom_columns=None):
+    """n (method, path, httpx kwargs) tuples for one endpoint."""
+    rng = np.random.default_rng(seed)
+    if endpoint in ("heart", "diabetes", "liver"):
+        return [("POST", f"/predict/{endpoint}", {"json": synthetic.record(endpoint, rng)}) for _ in range(n)]
+    if endpoint == "heart-batch":
+        return [
+            ("POST", "/predict/heart/batch", {"json": [synthetic.record("heart", rng) for _ in range(BATCH_SIZE)]})
+            for _ in range(n)
+        ]
+    if endpoint == "symptoms":
+        columns = symptom_columns or [f"symptom_{i:03d}" for i in range(377)]
+        return [("POST", "/predict", {"json": synthetic.symptom_payload(columns, rng)}) for _ in range(n)]
+    if endpoint == "screen":
+        return [("POST", "/screen", {"json": synthetic.screen_payload(rng)}) for _ in range(n)]
+    if endpoint == "ecg":
+        return [
+            ("POST", "/predict/ecg", {"files": {"file": ("ecg.png", synthetic.ecg_image(rng), "image/png")}})
+            for _ in range(n)
+        ]
+    raise ValueError(f"unknown endpoint {endpoint!r}, expected one of {ENDPOINTS}")
+
+
+def summarize(latencies, statuses, wall_s):
+    ms = np.asarray(latencies) * 1000
+    ok = sum(count for status, count in statuses.items() if 200 <= int(status) < 300)
+    return {
+        "requests": len(ms),
+        "ok": ok,
+        "errors": len(ms) - ok,
+        "status": dict(sorted(statuses.items())),
+        "rps": round(len(ms) / wall_s, 2) if wall_s else 0.0,
+        "mean_ms": round(float(ms.mean()), 3) if len(ms) else 0.0,
+        "p50_ms": round(float(np.percentile(ms, 50)), 3) if len(ms) else 0.0,
+        "p95_ms": round(float(np.percentile(ms, 95)), 3) if len(ms) else 0.0,
+        "p99_ms": round(float(np.percentile(ms, 99)), 3) if len(ms) else 0.0,
+        "max_ms": round(float(ms.max()), 3) if len(ms) else 0.0,
+    }
+
+
+async def drive(client, requests, concurrency):
+    latencies, statuses = [], {}
+    pending = iter(requests)
+
+    async def worker():
+        for method, path, kwargs in pending:
+            start = time.perf_counter()
+            try:
+                status = (await client.request(method, path, **kwargs)).status_code
+            except httpx.HTTPError:
+                status = 599  # connection-level failure
+            latencies.append(time.perf_counter() - start)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(max(1, concurrency))])
+    return summarize(latencies, statuses, time.perf_counter() - start)
+
+
+async def run_load(client, endpoints, n, concurrency, seed=0, warmup=10, symptom_columns=None, log=sys.stderr):
+    results = {}
+    for i, endpoint in enumerate(endpoints):
+        requests = build_requests(endpoint, warmup + n, seed + i, symptom_columns)
+        # Untimed warm-up: lazy model loads, first-call allocations
+        await drive(client, requests[:warmup], concurrency)
+        results[endpoint] = stats = await drive(client, requests[warmup:], concurrency)
+        print(
+            f"{endpoint:<12} {stats['rps']:>9.1f} req/s   p50 {stats['p50_ms']:>8.2f} ms   "
+            f"p95 {stats['p95_ms']:>8.2f} ms   p99 {stats['p99_ms']:>8.2f} ms   errors {stats['errors']}",
+            file=log
+        )
+    return results
+
+
+# =====================================================
+# TARGETS
+# =====================================================
+@asynccontextmanager
+async def in_process_client():
+    from app import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://medhive", timeout=60) as client:
+        yield client
+
+
+@asynccontextmanager
+async def url_client(base_url, concurrency):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        yield client
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def local_uvicorn(synthetic_models=True, startup_timeout_s=120):
+    """Start benchmarks.serve on a free port; yields its base URL."""
+    port = free_port()
+    env = dict(os.environ, MEDHIVE_BENCH_SYNTHETIC="1" if synthetic_models else "0")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.serve:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=SERVICE_DIR, env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + startup_timeout_s
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {proc.returncode}")
+            try:
+                if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError("uvicorn did not become healthy in time")
+            time.sleep(0.2)
+        yield base_url
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+async def load_test(target, endpoints, n, concurrency, seed=0, synthetic_models=True, log=sys.stderr):
+    """Run every endpoint against one target; returns {endpoint: stats}."""
+    columns = None
+    if target == "inprocess":
+        from app import MODELS
+
+        if synthetic_models:
+            synthetic.install_synthetic(MODELS)
+        index = MODELS.get("symptom_columns")
+        columns = index.columns if index else None
+        async with in_process_client() as client:
+            return await run_load(client, endpoints, n, concurrency, seed, symptom_columns=columns, log=log)
+
+    if target == "uvicorn":
+        with local_uvicorn(synthetic_models) as base_url:
+            async with url_client(base_url, concurrency) as client:
+                columns = await symptom_columns(client)
+                return await run_load(client, endpoints, n, concurrency, seed, symptom_columns=columns, log=log)
+
+    async with url_client(target, concurrency) as client:
+        columns = await symptom_columns(client)
+        return await run_load(client, endpoints, n, concurrency, seed, symptom_columns=columns, log=log)
+
+
+async def symptom_columns(client):
+    try:
+        response = await client.get("/symptoms")
+        return response.json()["symptoms"] if response.status_code == 200 else None
+    except (httpx.HTTPError, ValueError, KeyError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent load test of the MedHive service")
+    parser.add_argument("--target", default="inprocess", help="inprocess, uvicorn, or a base URL")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-synthetic", action="store_true", help="don't stand in for missing models")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(load_test(
+        args.target, args.endpoints.split(","), args.requests, args.concurrency,
+        args.seed, synthetic_models=not args.no_synthetic
+    ))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# =====================================================
+# BENCHMARK RESULTS AND BASELINE COMPARISON
+# =====================================================
+# Results are plain JSON: a "meta" block (versions, host, which models
+# were synthetic) plus nested metrics. compare() walks the metrics both
+# files share and flags any that got worse by more than the threshold:
+# latencies (*_ms, us_per_call) going up, throughput (rps, rows_per_s)
+# going down. Metrics present in only one file are ignored, so adding an
+# endpoint never fails a comparison.
+import json
+import os
+import platform
+import subprocess
+import time
+
+LOWER_IS_BETTER = ("p50_ms", "p95_ms", "p99_ms", "us_per_call")
+HIGHER_IS_BETTER = ("rps", "rows_per_s")
+
+
+def metadata(synthetic_models=()):
+    import numpy
+    import sklearn
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "sklearn": sklearn.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "synthetic_models": sorted(synthetic_models),
+    }
+
+
+def save(results, path):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def flatten(results, prefix=""):
+    out = {}
+    for key, value in results.items():
+        if key == "meta":
+            continue
+        path = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            out.update(flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            out[path] = float(value)
+    return out
+
+
+def compare(baseline, current, threshold=0.2):
+    """[(metric, baseline, current, change, regressed)] for shared metrics."""
+    base, cur = flatten(baseline), flatten(current)
+    rows = []
+    for metric in sorted(base.keys() & cur.keys()):
+        field = metric.rsplit(".", 1)[-1]
+        if field not in LOWER_IS_BETTER + HIGHER_IS_BETTER or base[metric] == 0:
+            continue
+        change = (cur[metric] - base[metric]) / base[metric]
+        worse = change if field in LOWER_IS_BETTER else -change
+        rows.append((metric, base[metric], cur[metric], change, worse > threshold))
+    return rows
+
+
+def report(rows, log):
+    regressions = [r for r in rows if r[4]]
+    for metric, base, cur, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{metric:<48} {base:>12.2f} -> {cur:>12.2f}  {change:>+7.1%}{flag}", file=log)
+    print(f"{len(regressions)} regression(s) in {len(rows)} compared metrics", file=log)
+    return regressions
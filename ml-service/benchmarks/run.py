@@ -0,0 +1,83 @@
+# =====================================================
+# BENCHMARK SUITE
+# =====================================================
+# Usage: python benchmarks/run.py [--out results.json]
+#                                 [--baseline baseline.json --threshold 0.2]
+#                                 [--targets inprocess,uvicorn] [--quick]
+#
+# Runs the model microbenchmarks (bench_inference.py) and the load test
+# (loadgen.py) against each target and writes one JSON file. With
+# --baseline, exits 1 when any latency or throughput metric is more than
+# --threshold (relative) worse than the baseline. Compare runs from the
+# same machine; numbers across hosts are not comparable.
+#
+# Missing model files are replaced with synthetic models, so the suite
+# runs offline; "meta.synthetic_models" records which ones.
+import argparse
+import asyncio
+import os
+import sys
+import warnings
+
+warnings.filterwarnings("ignore")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import results as bench_results
+from benchmarks import synthetic
+from benchmarks.bench_inference import bench_models
+from benchmarks.loadgen import ENDPOINTS, load_test
+
+
+def run_suite(targets=("inprocess",), endpoints=ENDPOINTS, requests=200, concurrency=8,
+              repeats=50, seed=0, log=sys.stderr):
+    from app import MODELS
+
+    replaced = synthetic.install_synthetic(MODELS)
+    out = {"meta": bench_results.metadata(replaced)}
+    out["meta"].update(requests=requests, concurrency=concurrency, seed=seed)
+
+    print("== inference ==", file=log)
+    out["inference"] = bench_models(MODELS, repeats, log=log)
+
+    out["load"] = {}
+    for target in targets:
+        print(f"== load: {target} (c={concurrency}, n={requests}) ==", file=log)
+        out["load"][target] = asyncio.run(
+            load_test(target, endpoints, requests, concurrency, seed, log=log)
+        )
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MedHive ML service benchmark suite")
+    parser.add_argument("--out", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative slowdown")
+    parser.add_argument("--targets", default="inprocess", help="comma list: inprocess, uvicorn, URLs")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--quick", action="store_true", help="small run for smoke checks")
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.requests, args.repeats = 30, 5
+
+    current = run_suite(
+        args.targets.split(","), args.endpoints.split(","),
+        args.requests, args.concurrency, args.repeats, args.seed
+    )
+    bench_results.save(current, args.out)
+    print(f"✅ Results written to {args.out}", file=sys.stderr)
+
+    if args.baseline:
+        rows = bench_results.compare(bench_results.load(args.baseline), current, args.threshold)
+        if bench_results.report(rows, sys.stderr):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
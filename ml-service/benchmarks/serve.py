@@ -0,0 +1,14 @@
+# =====================================================
+# BENCHMARK SERVER ENTRY POINT
+# =====================================================
+# uvicorn benchmarks.serve:app - the regular app, with synthetic stand-ins
+# for missing models when MEDHIVE_BENCH_SYNTHETIC=1 (see synthetic.py).
+import os
+
+from app import app, MODELS
+from benchmarks.synthetic import install_synthetic
+
+if os.getenv("MEDHIVE_BENCH_SYNTHETIC", "1") == "1":
+    replaced = install_synthetic(MODELS)
+    if replaced:
+        print(f"🧪 Synthetic models: {', '.join(replaced)}")
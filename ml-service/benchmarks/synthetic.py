@@ -0,0 +1,172 @@
+# =====================================================
+# SYNTHETIC INPUTS AND MODELS
+# =====================================================
+# Seeded request payloads and stand-in models so every benchmark runs
+# offline, on CI boxes without the trained artifacts or TensorFlow.
+#
+# Payloads are drawn from clinically plausible ranges and differ from
+# request to request, so the prediction cache does not turn a load test
+# into a cache benchmark. install_synthetic() swaps a stand-in model into
+# the registry only where the real artifact is missing or fails to load;
+# results record which models were synthetic.
+import io
+import os
+
+import numpy as np
+from PIL import Image
+
+# field: (low, high, is_float)
+HEART_RANGES = {
+    "age": (29, 77, False), "sex": (0, 1, False), "cp": (0, 3, False),
+    "trestbps": (94, 200, False), "chol": (126, 564, False), "fbs": (0, 1, False),
+    "restecg": (0, 2, False), "thalach": (71, 202, False), "exang": (0, 1, False),
+    "oldpeak": (0.0, 6.2, True), "slope": (0, 2, False), "ca": (0, 3, False),
+    "thal": (1, 3, False),
+}
+
+DIABETES_RANGES = {
+    "Pregnancies": (0, 12, False), "Glucose": (60, 199, False), "BloodPressure": (40, 110, False),
+    "SkinThickness": (0, 60, False), "Insulin": (0, 500, False), "BMI": (18.0, 50.0, True),
+    "DiabetesPedigreeFunction": (0.08, 2.4, True), "Age": (21, 81, False),
+}
+
+LIVER_RANGES = {
+    "age": (4, 90, False), "gender": (0, 1, False), "total_bilirubin": (0.4, 20.0, True),
+    "direct_bilirubin": (0.1, 10.0, True), "alkaline_phosphotase": (63, 700, False),
+    "alt": (10, 400, False), "ast": (10, 500, False), "total_proteins": (2.7, 9.6, True),
+    "albumin": (0.9, 5.5, True), "ag_ratio": (0.3, 2.8, True),
+}
+
+RANGES = {"heart": HEART_RANGES, "diabetes": DIABETES_RANGES, "liver": LIVER_RANGES}
+
+
+def record(name, rng):
+    out = {}
+    for field, (low, high, is_float) in RANGES[name].items():
+        if is_float:
+            out[field] = round(float(rng.uniform(low, high)), 2)
+        else:
+            out[field] = int(rng.integers(low, high + 1))
+    return out
+
+
+def records(name, n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [record(name, rng) for _ in range(n)]
+
+
+def screen_payload(rng):
+    # One visit for /screen: shared age/sex, liver gender derived
+    liver = {k: v for k, v in record("liver", rng).items() if k not in ("age", "gender")}
+    diabetes = {k: v for k, v in record("diabetes", rng).items() if k != "Age"}
+    return {**record("heart", rng), **diabetes, **liver}
+
+
+def symptom_payload(columns, rng, k=4):
+    picks = rng.choice(len(columns), size=min(k, len(columns)), replace=False)
+    return {"symptoms": [str(columns[i]).replace("_", " ") for i in picks]}
+
+
+def ecg_image(rng, size=(640, 480)):
+    """PNG bytes of a noisy ECG-like trace on a grid."""
+    w, h = size
+    img = np.full((h, w, 3), 250, dtype=np.uint8)
+    img[::20, :, 1:] = 200
+    img[:, ::20, 1:] = 200
+    x = np.arange(w)
+    beat = np.exp(-((x % 120) - 60) ** 2 / 8.0) * h / 3
+    y = (h / 2 - beat + rng.normal(0, 3, w)).clip(0, h - 2).astype(int)
+    img[y, x] = 0
+    img[y + 1, x] = 0
+    buf = io.BytesIO()
+    Image.fromarray(img).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+# =====================================================
+# STAND-IN MODELS
+# =====================================================
+def _fit(model, ranges, seed):
+    rng = np.random.default_rng(seed)
+    lows = np.array([r[0] for r in ranges.values()], dtype=float)
+    highs = np.array([r[1] for r in ranges.values()], dtype=float)
+    X = rng.uniform(lows, highs, size=(2000, len(ranges)))
+    z = (X - lows) / (highs - lows)
+    y = (z @ rng.normal(size=len(ranges)) + rng.normal(0, 0.3, len(X)) > 0).astype(int)
+    return model.fit(X, y)
+
+
+def synthetic_tabular(name, seed=0):
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    from inference import TabularModel
+    from tree_engine import compile_trees
+
+    # Same model families as the real artifacts
+    if name == "heart":
+        model = _fit(LogisticRegression(max_iter=1000), HEART_RANGES, seed)
+    elif name == "diabetes":
+        model = _fit(make_pipeline(StandardScaler(), LogisticRegression()), DIABETES_RANGES, seed)
+    else:
+        forest = RandomForestClassifier(n_estimators=100, max_depth=10, random_state=seed)
+        model = compile_trees(_fit(forest, LIVER_RANGES, seed))
+    return TabularModel(name, model)
+
+
+def synthetic_symptom_model(n_columns, n_classes=41, seed=0):
+    from sklearn.linear_model import LogisticRegression
+
+    rng = np.random.default_rng(seed)
+    X = (rng.random((n_classes * 20, n_columns)) < 0.02).astype(float)
+    y = np.repeat([f"Condition {i}" for i in range(n_classes)], 20)
+    return LogisticRegression(max_iter=200).fit(X, y)
+
+
+class SyntheticECG:
+    """predict_on_batch stand-in: pooled pixels -> fixed projection -> sigmoid."""
+
+    def __init__(self, seed=0):
+        self.weights = np.random.default_rng(seed).normal(0, 0.01, (28 * 28 * 3,)).astype(np.float32)
+
+    def predict_on_batch(self, X):
+        pooled = X.reshape(len(X), 28, 8, 28, 8, 3).mean(axis=(2, 4)).reshape(len(X), -1)
+        return (1 / (1 + np.exp(-(pooled - 0.5) @ self.weights)))[:, None]
+
+
+def _symptom_columns(registry):
+    index = registry.get("symptom_columns")
+    return index.columns if index else [f"symptom_{i:03d}" for i in range(377)]
+
+
+def install_synthetic(registry):
+    """Serve stand-ins for models that are missing; returns their names."""
+    from registry import DISABLED, UNLOADED
+    from symptoms import SymptomIndex
+
+    loaders = {
+        "symptom_columns": lambda: SymptomIndex([f"symptom_{i:03d}" for i in range(377)]),
+        "symptom": lambda: synthetic_symptom_model(len(_symptom_columns(registry))),
+        "heart": lambda: synthetic_tabular("heart"),
+        "diabetes": lambda: synthetic_tabular("diabetes"),
+        "liver": lambda: synthetic_tabular("liver"),
+        "ecg": SyntheticECG,
+    }
+
+    replaced = []
+    for name, loader in loaders.items():
+        entry = registry.entries.get(name)
+        if entry is None or entry.state == DISABLED:
+            continue
+        # Don't try to load what isn't there (keeps the error log clean)
+        if entry.path is not None and os.path.exists(entry.path) and registry.get(name) is not None:
+            continue
+        entry.loader = loader
+        entry.path = None
+        entry.state = UNLOADED
+        entry.error = None
+        registry.get(name)
+        replaced.append(name)
+    return replaced
@@ -0,0 +1,194 @@
+# =====================================================
+# BULK CSV / PARQUET SCORING
+# =====================================================
+# Backfills risk scores for historical records without per-record HTTP:
+#
+#   python bulk_score.py heart patients.csv scored.csv --workers 4
+#
+# Input is read in fixed-size chunks (CSV via pandas, Parquet via pyarrow
+# row batches), each chunk is scored with one vectorized model call, and
+# results are appended to the output as they finish, so memory stays
+# bounded by chunk_rows x in-flight chunks whatever the file size.
+#
+# Columns may use either the API field names (HeartInput etc.) or the
+# training column names stored in the model (e.g. "Chest pain type"),
+# matched case-insensitively. Rows are checked against the model's schema
+# like Arrow / MessagePack bodies (wire_formats.validate_columns): missing,
+# non-numeric, non-finite or fractional-integer values get an error
+# instead of a score. The same pieces back the
+# /predict/{model}/bulk upload endpoint in app.py; pandas is imported on
+# first use so importing this module does not pull it into app startup.
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+CHUNK_ROWS = int(os.getenv("MEDHIVE_BULK_CHUNK_ROWS", "5000"))
+RESULT_COLUMNS = ["prediction", "probability", "is_danger", "raw_model_label", "model_version"]
+
+
+def detect_format(name):
+    return "parquet" if str(name).lower().endswith((".parquet", ".pq")) else "csv"
+
+
+def iter_chunks(source, fmt="csv", chunk_rows=CHUNK_ROWS):
+    import pandas as pd
+
+    if fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet support needs pyarrow (pip install pyarrow)")
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, chunksize=chunk_rows)
+
+
+def feature_columns(columns, fields, feature_names=None):
+    """Input column for each model feature, in model order."""
+    lookup = {str(c).strip().lower(): c for c in columns}
+    resolved, missing = [], []
+    for i, field in enumerate(fields):
+        candidates = [field] if feature_names is None else [field, feature_names[i]]
+        match = next((lookup[c.lower()] for c in candidates if c.lower() in lookup), None)
+        if match is None:
+            missing.append(field)
+        resolved.append(match)
+    if missing:
+        raise ValueError(f"missing columns: {missing}")
+    return resolved
+
+
+def score_frame(df, columns, schema, score):
+    import pandas as pd
+
+    from wire_formats import error_text, validate_columns
+
+    values = df[columns].apply(pd.to_numeric, errors="coerce")
+    X, errors = validate_columns(
+        {field: values[column].to_numpy() for field, column in zip(schema.model_fields, columns)},
+        schema, len(df)
+    )
+    valid = np.ones(len(df), dtype=bool)
+    valid[list(errors)] = False
+
+    out = df.copy()
+    for column in RESULT_COLUMNS:
+        out[column] = None
+    out["error"] = ""
+    if errors:
+        out.loc[~valid, "error"] = [error_text(errors[i]) for i in sorted(errors)]
+    if valid.any():
+        results = pd.DataFrame(score(X[valid]), index=df.index[valid])
+        for column in RESULT_COLUMNS:
+            out.loc[valid, column] = results[column].to_numpy()
+    return out
+
+
+# =====================================================
+# OUTPUT
+# =====================================================
+class CsvSink:
+    def __init__(self, path):
+        self.f = open(path, "w", newline="")
+        self.header = True
+
+    def write(self, frame):
+        frame.to_csv(self.f, index=False, header=self.header)
+        self.header = False
+
+    def close(self):
+        self.f.close()
+
+
+class ParquetSink:
+    def __init__(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa, self.pq = pa, pq
+        self.path = path
+        self.writer = None
+
+    def write(self, frame):
+        # Mixed object columns are written as strings for a stable schema
+        table = self.pa.Table.from_pandas(frame.astype({c: str for c in RESULT_COLUMNS}), preserve_index=False)
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+# =====================================================
+# CLI
+# =====================================================
+def _score_chunk(model, df):
+    # Runs in the worker; app (and the model) load once per process
+    from app import score_bulk_chunk
+    return score_bulk_chunk(model, df)
+
+
+def _ordered(pool, model, chunks, window):
+    # At most `window` chunks in flight; results come back in input order
+    pending = deque()
+    for df in chunks:
+        pending.append(pool.submit(_score_chunk, model, df))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def run(model, source, output, workers=1, chunk_rows=CHUNK_ROWS, log=sys.stderr):
+    chunks = iter_chunks(source, detect_format(source), chunk_rows)
+    sink = ParquetSink(output) if detect_format(output) == "parquet" else CsvSink(output)
+
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        frames = _ordered(pool, model, chunks, window=2 * workers)
+    else:
+        frames = (_score_chunk(model, df) for df in chunks)
+
+    start = time.perf_counter()
+    rows = failed = 0
+    try:
+        for frame in frames:
+            sink.write(frame)
+            rows += len(frame)
+            failed += int((frame["error"] != "").sum())
+            elapsed = time.perf_counter() - start
+            print(f"\r{rows} rows, {rows / elapsed:,.0f} rows/s", end="", file=log)
+    finally:
+        sink.close()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ Scored {rows} rows ({failed} failed) in {elapsed:.1f}s "
+          f"- {rows / elapsed if elapsed else 0:,.0f} rows/s", file=log)
+    return rows, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a CSV/Parquet file with a MedHive model")
+    parser.add_argument("model", choices=["heart", "diabetes", "liver"])
+    parser.add_argument("input", help="CSV or .parquet file")
+    parser.add_argument("output", help="CSV or .parquet file to write")
+    parser.add_argument("--workers", type=int, default=1, help="score chunks in N processes")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args(argv)
+    run(args.model, args.input, args.output, workers=args.workers, chunk_rows=args.chunk_rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+# =====================================================
+# STREAMING INPUT DRIFT MONITOR
+# =====================================================
+# Usage: python drift.py reference heart training.csv [--out PATH]
+#
+# Every scored record updates constant-memory sketches per input field
+# and for the output probability:
+#   numeric fields      running mean/variance (Welford), min/max and a
+#                       merging t-digest (~2 * DIGEST_DELTA centroids)
+#   categorical fields  value counts, capped at MAX_CATEGORIES values
+# An update is a few float ops and a list append per field. The digest
+# compresses its buffer every DIGEST_BUFFER values in a handful of
+# vectorized NumPy passes (~0.1 ms), and the fields of a model start
+# compressing at staggered fills, so no single request pays for all of
+# them at once.
+#
+# A reference snapshot (101 quantiles or category shares per field) is
+# compared against the live sketches with PSI over the reference deciles
+# and the two-sample KS statistic on the quantile functions. Reference
+# snapshots come from freezing live traffic
+# (POST /admin/drift/reference) or from a training CSV via the CLI above.
+import argparse
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+import numpy as np
+
+DIGEST_DELTA = int(os.getenv("MEDHIVE_DRIFT_DELTA", "100"))
+DIGEST_BUFFER = 512
+MAX_CATEGORIES = 32
+MIN_COUNT = int(os.getenv("MEDHIVE_DRIFT_MIN_COUNT", "100"))
+PSI_WARN = float(os.getenv("MEDHIVE_DRIFT_PSI_WARN", "0.1"))
+PSI_ALERT = float(os.getenv("MEDHIVE_DRIFT_PSI_ALERT", "0.25"))
+KS_ALERT = float(os.getenv("MEDHIVE_DRIFT_KS_ALERT", "0.15"))
+
+QUANTILES = np.linspace(0, 1, 101)
+REFERENCE_FORMAT = "medhive-drift-reference"
+
+
+class TDigest:
+    """Merging t-digest (Dunning) with the k1 arcsine scale function."""
+
+    def __init__(self, delta=DIGEST_DELTA, buffer_size=DIGEST_BUFFER, stagger=0):
+        self.delta = delta
+        self.buffer_size = buffer_size
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.buffer = []
+        # The first compression comes early by `stagger` values
+        self.flush_at = max(1, buffer_size - stagger)
+
+    def add(self, x):
+        self.buffer.append(x)
+        if len(self.buffer) >= self.flush_at:
+            self.compress()
+
+    @property
+    def count(self):
+        return float(self.weights.sum()) + len(self.buffer)
+
+    def _k(self, q):
+        return self.delta / (2 * np.pi) * np.arcsin(2 * np.clip(q, 0.0, 1.0) - 1)
+
+    def compress(self):
+        self.flush_at = self.buffer_size
+        if not self.buffer:
+            return
+        means = np.concatenate([self.means, np.asarray(self.buffer, dtype=float)])
+        weights = np.concatenate([self.weights, np.ones(len(self.buffer))])
+        self.buffer = []
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+
+        # Centroids are merged within half-unit steps of the k scale,
+        # placed by the weight to their left: an output spans k <= 1/2
+        # plus at most one input centroid, so it stays within the k <= 1
+        # limit of the sequential merge without its Python loop
+        cumulative = np.cumsum(weights)
+        k_left = self._k((cumulative - weights) / cumulative[-1])
+        bucket = np.floor(2 * (k_left - self._k(0.0)))
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(bucket)) + 1])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantiles(self, qs, lo, hi):
+        self.compress()
+        if not len(self.means):
+            return np.full(len(qs), np.nan)
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0.0], centers, [self.weights.sum()]])
+        values = np.concatenate([[lo], self.means, [hi]])
+        return np.interp(np.asarray(qs) * self.weights.sum(), positions, values)
+
+
+class NumericSketch:
+    kind = "numeric"
+
+    def __init__(self, stagger=0):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.digest = TDigest(stagger=stagger)
+
+    def add(self, x):
+        self.count += 1
+        d = x - self.mean
+        self.mean += d / self.count
+        self.m2 += d * (x - self.mean)
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+        self.digest.add(x)
+
+    def summary(self):
+        if not self.count:
+            return {"kind": self.kind, "count": 0}
+        qs = self.digest.quantiles(QUANTILES, self.min, self.max)
+        return {
+            "kind": self.kind,
+            "count": self.count,
+            "mean": round(self.mean, 6),
+            "std": round(math.sqrt(self.m2 / self.count), 6),
+            "min": self.min,
+            "max": self.max,
+            "p05": round(float(qs[5]), 6),
+            "p50": round(float(qs[50]), 6),
+            "p95": round(float(qs[95]), 6),
+            "quantiles": [round(float(q), 6) for q in qs],
+        }
+
+
+class CategoricalSketch:
+    kind = "categorical"
+
+    def __init__(self, max_categories=MAX_CATEGORIES):
+        self.count = 0
+        self.counts = {}
+        self.max_categories = max_categories
+
+    def add(self, x):
+        self.count += 1
+        key = str(int(x)) if float(x).is_integer() else str(x)
+        if key not in self.counts and len(self.counts) >= self.max_categories:
+            key = "other"
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    def summary(self):
+        return {"kind": self.kind, "count": self.count, "counts": dict(sorted(self.counts.items()))}
+
+
+# =====================================================
+# COMPARISON
+# =====================================================
+def _cdf(quantiles, x):
+    # Empirical CDF of a 101-point quantile function (step, right-closed)
+    return np.searchsorted(quantiles, x, side="right") / len(quantiles)
+
+
+def psi(expected, actual, eps=1e-4):
+    expected = np.clip(np.asarray(expected, dtype=float), eps, None)
+    actual = np.clip(np.asarray(actual, dtype=float), eps, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def compare_numeric(reference, live):
+    ref_q, live_q = np.asarray(reference["quantiles"]), np.asarray(live["quantiles"])
+    edges = np.unique(ref_q[10:100:10])
+    shares = lambda q: np.diff(np.concatenate([[0.0], _cdf(q, edges), [1.0]]))
+    grid = np.union1d(ref_q, live_q)
+    return {
+        "psi": round(psi(shares(ref_q), shares(live_q)), 4),
+        "ks": round(float(np.abs(_cdf(ref_q, grid) - _cdf(live_q, grid)).max()), 4),
+    }
+
+
+def compare_categorical(reference, live):
+    keys = sorted(set(reference["counts"]) | set(live["counts"]))
+    ref_total = sum(reference["counts"].values()) or 1
+    live_total = sum(live["counts"].values()) or 1
+    expected = [reference["counts"].get(k, 0) / ref_total for k in keys]
+    actual = [live["counts"].get(k, 0) / live_total for k in keys]
+    return {"psi": round(psi(expected, actual), 4), "ks": None}
+
+
+def drift_status(result, count):
+    if count < MIN_COUNT:
+        return "insufficient_data"
+    if result["psi"] >= PSI_ALERT or (result["ks"] is not None and result["ks"] >= KS_ALERT):
+        return "drift"
+    if result["psi"] >= PSI_WARN:
+        return "warn"
+    return "ok"
+
+
+# =====================================================
+# MONITOR
+# =====================================================
+class ModelDrift:
+    def __init__(self, fields, categorical=()):
+        self.fields = list(fields)
+        # Every field sees every record; spread their digests' compressions
+        # evenly over the buffer instead of all on the same request
+        numeric = [f for f in self.fields if f not in categorical] + ["probability"]
+        step = DIGEST_BUFFER // len(numeric)
+        stagger = {f: i * step for i, f in enumerate(numeric)}
+        self.sketches = [
+            CategoricalSketch() if f in categorical else NumericSketch(stagger[f]) for f in self.fields
+        ]
+        self.probability = NumericSketch(stagger["probability"])
+        self.lock = threading.Lock()
+
+    def observe(self, rows, probabilities=()):
+        with self.lock:
+            for row in rows:
+                for sketch, value in zip(self.sketches, row):
+                    if value is not None:
+                        sketch.add(float(value))
+            for p in probabilities:
+                if p is not None:
+                    self.probability.add(float(p))
+
+    def snapshot(self):
+        with self.lock:
+            features = {f: s.summary() for f, s in zip(self.fields, self.sketches)}
+            features["probability"] = self.probability.summary()
+        return features
+
+
+class DriftMonitor:
+    def __init__(self, reference_path=None):
+        self.models = {}
+        self.reference_path = reference_path
+        self.reference = None
+        if reference_path and os.path.exists(reference_path):
+            try:
+                self.reference = load_reference(reference_path)
+            except (OSError, ValueError):
+                logging.error(f"Ignoring unreadable drift reference {reference_path}", exc_info=True)
+
+    def register(self, name, fields, categorical=()):
+        self.models[name] = ModelDrift(fields, categorical)
+
+    def observe(self, name, rows, probabilities=()):
+        monitor = self.models.get(name)
+        if monitor is not None:
+            monitor.observe(rows, probabilities)
+
+    def snapshot(self, names=None):
+        return {name: self.models[name].snapshot() for name in (names or self.models)}
+
+    def report(self):
+        reference = (self.reference or {}).get("models", {})
+        models = {}
+        for name, features in self.snapshot().items():
+            drifted = []
+            for field, live in features.items():
+                ref = reference.get(name, {}).get(field)
+                # Older baselines may still hold empty fields
+                if ref is None or not ref.get("count") or not live["count"] or ref.get("kind") != live["kind"]:
+                    continue
+                compare = compare_numeric if live["kind"] == "numeric" else compare_categorical
+                live.update(compare(ref, live))
+                live["status"] = drift_status(live, live["count"])
+                if live["status"] in ("warn", "drift"):
+                    drifted.append(field)
+            for live in features.values():
+                live.pop("quantiles", None)
+            models[name] = {"features": features, "drifted": drifted}
+        return {
+            "reference": None if self.reference is None else {
+                "path": self.reference_path, "created": self.reference.get("created")
+            },
+            "thresholds": {"psi_warn": PSI_WARN, "psi_alert": PSI_ALERT, "ks_alert": KS_ALERT, "min_count": MIN_COUNT},
+            "models": models,
+        }
+
+    def freeze(self, names=None, path=None):
+        """Save the live sketches as the reference, merged per field.
+
+        Fields nothing has been observed for are left out (they would
+        freeze an empty distribution) and keep any earlier reference.
+        Raises ValueError when a requested model has nothing to freeze."""
+        path = path or self.reference_path
+        frozen = {}
+        for name, features in self.snapshot(names).items():
+            features = {field: summary for field, summary in features.items() if summary["count"]}
+            if features:
+                frozen[name] = features
+        empty = [name for name in names or [] if name not in frozen]
+        if empty or not frozen:
+            raise ValueError(f"No traffic observed for {empty or sorted(self.models)}, nothing to freeze")
+
+        reference = self.reference or {"format": REFERENCE_FORMAT, "models": {}}
+        for name, features in frozen.items():
+            reference["models"].setdefault(name, {}).update(features)
+        reference["created"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        save_reference(reference, path)
+        self.reference = reference
+        return reference
+
+
+def save_reference(reference, path):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(reference, f)
+    os.replace(tmp, path)
+
+
+def load_reference(path):
+    with open(path) as f:
+        reference = json.load(f)
+    if reference.get("format") != REFERENCE_FORMAT:
+        raise ValueError(f"{path} is not a drift reference")
+    return reference
+
+
+def main(argv=None):
+    import warnings
+
+    warnings.filterwarnings("ignore")
+    from app import DRIFT, DRIFT_REFERENCE, SCREENS, bulk_columns, score_bulk_chunk
+    from bulk_score import detect_format, iter_chunks
+
+    parser = argparse.ArgumentParser(description="Build a drift reference from a training file")
+    parser.add_argument("command", choices=["reference"])
+    parser.add_argument("model", choices=list(SCREENS))
+    parser.add_argument("input", help="CSV or .parquet with the model's input columns")
+    parser.add_argument("--out", default=DRIFT_REFERENCE)
+    args = parser.parse_args(argv)
+
+    DRIFT.reference_path = args.out
+    rows = 0
+    for df in iter_chunks(args.input, detect_format(args.input)):
+        scored = score_bulk_chunk(args.model, df)
+        valid = scored["error"] == ""
+        columns = bulk_columns(args.model, df.columns)
+        X = scored.loc[valid, columns].astype(float).to_numpy()
+        DRIFT.observe(args.model, X.tolist(), scored.loc[valid, "probability"].astype(float).tolist())
+        rows += int(valid.sum())
+    DRIFT.freeze([args.model], args.out)
+    print(f"✅ Drift reference for {args.model} from {rows} rows written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
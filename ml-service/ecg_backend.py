@@ -0,0 +1,258 @@
+# =====================================================
+# OPTIMIZED ECG INFERENCE BACKENDS
+# =====================================================
+# MEDHIVE_ECG_BACKEND picks how the Keras ECG model is served:
+#   keras        the model as loaded (default)
+#   tflite       TFLite, dynamic-range quantization (int8 weights)
+#   tflite-int8  TFLite, full int8 quantization calibrated on ECG images
+#   xla          XLA-compiled tf.function with a fixed input signature
+#
+# Converted models are cached under MODEL_DIR/.compiled/ keyed by the
+# artifact version (and, for int8, a hash of the calibration images and
+# the hold-out split), so conversion happens once (or ahead of time with
+# `python ecg_backend.py tflite-int8`). Every optimized backend must match
+# Keras on the parity images within MEDHIVE_ECG_PARITY_TOLERANCE; if it
+# does not, the Keras model keeps serving.
+#
+# Parity images are real ECG scans in MEDHIVE_ECG_PARITY_DIR. tflite-int8
+# calibrates on every other image and is checked on the rest, so the gate
+# never scores its own calibration data. Without real images no optimized
+# backend is served; MEDHIVE_ECG_SYNTHETIC_PARITY=1 opts into random inputs,
+# which check the conversion numerics but say nothing about accuracy.
+#
+# All backends expose predict_on_batch(X) -> (n, 1) like Keras.
+import glob
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from ecg_preprocess import ECG_SHAPE, decode_ecg_image, normalize_into
+
+BACKENDS = ("keras", "tflite", "tflite-int8", "xla")
+QUANTIZATION = {"tflite": "dynamic", "tflite-int8": "int8"}
+ECG_BACKEND = os.getenv("MEDHIVE_ECG_BACKEND", "keras")
+PARITY_TOLERANCE = float(os.getenv("MEDHIVE_ECG_PARITY_TOLERANCE", "0.02"))
+PARITY_DIR = os.getenv("MEDHIVE_ECG_PARITY_DIR")  # default: MODEL_DIR/ecg_parity
+PARITY_SAMPLES = 64
+SYNTHETIC_PARITY = os.getenv("MEDHIVE_ECG_SYNTHETIC_PARITY", "0") == "1"
+TFLITE_THREADS = int(os.getenv("MEDHIVE_ECG_TFLITE_THREADS", str(os.cpu_count() or 1)))
+
+
+class ParityError(Exception):
+    pass
+
+
+def compiled_cache_path(path, version, backend, calibration=None):
+    directory = os.path.join(os.path.dirname(path), ".compiled")
+    mode = QUANTIZATION[backend]
+    if calibration is not None:
+        # A new calibration set must not reuse the old quantized model
+        mode = f"{mode}-{calibration_digest(calibration)}"
+    name = f"{os.path.basename(path)}.{version or 'unversioned'}.{mode}.tflite"
+    return os.path.join(directory, name)
+
+
+def calibration_digest(images):
+    digest = hashlib.sha256(f"{CALIBRATION_SPLIT}:{images.dtype}:{images.shape}".encode())
+    digest.update(np.ascontiguousarray(images).data)
+    return digest.hexdigest()[:12]
+
+
+def parity_images(directory, limit=2 * PARITY_SAMPLES):
+    """ECG images as one float32 batch, preprocessed like /predict/ecg, or
+    None when the directory has none."""
+    files = []
+    if directory and os.path.isdir(directory):
+        for ext in ("png", "jpg", "jpeg"):
+            files += glob.glob(os.path.join(directory, f"*.{ext}"))
+    files = sorted(files)[:limit]
+    if not files:
+        return None
+
+    batch = np.empty((len(files),) + ECG_SHAPE, dtype=np.float32)
+    for slot, name in zip(batch, files):
+        with open(name, "rb") as f:
+            arr, _ = decode_ecg_image(f.read())
+        normalize_into(arr, slot)
+    return batch
+
+
+def synthetic_images(n=16):
+    return np.random.default_rng(0).random((n,) + ECG_SHAPE, dtype=np.float32)
+
+
+# Part of the int8 cache key: changing the split changes the artifact
+CALIBRATION_SPLIT = "odd/even"
+
+
+def split_calibration(images):
+    """(calibration, parity): disjoint halves, interleaved so both cover
+    the directory evenly."""
+    if len(images) < 2:
+        raise ParityError("int8 calibration needs at least 2 ECG images (one to calibrate, one to check)")
+    return images[1::2], images[0::2]
+
+
+def parity_check(reference, candidate, images, tolerance=PARITY_TOLERANCE):
+    expected = np.asarray(reference.predict_on_batch(images), dtype=np.float64)[:, 0]
+    got = np.asarray(candidate.predict_on_batch(images), dtype=np.float64)[:, 0]
+    report = {
+        "samples": len(images),
+        "max_abs_error": round(float(np.max(np.abs(expected - got))), 6),
+        "mean_abs_error": round(float(np.mean(np.abs(expected - got))), 6),
+        "label_flips": int(np.sum((expected > 0.5) != (got > 0.5))),
+        "tolerance": tolerance,
+    }
+    if report["max_abs_error"] > tolerance:
+        raise ParityError(f"ECG backend differs from Keras: {report}")
+    return report
+
+
+# =====================================================
+# TFLITE
+# =====================================================
+def convert_tflite(model, out_path, int8=False, representative=None):
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if int8:
+        # Float in/out with int8 kernels inside, so callers are unchanged
+        converter.representative_dataset = lambda: ([x[np.newaxis]] for x in representative)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    content = converter.convert()
+
+    # Write then rename so concurrent workers never load a partial file
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(out_path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp, out_path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return out_path
+
+
+class TFLiteModel:
+    def __init__(self, path, num_threads=TFLITE_THREADS):
+        self.path = path
+        self.num_threads = num_threads
+        self.model_bytes = os.path.getsize(path)
+        # One interpreter per power-of-two batch size, so micro-batches of
+        # varying size do not reallocate tensors on every call
+        self._interpreters = {}
+        self._lock = threading.Lock()
+
+    def _interpreter(self, batch_size):
+        interpreter = self._interpreters.get(batch_size)
+        if interpreter is None:
+            import tensorflow as tf
+
+            interpreter = tf.lite.Interpreter(model_path=self.path, num_threads=self.num_threads)
+            index = interpreter.get_input_details()[0]["index"]
+            interpreter.resize_tensor_input(index, [batch_size, *ECG_SHAPE])
+            interpreter.allocate_tensors()
+            self._interpreters[batch_size] = interpreter
+        return interpreter
+
+    def predict_on_batch(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        n = len(X)
+        size = 1 << max(0, n - 1).bit_length()
+        if size != n:
+            X = np.concatenate([X, np.zeros((size - n,) + X.shape[1:], dtype=np.float32)])
+
+        # Interpreters are not thread-safe
+        with self._lock:
+            interpreter = self._interpreter(size)
+            interpreter.set_tensor(interpreter.get_input_details()[0]["index"], X)
+            interpreter.invoke()
+            out = interpreter.get_tensor(interpreter.get_output_details()[0]["index"])
+        return out[:n].copy()
+
+
+# =====================================================
+# XLA
+# =====================================================
+class XLAModel:
+    def __init__(self, model):
+        import tensorflow as tf
+
+        self.model = model
+        self._fn = tf.function(
+            lambda x: model(x, training=False),
+            jit_compile=True,
+            input_signature=[tf.TensorSpec((None,) + ECG_SHAPE, tf.float32)],
+        )
+
+    def count_params(self):
+        return self.model.count_params()
+
+    def predict_on_batch(self, X):
+        return self._fn(np.asarray(X, dtype=np.float32)).numpy()
+
+
+def build_backend(model, path, version=None, backend=None, images=None, parity_dir=None):
+    """Optimized stand-in for the Keras model, or the model itself."""
+    backend = backend or ECG_BACKEND
+    if backend == "keras":
+        return model
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown ECG backend {backend!r}, expected one of {BACKENDS}")
+
+    if images is None:
+        images = parity_images(parity_dir or PARITY_DIR or os.path.join(os.path.dirname(path), "ecg_parity"))
+    try:
+        if images is None:
+            if not SYNTHETIC_PARITY:
+                raise ParityError(
+                    "no ECG parity images; add some to MEDHIVE_ECG_PARITY_DIR "
+                    "or set MEDHIVE_ECG_SYNTHETIC_PARITY=1 to check numerics only"
+                )
+            print("⚠️ No ECG parity images, checking on synthetic inputs (numerics only)")
+            images = synthetic_images()
+
+        calibration = None
+        if backend == "tflite-int8":
+            calibration, images = split_calibration(images)
+        if backend == "xla":
+            candidate = XLAModel(model)
+        else:
+            cache = compiled_cache_path(path, version, backend, calibration)
+            if not os.path.exists(cache):
+                convert_tflite(model, cache, int8=calibration is not None, representative=calibration)
+            candidate = TFLiteModel(cache)
+        candidate.parity = parity_check(model, candidate, images)
+    except Exception:
+        logging.error(f"ECG backend {backend} rejected, serving Keras", exc_info=True)
+        print(f"❌ ECG backend {backend} rejected, serving Keras (see medhive_errors.log)")
+        return model
+
+    print(f"⚡ ECG backend {backend}: max error {candidate.parity['max_abs_error']}")
+    return candidate
+
+
+if __name__ == "__main__":
+    # Ahead-of-time conversion + parity report:
+    #   python ecg_backend.py tflite-int8 [parity_image_dir]
+    import sys
+
+    from tensorflow.keras.models import load_model
+
+    from registry import artifact_version
+
+    backend = sys.argv[1] if len(sys.argv) > 1 else "tflite"
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "ecg_heart_model_final.keras")
+    directory = sys.argv[2] if len(sys.argv) > 2 else os.path.join(os.path.dirname(path), "ecg_parity")
+
+    served = build_backend(
+        load_model(path, compile=False), path, artifact_version(path),
+        backend=backend, parity_dir=directory
+    )
+    print(getattr(served, "parity", "Keras model kept"))
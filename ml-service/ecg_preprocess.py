@@ -0,0 +1,176 @@
+# =====================================================
+# ECG IMAGE PREPROCESSING
+# =====================================================
+# Kept free of TensorFlow and app imports so it can run in a spawned
+# process pool without loading any models.
+#
+# Pipeline: the upload is read in chunks up to MAX_UPLOAD_BYTES, the
+# image header is checked against MAX_PIXELS before any pixel is decoded,
+# JPEGs are decoded at reduced size with draft() (DCT scaling), and the
+# 224x224 result travels as uint8. Scaling to float32 happens only once,
+# straight into the batcher's preallocated input (BatchBuffer).
+import io
+import os
+import threading
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw, UnidentifiedImageError
+
+ECG_SIZE = (224, 224)
+ECG_SHAPE = ECG_SIZE + (3,)
+
+MAX_UPLOAD_BYTES = int(os.getenv("MEDHIVE_ECG_MAX_UPLOAD_BYTES", str(10 * 2**20)))
+MAX_PIXELS = int(os.getenv("MEDHIVE_ECG_MAX_PIXELS", str(40_000_000)))
+DRAFT_DECODE = os.getenv("MEDHIVE_ECG_DRAFT_DECODE", "1") == "1"
+MAX_SIGNAL_SAMPLES = int(os.getenv("MEDHIVE_ECG_MAX_SIGNAL_SAMPLES", "20000"))
+READ_CHUNK = 1 << 16
+
+SCALE = np.float32(255.0)
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+class ImageTooLarge(InvalidImage):
+    pass
+
+
+async def read_upload(file, max_bytes=MAX_UPLOAD_BYTES):
+    # Stops at the limit instead of buffering an arbitrarily large body
+    size = getattr(file, "size", None)
+    if size is not None and size > max_bytes:
+        raise ImageTooLarge(f"upload exceeds {max_bytes} bytes")
+
+    buf = bytearray()
+    while True:
+        chunk = await file.read(READ_CHUNK)
+        if not chunk:
+            return bytes(buf)
+        buf += chunk
+        if len(buf) > max_bytes:
+            raise ImageTooLarge(f"upload exceeds {max_bytes} bytes")
+
+
+def decode_ecg_image(contents, max_pixels=MAX_PIXELS, draft=DRAFT_DECODE):
+    """uint8 (224, 224, 3) image plus decode/resize timings in ms."""
+    start = time.perf_counter()
+    try:
+        img = Image.open(io.BytesIO(contents))  # parses the header only
+    except Image.DecompressionBombError as e:
+        raise ImageTooLarge(str(e))
+    except (UnidentifiedImageError, OSError, SyntaxError) as e:
+        raise InvalidImage(f"not a readable image: {e}")
+
+    if img.width * img.height > max_pixels:
+        raise ImageTooLarge(f"image has {img.width}x{img.height} pixels, limit is {max_pixels}")
+
+    try:
+        if draft:
+            # JPEG only (no-op otherwise): decode at the smallest 1/2^n
+            # scale that is still at least 224x224
+            img.draft("RGB", ECG_SIZE)
+        img = img.convert("RGB")
+    except (OSError, SyntaxError, ValueError) as e:
+        raise InvalidImage(f"image could not be decoded: {e}")
+    decoded = time.perf_counter()
+
+    arr = np.asarray(img.resize(ECG_SIZE, Image.BICUBIC), dtype=np.uint8)
+    resized = time.perf_counter()
+    return arr, {
+        "decode": (decoded - start) * 1000,
+        "resize": (resized - decoded) * 1000,
+    }
+
+
+def render_signal(samples, max_samples=MAX_SIGNAL_SAMPLES):
+    """uint8 (224, 224, 3) strip of a raw signal window plus render time in ms.
+
+    Light grid, black trace scaled to the window's own range; no
+    calibration to mV or paper speed.
+    """
+    start = time.perf_counter()
+    try:
+        y = np.asarray(samples, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise InvalidImage("signal samples must be numbers")
+    if y.ndim != 1 or len(y) < 2:
+        raise InvalidImage("signal needs a flat list of at least 2 samples")
+    if len(y) > max_samples:
+        raise ImageTooLarge(f"signal has {len(y)} samples, limit is {max_samples}")
+    if not np.isfinite(y).all():
+        raise InvalidImage("signal has non-finite samples")
+
+    w, h = ECG_SIZE
+    img = Image.new("RGB", ECG_SIZE, (250, 250, 250))
+    draw = ImageDraw.Draw(img)
+    for col in range(0, w, w // 10):
+        draw.line([(col, 0), (col, h - 1)], fill=(240, 200, 200))
+    for row in range(0, h, h // 10):
+        draw.line([(0, row), (w - 1, row)], fill=(240, 200, 200))
+
+    span = float(y.max() - y.min()) or 1.0
+    xs = np.linspace(0, w - 1, len(y))
+    ys = (h - 1) * (0.9 - 0.8 * (y - y.min()) / span)
+    draw.line(list(zip(xs.tolist(), ys.tolist())), fill=(0, 0, 0), width=1)
+
+    arr = np.asarray(img, dtype=np.uint8)
+    return arr, {"render": (time.perf_counter() - start) * 1000}
+
+
+def normalize_into(arr, out):
+    # Same values as np.asarray(img, dtype=float32) / 255.0, with no temporaries
+    return np.divide(arr, SCALE, out=out, dtype=np.float32)
+
+
+def load_ecg_image(contents):
+    # Same as keras img_to_array(img) / 255.0
+    arr, _ = decode_ecg_image(contents)
+    return normalize_into(arr, np.empty(ECG_SHAPE, dtype=np.float32))
+
+
+class BatchBuffer:
+    """Preallocated float32 model input the ECG batcher normalizes into."""
+
+    def __init__(self, max_batch_size, shape=ECG_SHAPE):
+        self.data = np.empty((max_batch_size,) + tuple(shape), dtype=np.float32)
+
+    def collate(self, items):
+        # Only safe for one batch at a time; MicroBatcher runs its flushes
+        # sequentially, and the model copies its input before returning.
+        out = self.data[:len(items)]
+        for slot, item in zip(out, items):
+            normalize_into(item, slot)
+        return out
+
+
+# =====================================================
+# PER-STAGE TIMINGS
+# =====================================================
+class StageStats:
+    def __init__(self, stages):
+        self._lock = threading.Lock()
+        self.stages = list(stages)
+        self.count = 0
+        self.total = dict.fromkeys(self.stages, 0.0)
+        self.max = dict.fromkeys(self.stages, 0.0)
+
+    def record(self, timings):
+        with self._lock:
+            self.count += 1
+            for stage in self.stages:
+                ms = timings.get(stage, 0.0)
+                self.total[stage] += ms
+                self.max[stage] = max(self.max[stage], ms)
+
+    def snapshot(self):
+        return {
+            "requests": self.count,
+            "avg_ms": {s: round(self.total[s] / self.count, 3) if self.count else 0.0 for s in self.stages},
+            "max_ms": {s: round(self.max[s], 3) for s in self.stages},
+        }
+
+
+def server_timing(timings):
+    return ", ".join(f"{stage};dur={ms:.2f}" for stage, ms in timings.items())
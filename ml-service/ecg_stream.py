@@ -0,0 +1,229 @@
+# =====================================================
+# ECG WEBSOCKET STREAMING
+# =====================================================
+# Monitoring stations keep one WebSocket open (/ws/ecg in app.py) and
+# send snapshots as they come:
+#   binary message                        an encoded image (PNG/JPEG), the
+#                                         same bytes /predict/ecg takes
+#   {"type": "signal", "samples": [...]}  a raw signal window, rendered
+#                                         server-side (render_signal)
+#   {"type": "stats"}                     this connection's stats
+# Every frame gets a seq number on arrival and is answered in order with
+# {"type": "result", "seq": ...} or {"type": "error", "seq": ...}.
+#
+# Flow control is per connection: one frame is scored at a time (the
+# shared ECG batcher still batches across connections) and at most
+# max_queue frames wait behind it. A client that sends faster than the
+# model scores loses its oldest waiting frames, so results stay current
+# instead of falling further behind; the gap shows in seq and in the
+# "dropped" count on every result.
+#
+# Everything sent back goes through one bounded outbox drained by a
+# sender task; the receive loop never writes to the socket itself. A
+# client that stops reading fills the outbox: its scorer then waits for
+# room (so incoming frames drop as above) and stats/error replies are
+# dropped and counted in "dropped_replies", so reading the stream never
+# blocks and nothing piles up in memory.
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+from starlette.websockets import WebSocketDisconnect
+
+STREAM_QUEUE = int(os.getenv("MEDHIVE_ECG_WS_QUEUE", "4"))
+STREAM_OUTBOX = int(os.getenv("MEDHIVE_ECG_WS_OUTBOX", "16"))
+LATENCY_WINDOW = 1024
+
+
+class FrameError(Exception):
+    """Expected per-frame failure; the message goes back to the client."""
+
+
+def latency_summary(latencies_ms):
+    if not latencies_ms:
+        return None
+    values = np.asarray(latencies_ms)
+    return {
+        "p50": round(float(np.percentile(values, 50)), 2),
+        "p95": round(float(np.percentile(values, 95)), 2),
+        "max": round(float(values.max()), 2),
+    }
+
+
+class StreamStats:
+    def __init__(self):
+        self.opened = time.time()
+        self.received = 0
+        self.scored = 0
+        self.dropped = 0
+        self.errors = 0
+        self.dropped_replies = 0
+        self.latencies_ms = deque(maxlen=LATENCY_WINDOW)
+
+    def snapshot(self, queued=0):
+        return {
+            "received": self.received,
+            "scored": self.scored,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "dropped_replies": self.dropped_replies,
+            "queued": queued,
+            "connected_s": round(time.time() - self.opened, 1),
+            "latency_ms": latency_summary(self.latencies_ms),
+        }
+
+
+class StreamTotals:
+    """Process-wide view across connections, for /stats."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active = set()
+        self.connections = 0
+        self.closed = {"received": 0, "scored": 0, "dropped": 0, "errors": 0, "dropped_replies": 0}
+        self.latencies_ms = deque(maxlen=LATENCY_WINDOW)
+
+    def open(self, stats):
+        with self._lock:
+            self.active.add(stats)
+            self.connections += 1
+
+    def close(self, stats):
+        with self._lock:
+            self.active.discard(stats)
+            for key in self.closed:
+                self.closed[key] += getattr(stats, key)
+
+    def record(self, latency_ms):
+        with self._lock:
+            self.latencies_ms.append(latency_ms)
+
+    def snapshot(self):
+        with self._lock:
+            totals = dict(self.closed)
+            for stats in self.active:
+                for key in totals:
+                    totals[key] += getattr(stats, key)
+            return {
+                "active": len(self.active),
+                "connections": self.connections,
+                **totals,
+                "latency_ms": latency_summary(list(self.latencies_ms)),
+            }
+
+
+class FrameQueue:
+    """Bounded FIFO that drops its oldest entry instead of blocking."""
+
+    def __init__(self, max_size):
+        self.frames = deque()
+        self.max_size = max(1, max_size)
+        self.ready = asyncio.Event()
+
+    def __len__(self):
+        return len(self.frames)
+
+    def put(self, frame):
+        dropped = self.frames.popleft() if len(self.frames) >= self.max_size else None
+        self.frames.append(frame)
+        self.ready.set()
+        return dropped
+
+    async def get(self):
+        while not self.frames:
+            self.ready.clear()
+            await self.ready.wait()
+        return self.frames.popleft()
+
+
+def parse_message(message):
+    """(kind, payload) for a frame, ("stats", None), or raise FrameError."""
+    if message.get("bytes") is not None:
+        return "image", message["bytes"]
+    try:
+        data = json.loads(message.get("text") or "")
+    except ValueError:
+        raise FrameError("text messages must be JSON")
+    kind = data.get("type") if isinstance(data, dict) else None
+    if kind == "stats":
+        return "stats", None
+    if kind == "signal":
+        return "signal", data.get("samples")
+    raise FrameError('expected a binary image or {"type": "signal" | "stats"}')
+
+
+async def serve_stream(websocket, score, totals, max_queue=STREAM_QUEUE, max_outbox=STREAM_OUTBOX):
+    """Run one connection. score(kind, payload) -> result dict, async;
+    raises FrameError for failures the client should see."""
+    stats = StreamStats()
+    queue = FrameQueue(max_queue)
+    outbox = asyncio.Queue(max(1, max_outbox))
+
+    def reply(message):
+        # From the receive loop: never wait on a client that is not reading
+        try:
+            outbox.put_nowait(message)
+        except asyncio.QueueFull:
+            stats.dropped_replies += 1
+
+    async def send_messages():
+        while True:
+            await websocket.send_json(await outbox.get())
+
+    async def score_frames():
+        while True:
+            seq, received, kind, payload = await queue.get()
+            try:
+                message = {"type": "result", "seq": seq, **await score(kind, payload)}
+                stats.scored += 1
+            except FrameError as e:
+                message = {"type": "error", "seq": seq, "detail": str(e)}
+                stats.errors += 1
+            except Exception:
+                logging.error("ECG stream frame failed", exc_info=True)
+                message = {"type": "error", "seq": seq, "detail": "ECG scoring failed"}
+                stats.errors += 1
+            latency_ms = (time.perf_counter() - received) * 1000
+            stats.latencies_ms.append(latency_ms)
+            totals.record(latency_ms)
+            message.update(latency_ms=round(latency_ms, 2), queued=len(queue), dropped=stats.dropped)
+            await outbox.put(message)
+
+    totals.open(stats)
+    scorer = asyncio.create_task(score_frames())
+    sender = asyncio.create_task(send_messages())
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            try:
+                kind, payload = parse_message(message)
+            except FrameError as e:
+                reply({"type": "error", "seq": None, "detail": str(e)})
+                continue
+            if kind == "stats":
+                reply({"type": "stats", **stats.snapshot(len(queue))})
+                continue
+            seq = stats.received
+            stats.received += 1
+            if queue.put((seq, time.perf_counter(), kind, payload)) is not None:
+                stats.dropped += 1
+            if sender.done():
+                break  # the client went away while we were sending
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in (scorer, sender):
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass  # cancelled, or its last send hit the closed socket
+        totals.close(stats)
+    return stats
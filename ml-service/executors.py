@@ -0,0 +1,143 @@
+# =====================================================
+# BOUNDED MODEL EXECUTORS
+# =====================================================
+# Each model gets its own pool so a burst on one route cannot starve the
+# others (or /health). Admission is bounded: once workers + queue slots
+# are taken, new work is rejected immediately with Overloaded instead of
+# piling up. Work carries a deadline and is dropped if it is still queued
+# when the client has already given up.
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+DEFAULT_TIMEOUT_S = float(os.getenv("MEDHIVE_REQUEST_TIMEOUT_S", "10"))
+
+
+class Overloaded(Exception):
+    def __init__(self, name, retry_after=1):
+        super().__init__(f"{name} executor saturated")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+def deadline_from(timeout_s=None):
+    timeout_s = DEFAULT_TIMEOUT_S if timeout_s is None else min(timeout_s, DEFAULT_TIMEOUT_S)
+    return time.monotonic() + max(0.0, timeout_s)
+
+
+def env_int(name, default):
+    return int(os.getenv(name, str(default)))
+
+
+class ModelExecutor:
+    def __init__(self, name, workers=1, queue_size=32, processes=False, retry_after=1):
+        self.name = name
+        self.workers = max(1, workers)
+        self.capacity = self.workers + max(0, queue_size)
+        self.processes = processes
+        self.retry_after = retry_after
+
+        if processes:
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            self.pool = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix=f"medhive-{name}"
+            )
+
+        self._lock = threading.Lock()
+        self.inflight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.expired = 0
+
+    @classmethod
+    def from_env(cls, name, workers=1, queue_size=32, processes=False):
+        prefix = f"MEDHIVE_{name.upper().replace('-', '_')}"
+        return cls(
+            name,
+            workers=env_int(f"{prefix}_WORKERS", workers),
+            queue_size=env_int(f"{prefix}_QUEUE", queue_size),
+            processes=processes,
+        )
+
+    def _admit(self):
+        with self._lock:
+            if self.inflight >= self.capacity:
+                self.rejected += 1
+                raise Overloaded(self.name, self.retry_after)
+            self.inflight += 1
+
+    def _release(self, _future=None):
+        with self._lock:
+            self.inflight -= 1
+            self.completed += 1
+
+    def _expire(self):
+        with self._lock:
+            self.expired += 1
+
+    async def run(self, fn, *args, deadline=None):
+        self._admit()
+        try:
+            if self.processes:
+                cfut = self.pool.submit(fn, *args)
+            else:
+                cfut = self.pool.submit(self._guarded, fn, args, deadline)
+        except Exception:
+            self._release()
+            raise
+        # The slot is released when the work really finishes, not when the
+        # caller stops waiting, so abandoned-but-running work still counts.
+        cfut.add_done_callback(self._release)
+
+        timeout = None if deadline is None else deadline - time.monotonic()
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(cfut), timeout)
+        except asyncio.TimeoutError:
+            # Cancelling the wrapper also cancels cfut if it never started
+            self._expire()
+            raise DeadlineExceeded(f"{self.name} deadline exceeded")
+        except DeadlineExceeded:
+            self._expire()
+            raise
+
+    def submit(self, fn, *args):
+        """Fire-and-forget: Overloaded instead of queueing past capacity."""
+        self._admit()
+        try:
+            cfut = self.pool.submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        cfut.add_done_callback(self._release)
+        return cfut
+
+    def _guarded(self, fn, args, deadline):
+        if deadline is not None and time.monotonic() > deadline:
+            raise DeadlineExceeded(f"{self.name} deadline exceeded")
+        return fn(*args)
+
+    def snapshot(self):
+        return {
+            "kind": "process" if self.processes else "thread",
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "inflight": self.inflight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "expired": self.expired,
+        }
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
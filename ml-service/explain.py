@@ -0,0 +1,114 @@
+# =====================================================
+# PER-PREDICTION FEATURE ATTRIBUTIONS
+# =====================================================
+# Built once per model at load time (TabularModel.explainer), so an
+# explained request costs about one more pass over the same arrays:
+#
+#   tree ensembles  Saabas path attribution over the flattened forest
+#                   (tree_engine.py). Each node's positive-class value is
+#                   precomputed; walking a row down a tree, every split
+#                   credits its feature with value(child) - value(node).
+#                   base (mean root value) + contributions equals
+#                   predict_proba exactly. Units: percentage points, like
+#                   the API's "probability".
+#   linear models   coefficient x (value - reference) in log-odds. A
+#                   StandardScaler in front is folded into the weights and
+#                   its mean becomes the reference (the linear SHAP values
+#                   under feature independence); without one the
+#                   reference is 0. base + contributions equals the
+#                   model's decision function for the positive class.
+#
+# Anything else (other pipelines, multiclass) gets no explainer.
+import numpy as np
+
+from tree_engine import ROW_CHUNK, FlatForest
+
+
+class TreeExplainer:
+    units = "percentage_points"
+
+    def __init__(self, forest, class_index):
+        self.forest = forest
+        self.value = np.ascontiguousarray(forest.proba[:, class_index], dtype=np.float64) * 100
+        self.base = float(self.value[forest.roots].mean())
+
+    def explain(self, X):
+        """(base, contributions (n_rows, n_features))."""
+        if len(X) > ROW_CHUNK:
+            # Same chunking as FlatForest.predict_proba, for cache locality
+            parts = [self.explain(X[i:i + ROW_CHUNK])[1] for i in range(0, len(X), ROW_CHUNK)]
+            return self.base, np.concatenate(parts)
+        forest = self.forest
+        n, k = len(X), forest.n_features_in_
+        slots = np.repeat(np.arange(n, dtype=np.intp) * k, forest.n_trees)
+        contributions = np.zeros(n * k)
+        parent = None
+        for node in forest.walk(X):
+            if parent is not None:
+                # Rows already on a leaf add 0 (node == parent)
+                contributions += np.bincount(
+                    slots + forest.feature.take(parent),
+                    weights=self.value.take(node) - self.value.take(parent),
+                    minlength=n * k,
+                )
+            parent = node
+        return self.base, contributions.reshape(n, k) / forest.n_trees
+
+
+class LinearExplainer:
+    units = "log_odds"
+
+    def __init__(self, weights, reference, base):
+        self.weights = weights
+        self.reference = reference
+        self.base = base
+
+    def explain(self, X):
+        return self.base, (np.asarray(X, dtype=np.float64) - self.reference) * self.weights
+
+
+def _linear(model, class_index):
+    steps = [s for _, s in getattr(model, "steps", [(None, model)]) if s not in (None, "passthrough")]
+    *transforms, final = steps
+    coef = getattr(final, "coef_", None)
+    if coef is None or coef.shape[0] != 1 or len(transforms) > 1:
+        return None
+
+    n = coef.shape[1]
+    mean, scale = np.zeros(n), np.ones(n)
+    if transforms:
+        scaler = transforms[0]
+        if type(scaler).__name__ != "StandardScaler":
+            return None
+        if getattr(scaler, "mean_", None) is not None:
+            mean = np.asarray(scaler.mean_, dtype=np.float64)
+        if getattr(scaler, "scale_", None) is not None:
+            scale = np.asarray(scaler.scale_, dtype=np.float64)
+
+    # coef_ scores classes_[1]; flip it when the positive class is [0]
+    sign = 1.0 if class_index == 1 else -1.0
+    weights = sign * np.asarray(coef[0], dtype=np.float64) / scale
+    return LinearExplainer(weights, mean, sign * float(np.ravel(final.intercept_)[0]))
+
+
+def build_explainer(model, class_index):
+    """Explainer for the positive class, or None when unsupported."""
+    if class_index is None:
+        return None
+    forest = model if isinstance(model, FlatForest) else FlatForest.from_sklearn(model)
+    if forest is not None:
+        return TreeExplainer(forest, class_index)
+    return _linear(model, class_index)
+
+
+def explanations(explainer, X, fields):
+    """One {"base", "units", "contributions"} dict per row, largest first."""
+    base, contributions = explainer.explain(X)
+    order = np.argsort(-np.abs(contributions), axis=1, kind="stable")
+    names = np.asarray(fields, dtype=object)[order].tolist()
+    values = np.round(np.take_along_axis(contributions, order, axis=1), 4).tolist()
+    base = round(base, 4)
+    return [
+        {"base": base, "units": explainer.units, "contributions": dict(zip(row_names, row_values))}
+        for row_names, row_values in zip(names, values)
+    ]
@@ -0,0 +1,140 @@
+# =====================================================
+# TABULAR INFERENCE LAYER
+# =====================================================
+# Every sklearn classifier is wrapped once at load time. A prediction is
+# a single predict_proba call: the label is read back through classes_
+# (argmax, same rule sklearn's own predict uses) and the positive-class
+# column is resolved up front instead of on every request.
+#
+# Column order is checked against the model's feature_names_in_ once,
+# here, and the names are then stripped: requests pass plain contiguous
+# NumPy rows instead of building a pandas DataFrame just so sklearn can
+# re-check the names on every call.
+import logging
+import threading
+import time
+
+import numpy as np
+
+from explain import build_explainer
+from metrics import MODEL_SECONDS
+
+POSITIVE_LABELS = {"presence", "disease", "yes", "1", "true"}
+
+
+def positive_class_index(classes):
+    for i, c in enumerate(classes):
+        if str(c).lower() in POSITIVE_LABELS:
+            return i
+    return None
+
+
+def is_positive_label(label):
+    return str(label).lower() in POSITIVE_LABELS
+
+
+class InferenceStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.rows = 0
+        self.inference_ms = 0.0
+        self.predict_calls_saved = 0
+
+    def record(self, rows, elapsed_ms, saved):
+        with self._lock:
+            self.calls += 1
+            self.rows += rows
+            self.inference_ms += elapsed_ms
+            self.predict_calls_saved += saved
+
+
+def check_feature_names(model, features):
+    names = getattr(model, "feature_names_in_", None)
+    if names is not None and [str(n) for n in names] != list(features):
+        raise ValueError(f"model expects columns {list(names)}, service sends {list(features)}")
+
+
+def strip_feature_names(model):
+    # Pipelines keep the names on their steps
+    for estimator in [model, *[step for _, step in getattr(model, "steps", [])]]:
+        if "feature_names_in_" in getattr(estimator, "__dict__", {}):
+            del estimator.feature_names_in_
+
+
+class TabularModel:
+    def __init__(self, name, model, features=None):
+        self.name = name
+        self.model = model
+        self.feature_names = list(features) if features is not None else None
+        if features is not None:
+            check_feature_names(model, features)
+            strip_feature_names(model)
+        self.n_features = getattr(model, "n_features_in_", None)
+        self._local = threading.local()
+        self.classes = np.asarray(getattr(model, "classes_", []))
+        self.has_proba = hasattr(model, "predict_proba") and len(self.classes) > 0
+        self.positive_index = positive_class_index(self.classes)
+        self.stats = InferenceStats()
+        self.predict_cost_ms = None
+        # Feature attributions for ?explain=true (see explain.py)
+        try:
+            self.explainer = build_explainer(model, self.positive_index)
+        except Exception:
+            logging.error(f"No explainer for {name}", exc_info=True)
+            self.explainer = None
+
+    def calibrate(self, X):
+        # Cost of the predict() call the single-pass path no longer makes,
+        # measured once so the saving can be reported per request.
+        if not self.has_proba:
+            return
+        try:
+            start = time.perf_counter()
+            self.model.predict(X)
+            self.predict_cost_ms = (time.perf_counter() - start) * 1000
+        except Exception:
+            self.predict_cost_ms = None
+
+    def assemble(self, rows):
+        """Rows in model column order as a contiguous float64 matrix."""
+        if len(rows) == 1 and self.n_features is not None:
+            # Single-record requests reuse this thread's buffer
+            buf = getattr(self._local, "row", None)
+            if buf is None:
+                buf = self._local.row = np.empty((1, self.n_features), dtype=np.float64)
+            buf[0] = rows[0]
+            return buf
+        return np.ascontiguousarray(rows, dtype=np.float64).reshape(len(rows), -1)
+
+    def predict(self, X):
+        """Return (labels, positive-class probabilities or None)."""
+        start = time.perf_counter()
+
+        if self.has_proba:
+            proba = self.model.predict_proba(X)
+            labels = self.classes.take(proba.argmax(axis=1))
+            positive = None if self.positive_index is None else proba[:, self.positive_index]
+        else:
+            labels = np.asarray(self.model.predict(X))
+            positive = None
+
+        elapsed = time.perf_counter() - start
+        self.stats.record(len(labels), elapsed * 1000, 1 if self.has_proba else 0)
+        MODEL_SECONDS.observe(elapsed, self.name, "inference")
+        return labels, positive
+
+    def snapshot(self):
+        s = self.stats
+        saved_ms = (self.predict_cost_ms or 0.0) * s.predict_calls_saved
+        return {
+            "calls": s.calls,
+            "rows": s.rows,
+            "inference_ms_total": round(s.inference_ms, 3),
+            "inference_ms_avg": round(s.inference_ms / s.calls, 3) if s.calls else 0.0,
+            "single_pass": self.has_proba,
+            "positive_class": None if self.positive_index is None else str(self.classes[self.positive_index]),
+            "predict_calls_saved": s.predict_calls_saved,
+            "predict_cost_ms": None if self.predict_cost_ms is None else round(self.predict_cost_ms, 3),
+            "saved_ms_total": round(saved_ms, 3),
+        }
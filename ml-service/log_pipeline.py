@@ -0,0 +1,291 @@
+# =====================================================
+# NON-BLOCKING ERROR AND AUDIT LOGGING
+# =====================================================
+# Request threads never touch the log file. logging.error() only puts the
+# record on a bounded queue (dropped and counted when full); a background
+# listener formats tracebacks, drops repeats and writes to a size-rotated
+# file.
+#
+# Deduplication: the first occurrence of an error (same message, same
+# exception type, same traceback lines) is written in full; repeats within
+# MEDHIVE_LOG_DEDUP_S are only counted, and a one-line "repeated N times"
+# summary is written with the first record after the window closes (or
+# at shutdown). An incident that fails every request therefore costs one
+# traceback per window instead of one each.
+#
+# The audit log is separate and off by default. MEDHIVE_AUDIT=jsonl:<path>
+# or sqlite:<path> records one line per prediction request (route, model,
+# version, outcome, status, latency) and never any request content, in
+# batches written by its own thread.
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sqlite3
+import threading
+import time
+import traceback
+
+LOG_MAX_BYTES = int(os.getenv("MEDHIVE_LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+LOG_BACKUPS = int(os.getenv("MEDHIVE_LOG_BACKUPS", "3"))
+LOG_QUEUE = int(os.getenv("MEDHIVE_LOG_QUEUE", "10000"))
+DEDUP_WINDOW_S = float(os.getenv("MEDHIVE_LOG_DEDUP_S", "60"))
+
+AUDIT = os.getenv("MEDHIVE_AUDIT", "")
+AUDIT_BATCH = int(os.getenv("MEDHIVE_AUDIT_BATCH", "256"))
+AUDIT_FLUSH_S = float(os.getenv("MEDHIVE_AUDIT_FLUSH_S", "1"))
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+
+class AsyncQueueHandler(logging.handlers.QueueHandler):
+    # The stdlib prepare() formats the traceback on the calling thread;
+    # here the record goes on the queue as-is and the listener formats it.
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def error_signature(record):
+    if not record.exc_info or record.exc_info[0] is None:
+        return (record.levelno, record.msg)
+    exc_type, _, tb = record.exc_info
+    frames = tuple((f.filename, f.lineno) for f in traceback.extract_tb(tb))
+    return (record.levelno, record.msg, exc_type.__qualname__, frames)
+
+
+class DedupHandler(logging.Handler):
+    """Writes the first of identical records per window to target."""
+
+    def __init__(self, target, window_s=DEDUP_WINDOW_S):
+        super().__init__()
+        self.target = target
+        self.window_s = window_s
+        self.seen = {}  # signature -> [window start, suppressed count, message]
+        self.suppressed = 0
+
+    def emit(self, record):
+        now = time.monotonic()
+        self._expire(now)
+        key = error_signature(record)
+        state = self.seen.get(key)
+        if state is not None:
+            state[1] += 1
+            self.suppressed += 1
+            return
+        self.seen[key] = [now, 0, record.msg]
+        self.target.handle(record)
+
+    def _expire(self, now, force=False):
+        for key, (start, count, msg) in list(self.seen.items()):
+            if force or now - start >= self.window_s:
+                del self.seen[key]
+                if count:
+                    self._summary(msg, count, now - start)
+
+    def _summary(self, msg, count, elapsed_s):
+        record = logging.LogRecord(
+            "medhive", logging.ERROR, __file__, 0,
+            f"{msg!r} repeated {count} more times in {elapsed_s:.0f}s", None, None
+        )
+        self.target.handle(record)
+
+    def flush(self):
+        self._expire(time.monotonic(), force=True)
+        self.target.flush()
+
+    def close(self):
+        self.flush()
+        self.target.close()
+        super().close()
+
+
+class LogPipeline:
+    def __init__(self, path, max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS,
+                 queue_size=LOG_QUEUE, dedup_window_s=DEDUP_WINDOW_S, level=logging.ERROR):
+        file_handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backups, delay=True
+        )
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        self.writer = DedupHandler(file_handler, dedup_window_s)
+        self.handler = AsyncQueueHandler(queue.Queue(queue_size))
+        self.handler.setLevel(level)
+        self.listener = logging.handlers.QueueListener(self.handler.queue, self.writer)
+        self.level = level
+
+    def start(self, logger=None):
+        logger = logger or logging.getLogger()
+        logger.addHandler(self.handler)
+        logger.setLevel(self.level)
+        self.listener.start()
+        atexit.register(self.stop)
+        return self
+
+    def flush(self):
+        # Waits until the listener has handled everything queued so far
+        self.handler.queue.join()
+        self.writer.flush()
+
+    def stop(self):
+        if self.listener._thread is not None:
+            self.listener.stop()
+            self.writer.flush()
+
+    def snapshot(self):
+        return {
+            "queued": self.handler.queue.qsize(),
+            "dropped": self.handler.dropped,
+            "suppressed_duplicates": self.writer.suppressed,
+        }
+
+
+def setup_logging(path):
+    """Route the root logger through a LogPipeline writing to path."""
+    return LogPipeline(path).start()
+
+
+# =====================================================
+# AUDIT LOG
+# =====================================================
+AUDIT_FIELDS = ["ts", "route", "model", "version", "outcome", "status", "latency_ms"]
+
+
+class JSONLSink:
+    def __init__(self, path):
+        self.path = path
+
+    def write(self, records):
+        with open(self.path, "a") as f:
+            f.write("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records))
+
+
+class SQLiteSink:
+    def __init__(self, path):
+        self.path = path
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS audit (ts REAL, route TEXT, model TEXT, version TEXT, "
+            "outcome TEXT, status INTEGER, latency_ms REAL)"
+        )
+        conn.commit()
+        conn.close()
+        self.conn = None
+
+    def write(self, records):
+        # Only ever called from the writer thread
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.path)
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO audit VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [tuple(r[f] for f in AUDIT_FIELDS) for r in records]
+            )
+
+
+def outcome_of(status):
+    if status < 400:
+        return "ok"
+    if status in (503, 504):
+        return "rejected"
+    return "invalid" if status < 500 else "error"
+
+
+class AuditLog:
+    def __init__(self, sink=None, batch_size=AUDIT_BATCH, flush_s=AUDIT_FLUSH_S, queue_size=LOG_QUEUE):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_s = flush_s
+        self.queue = queue.Queue(queue_size)
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._thread = None
+        if sink is not None:
+            self._thread = threading.Thread(target=self._run, name="medhive-audit", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    @classmethod
+    def from_env(cls):
+        kind, _, path = AUDIT.partition(":")
+        if not kind:
+            return cls()
+        if kind == "jsonl":
+            return cls(JSONLSink(path or "medhive_audit.jsonl"))
+        if kind == "sqlite":
+            return cls(SQLiteSink(path or "medhive_audit.db"))
+        raise ValueError(f"MEDHIVE_AUDIT must be jsonl:<path> or sqlite:<path>, got {AUDIT!r}")
+
+    @property
+    def enabled(self):
+        return self.sink is not None
+
+    def record(self, route, model, version, status, latency_ms):
+        if self.sink is None:
+            return
+        entry = {
+            "ts": round(time.time(), 3),
+            "route": route,
+            "model": model,
+            "version": version,
+            "outcome": outcome_of(status),
+            "status": status,
+            "latency_ms": round(latency_ms, 3),
+        }
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch = []
+            deadline = time.monotonic() + self.flush_s
+            while len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch):
+        try:
+            self.sink.write(batch)
+            self.written += len(batch)
+        except Exception:
+            self.failed += len(batch)
+            logging.error("Audit write failed", exc_info=True)
+
+    def close(self):
+        if self._thread is not None and self._thread.is_alive():
+            self.queue.put(None)
+            self._thread.join(5)
+
+    def snapshot(self):
+        return {
+            "enabled": self.enabled,
+            "sink": None if self.sink is None else type(self.sink).__name__,
+            "written": self.written,
+            "queued": self.queue.qsize(),
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
@@ -0,0 +1,137 @@
+# =====================================================
+# SHARED / MEMORY-MAPPED MODEL LOADING
+# =====================================================
+# With MEDHIVE_MMAP_MODELS=1 each pickle is re-dumped once, uncompressed,
+# into MODEL_DIR/.mmap/ and then opened with joblib's mmap_mode="r".
+# NumPy buffers inside the model become read-only views on that file, so
+# every uvicorn worker on the node shares one copy through the page cache
+# instead of holding its own.
+#
+# Caveat: sklearn's Tree copies its node arrays into private memory when
+# unpickled, so forests only share their Python-level arrays this way.
+# Forests served by tree_engine.FlatForest are cached as .npy node arrays
+# instead and mapped in full.
+import os
+import tempfile
+
+import joblib
+import numpy as np
+
+MMAP_ENABLED = os.getenv("MEDHIVE_MMAP_MODELS", "0") == "1"
+
+
+def mmap_cache_path(path, version=None):
+    directory = os.path.join(os.path.dirname(path), ".mmap")
+    version = version or "unversioned"
+    return os.path.join(directory, f"{os.path.basename(path)}.{version}.joblib")
+
+
+def flat_cache_path(path, version=None):
+    # Array-backed tree ensembles (tree_engine.FlatForest) are stored as a
+    # directory of .npy files so np.load can map the node arrays directly.
+    directory = os.path.join(os.path.dirname(path), ".mmap")
+    return os.path.join(directory, f"{os.path.basename(path)}.{version or 'unversioned'}.flat")
+
+
+def build_mmap_cache(path, version=None, model=None):
+    cache = mmap_cache_path(path, version)
+    if os.path.exists(cache):
+        return cache
+
+    os.makedirs(os.path.dirname(cache), exist_ok=True)
+    if model is None:
+        model = joblib.load(path)
+
+    # Write then rename so concurrent workers never map a partial file
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(cache), suffix=".tmp")
+    os.close(fd)
+    try:
+        joblib.dump(model, tmp, compress=0)
+        os.replace(tmp, cache)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return cache
+
+
+def load_artifact(path, version=None, mmap=None):
+    # version keys the cache so a replaced artifact never maps stale bytes
+    mmap = MMAP_ENABLED if mmap is None else mmap
+    if not mmap:
+        return joblib.load(path)
+    return joblib.load(build_mmap_cache(path, version), mmap_mode="r")
+
+
+# =====================================================
+# MEMORY REPORTING
+# =====================================================
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _is_mapped(arr):
+    while arr is not None:
+        if isinstance(arr, np.memmap):
+            return True
+        arr = getattr(arr, "base", None)
+        if arr is not None and not isinstance(arr, np.ndarray):
+            return type(arr).__name__ == "mmap"
+    return False
+
+
+def array_footprint(obj):
+    """Bytes held in NumPy buffers reachable from obj: (total, mapped)."""
+    # Keep visited objects alive so temporaries (Tree getstate arrays)
+    # cannot be freed and have their id() reused mid-walk.
+    seen = {}
+    total = mapped = 0
+    stack = [obj]
+
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen[id(item)] = item
+
+        if isinstance(item, np.ndarray):
+            total += item.nbytes
+            if _is_mapped(item):
+                mapped += item.nbytes
+            if item.dtype == object:
+                stack.extend(item.ravel().tolist())
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set)):
+            stack.extend(item)
+        elif isinstance(item, (str, bytes, int, float, bool, type(None))):
+            continue
+        elif hasattr(item, "__dict__"):
+            stack.extend(vars(item).values())
+        elif type(item).__name__ == "Tree":
+            # sklearn's Cython Tree exposes its buffers through getstate
+            stack.extend(item.__getstate__().values())
+
+    return total, mapped
+
+
+def memory_report(model, rss_delta=None):
+    if hasattr(model, "count_params"):
+        # Keras: weights live in TF variables, not NumPy arrays
+        total, mapped = model.count_params() * 4, 0
+    elif hasattr(model, "model_bytes"):
+        # TFLite flatbuffer (ecg_backend.py), mapped by the interpreter
+        total = mapped = model.model_bytes
+    else:
+        total, mapped = array_footprint(model)
+    report = {
+        "arrays_mb": round(total / 2**20, 2),
+        "mapped_mb": round(mapped / 2**20, 2),
+        "private_mb": round((total - mapped) / 2**20, 2),
+    }
+    if rss_delta is not None:
+        report["rss_delta_mb"] = round(rss_delta / 2**20, 2)
+    return report
@@ -0,0 +1,271 @@
+# =====================================================
+# PROMETHEUS METRICS
+# =====================================================
+# Text exposition (format 0.0.4) without the prometheus_client dependency.
+#
+# Counters and histograms are sharded per thread: the hot path only
+# touches a dict owned by the calling thread (no lock, no contention
+# between executor workers) and /metrics sums the shards at scrape time.
+# Values that already live elsewhere (model states, cache and batcher
+# stats) are read through collectors when scraped instead of mirrored.
+#
+# Every route is covered by MetricsMiddleware plus InstrumentedRoute
+# (set as the app's route_class), which marks when the endpoint function
+# starts and returns. A request's time is split into
+#   validation     arrival -> endpoint called (body read, parsing, pydantic)
+#   handler        the endpoint function itself
+#   serialization  endpoint returned -> response headers sent
+import asyncio
+import bisect
+import contextvars
+import functools
+import threading
+import time
+
+from fastapi.routing import APIRoute
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class _Sharded:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labels)
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def _snapshot(self):
+        with self._lock:
+            shards = list(self._shards)
+        # dict(shard) copies in one C call, safe against concurrent inserts
+        return [dict(shard) for shard in shards]
+
+
+class Counter(_Sharded):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def values(self):
+        totals = {}
+        for shard in self._snapshot():
+            for key, value in shard.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    # inc/dec deltas per shard sum to the current value
+    kind = "gauge"
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Sharded):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        shard = self._shard()
+        state = shard.get(labels)
+        if state is None:
+            state = shard[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect.bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def render(self):
+        merged = {}
+        for shard in self._snapshot():
+            for key, (counts, total) in shard.items():
+                acc = merged.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0])
+                acc[0] = [a + b for a, b in zip(acc[0], counts)]
+                acc[1] += total
+
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in sorted(merged.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {total:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+        self.request_hooks = []
+
+    def counter(self, name, help, labels=()):
+        return self._add(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=()):
+        return self._add(Gauge(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def collector(self, fn):
+        """fn() -> [(name, type, help, [(labels dict, value), ...]), ...]"""
+        self.collectors.append(fn)
+        return fn
+
+    def on_request(self, fn):
+        """fn(route, scope, status, seconds) after every HTTP request."""
+        self.request_hooks.append(fn)
+        return fn
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines += metric.render()
+        for fn in self.collectors:
+            try:
+                families = fn()
+            except Exception:
+                continue  # a broken collector must not take /metrics down
+            for name, kind, help, samples in families:
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+                for labels, value in samples:
+                    if value is None:
+                        continue
+                    lines.append(f"{name}{_labels(labels.keys(), labels.values())} {float(value)}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+REQUESTS = METRICS.counter("medhive_requests_total", "HTTP requests", ("route", "method", "status"))
+REQUEST_SECONDS = METRICS.histogram("medhive_request_seconds", "HTTP request latency", ("route",))
+STAGE_SECONDS = METRICS.histogram(
+    "medhive_request_stage_seconds", "Request time by stage", ("route", "stage")
+)
+IN_FLIGHT = METRICS.gauge("medhive_requests_in_flight", "Requests being handled")
+MODEL_SECONDS = METRICS.histogram(
+    "medhive_model_stage_seconds", "Model-side time by stage (ECG preprocessing, inference)", ("model", "stage")
+)
+
+
+# =====================================================
+# ROUTE INSTRUMENTATION
+# =====================================================
+_MARKS = contextvars.ContextVar("medhive_request_marks", default=None)
+
+
+def _mark(key):
+    marks = _MARKS.get()
+    if marks is not None:
+        marks[key] = time.perf_counter()
+
+
+def timed_endpoint(endpoint):
+    # functools.wraps keeps __wrapped__, so FastAPI still sees the real
+    # signature when it builds the dependency/validation plan
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            _mark("enter")
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _mark("exit")
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            _mark("enter")
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                _mark("exit")
+    return wrapper
+
+
+class InstrumentedRoute(APIRoute):
+    def __init__(self, path, endpoint, **kwargs):
+        super().__init__(path, timed_endpoint(endpoint), **kwargs)
+
+
+class MetricsMiddleware:
+    # Plain ASGI (not BaseHTTPMiddleware): no extra task or body copies
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        marks = {}
+        token = _MARKS.set(marks)
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                marks["response"] = time.perf_counter()
+            await send(message)
+
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.dec()
+            _MARKS.reset(token)
+            end = time.perf_counter()
+
+            route = scope.get("route")
+            route = getattr(route, "path", None) or "unmatched"
+            REQUESTS.inc(route, scope["method"], str(status[0]))
+            REQUEST_SECONDS.observe(end - start, route)
+            if "enter" in marks:
+                exited = marks.get("exit", end)
+                STAGE_SECONDS.observe(marks["enter"] - start, route, "validation")
+                STAGE_SECONDS.observe(exited - marks["enter"], route, "handler")
+                STAGE_SECONDS.observe(max(0.0, marks.get("response", end) - exited), route, "serialization")
+            for hook in METRICS.request_hooks:
+                try:
+                    hook(route, scope, status[0], end - start)
+                except Exception:
+                    pass  # observers must never fail the request
@@ -0,0 +1,305 @@
+# =====================================================
+# CONTENT-ADDRESSED PREDICTION CACHE
+# =====================================================
+# Keys are model name + model version + a SHA-256 of the validated
+# feature vector (or the raw ECG upload), so a reload can never serve a
+# stale answer and equivalent forms ("1" vs 1) share one entry.
+#
+# Two tiers: a per-process LRU with TTL, and an optional shared backend
+# (SQLiteCache, MEDHIVE_CACHE_SQLITE=path) that lets uvicorn workers on
+# the same node reuse each other's results. Concurrent identical misses
+# are single-flighted: one request runs the model, the rest await it.
+#
+# Only the LRU and the single-flight bookkeeping run on the event loop.
+# A shared-tier lookup can wait up to a second on another worker's write
+# lock, so it runs in a thread; stores go on a bounded write-behind queue
+# drained by one writer thread and are dropped when it is full.
+import asyncio
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_SIZE = int(os.getenv("MEDHIVE_CACHE_SIZE", "4096"))
+CACHE_TTL_S = float(os.getenv("MEDHIVE_CACHE_TTL_S", "300"))
+CACHE_SQLITE = os.getenv("MEDHIVE_CACHE_SQLITE")
+SHARED_WRITE_QUEUE = int(os.getenv("MEDHIVE_CACHE_WRITE_QUEUE", "1024"))
+
+
+def cache_key(model, version, payload):
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        digest = hashlib.sha256(payload).hexdigest()
+    else:
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        digest = hashlib.sha256(canonical.encode()).hexdigest()
+    return f"{model}:{version}:{digest}"
+
+
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expired = 0
+        self.dropped_writes = 0
+
+    def incr(self, field, n=1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + n)
+
+
+class LRUCache:
+    def __init__(self, max_entries=CACHE_SIZE, ttl_s=CACHE_TTL_S, stats=None):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.stats = stats or CacheStats()
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] < time.monotonic():
+                del self._data[key]
+                self.stats.incr("expired")
+                return None
+            self._data.move_to_end(key)
+            return item[1]
+
+    def set(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_s, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.stats.incr("evictions")
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class SQLiteCache:
+    """Node-local shared tier; values must be JSON-serializable."""
+
+    def __init__(self, path, max_entries=CACHE_SIZE * 4, ttl_s=CACHE_TTL_S):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._local = threading.local()
+        self._writes = 0
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL, used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS predictions_used ON predictions (used)")
+
+    def _conn(self):
+        # sqlite3 connections must stay on the thread that opened them
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute("SELECT value, expires FROM predictions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] < now:
+            conn.execute("DELETE FROM predictions WHERE key = ?", (key,))
+            return None
+        conn.execute("UPDATE predictions SET used = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO predictions (key, value, expires, used) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), now + self.ttl_s, now),
+        )
+        self._writes += 1
+        if self._writes % 64 == 0:
+            self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        # Amortized: expired rows first, then least recently used overflow
+        conn.execute("DELETE FROM predictions WHERE expires < ?", (now,))
+        conn.execute(
+            "DELETE FROM predictions WHERE key IN (SELECT key FROM predictions "
+            "ORDER BY used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def clear(self):
+        self._conn().execute("DELETE FROM predictions")
+
+
+class WriteBehind:
+    """One daemon thread applying shared-tier stores in order."""
+
+    def __init__(self, shared, stats, max_pending=SHARED_WRITE_QUEUE):
+        self.shared = shared
+        self.stats = stats
+        self._queue = queue.Queue(max_pending)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def put(self, key, value):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="medhive-cache-writer", daemon=True)
+                self._thread.start()
+        try:
+            self._queue.put_nowait((key, value))
+        except queue.Full:
+            self.stats.incr("dropped_writes")
+
+    def _run(self):
+        while True:
+            key, value = self._queue.get()
+            try:
+                self.shared.set(key, value)
+            except sqlite3.Error:
+                pass  # the shared tier is best effort
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        self._queue.join()
+
+
+class PredictionCache:
+    def __init__(self, local=None, shared=None):
+        self.stats = CacheStats()
+        self.local = local if local is not None else LRUCache(stats=self.stats)
+        self.local.stats = self.stats
+        self.shared = shared
+        self.writer = None if shared is None else WriteBehind(shared, self.stats)
+        self._inflight = {}
+
+    @classmethod
+    def from_env(cls):
+        shared = SQLiteCache(CACHE_SQLITE) if CACHE_SQLITE else None
+        return cls(LRUCache(CACHE_SIZE, CACHE_TTL_S), shared)
+
+    @property
+    def enabled(self):
+        return self.local.max_entries > 0 or self.shared is not None
+
+    def _local_get(self, key):
+        value = self.local.get(key)
+        if value is not None:
+            self.stats.incr("hits")
+        return value
+
+    def _shared_get(self, key):
+        # Blocking; off the event loop in get_or_compute
+        try:
+            value = self.shared.get(key)
+        except sqlite3.Error:
+            return None
+        if value is not None:
+            self.stats.incr("shared_hits")
+            self.local.set(key, value)
+        return value
+
+    def get(self, key):
+        value = self._local_get(key)
+        if value is None and self.shared is not None:
+            value = self._shared_get(key)
+        return value
+
+    def set(self, key, value):
+        self.local.set(key, value)
+        if self.writer is not None:
+            self.writer.put(key, value)
+
+    def flush(self):
+        """Wait until queued shared-tier stores are written."""
+        if self.writer is not None:
+            self.writer.flush()
+
+    async def get_or_compute(self, key, compute):
+        """Cached value for key, or the result of awaiting compute() once."""
+        if not self.enabled:
+            return await compute()
+
+        value = self._local_get(key)
+        if value is not None:
+            return value
+
+        loop = asyncio.get_running_loop()
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight.get_loop() is loop:
+            self.stats.incr("coalesced")
+            try:
+                # shield: one waiter giving up must not cancel the others
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The leading request was cancelled; compute it ourselves
+
+        future = loop.create_future()
+        self._inflight[key] = future
+        try:
+            # Registered first, so identical requests wait on this lookup too
+            if self.shared is not None:
+                value = await asyncio.to_thread(self._shared_get, key)
+            if value is None:
+                self.stats.incr("misses")
+                value = await compute()
+                self.set(key, value)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            # Failures are shared with current waiters but never cached
+            future.set_exception(e)
+            future.exception()  # mark retrieved in case nobody waits
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def snapshot(self):
+        s = self.stats
+        lookups = s.hits + s.shared_hits + s.misses + s.coalesced
+        return {
+            "entries": len(self.local),
+            "max_entries": self.local.max_entries,
+            "ttl_s": self.local.ttl_s,
+            "shared": None if self.shared is None else type(self.shared).__name__,
+            "hits": s.hits,
+            "shared_hits": s.shared_hits,
+            "misses": s.misses,
+            "coalesced": s.coalesced,
+            "evictions": s.evictions,
+            "expired": s.expired,
+            "dropped_writes": s.dropped_writes,
+            "hit_rate": round((lookups - s.misses) / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,260 @@
+# =====================================================
+# LAZY MODEL REGISTRY
+# =====================================================
+# Models are registered with a loader and only deserialized on first use
+# (or by a background warm-up thread once the server is up). Each entry
+# tracks its own state so /health can answer immediately while heavy
+# artifacts like the TensorFlow ECG model are still loading.
+#
+# Reloads build and warm the new model on the side and then swap a single
+# (model, version) tuple, so requests that already hold the old model
+# finish on it and new requests never see a half-loaded one.
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+
+from memory import memory_report, rss_bytes
+
+UNLOADED = "unloaded"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+DISABLED = "disabled"
+
+
+class ModelUnavailable(Exception):
+    pass
+
+
+def artifact_version(path):
+    if path is None or not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def artifact_stamp(path):
+    try:
+        st = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class ModelEntry:
+    def __init__(self, name, loader, path=None, warm=None):
+        self.name = name
+        self.loader = loader
+        self.path = path
+        self.warm = warm
+        self.state = UNLOADED
+        self.serving = (None, None)
+        self.error = None
+        self.load_ms = None
+        self.reloads = 0
+        self.reload_error = None
+        self.reloading = False
+        self.stamp = None
+        self.memory = None
+        self.lock = threading.Lock()
+        self.reload_lock = threading.Lock()
+
+    @property
+    def value(self):
+        return self.serving[0]
+
+    @property
+    def version(self):
+        return self.serving[1]
+
+    def status(self):
+        status = {"state": self.state}
+        if self.version is not None:
+            status["version"] = self.version
+        if self.load_ms is not None:
+            status["load_ms"] = round(self.load_ms, 1)
+        if self.memory is not None:
+            status["memory"] = self.memory
+        if self.reloads:
+            status["reloads"] = self.reloads
+        if self.reloading:
+            status["reloading"] = True
+        if self.error:
+            status["error"] = self.error
+        if self.reload_error:
+            status["reload_error"] = self.reload_error
+        return status
+
+
+class ModelRegistry:
+    def __init__(self, hosted=None):
+        # hosted=None means every registered model is served by this worker
+        self.hosted = set(hosted) if hosted else None
+        self.entries = {}
+
+    def register(self, name, loader, path=None, warm=None):
+        entry = ModelEntry(name, loader, path=path, warm=warm)
+        if self.hosted is not None and name not in self.hosted:
+            entry.state = DISABLED
+        self.entries[name] = entry
+        return entry
+
+    def state(self, name):
+        return self.entries[name].state
+
+    def get(self, name):
+        entry = self.entries[name]
+        if entry.state == READY:
+            return entry.value
+        if entry.state in (FAILED, DISABLED):
+            return None
+
+        with entry.lock:
+            if entry.state == UNLOADED:
+                self._load(entry)
+        return entry.value
+
+    def get_versioned(self, name):
+        self.get(name)
+        return self.entries[name].serving
+
+    async def aget(self, name):
+        # Ready models are returned without a thread hop; anything else
+        # loads in the default executor so the event loop never blocks.
+        entry = self.entries[name]
+        if entry.state == READY:
+            return entry.value
+        if entry.state in (FAILED, DISABLED):
+            return None
+        return await asyncio.get_running_loop().run_in_executor(None, self.get, name)
+
+    def _build(self, entry):
+        stamp = artifact_stamp(entry.path)
+        rss_before = rss_bytes()
+        value = entry.loader()
+        if value is None:
+            # The loader already logged why
+            raise ModelUnavailable("model unavailable (see medhive_errors.log)")
+        if entry.warm is not None:
+            entry.warm(value)
+
+        rss_after = rss_bytes()
+        rss_delta = None if rss_before is None or rss_after is None else rss_after - rss_before
+        try:
+            entry.memory = memory_report(value, rss_delta)
+            print(
+                f"📦 {entry.name}: {entry.memory['arrays_mb']} MB arrays "
+                f"({entry.memory['mapped_mb']} MB mapped), "
+                f"RSS +{entry.memory.get('rss_delta_mb', '?')} MB"
+            )
+        except Exception:
+            entry.memory = None
+        return value, artifact_version(entry.path), stamp
+
+    def _load(self, entry):
+        entry.state = LOADING
+        start = time.perf_counter()
+        try:
+            value, version, stamp = self._build(entry)
+        except Exception as e:
+            if not isinstance(e, ModelUnavailable):
+                logging.error(f"Model {entry.name} failed to load", exc_info=True)
+                print(f"❌ Failed loading {entry.name} (see medhive_errors.log)")
+            entry.error = str(e) or type(e).__name__
+            entry.state = FAILED
+        else:
+            entry.serving = (value, version)
+            entry.stamp = stamp
+            entry.error = None
+            entry.state = READY
+        finally:
+            entry.load_ms = (time.perf_counter() - start) * 1000
+
+    def reload(self, name):
+        entry = self.entries[name]
+        if entry.state == DISABLED:
+            return False
+
+        with entry.reload_lock:
+            entry.reloading = True
+            try:
+                if entry.state != READY:
+                    with entry.lock:
+                        self._load(entry)
+                    return entry.state == READY
+
+                start = time.perf_counter()
+                try:
+                    value, version, stamp = self._build(entry)
+                except Exception as e:
+                    # Keep serving the current model
+                    logging.error(f"Model {entry.name} reload failed", exc_info=True)
+                    entry.reload_error = str(e) or type(e).__name__
+                    return False
+
+                entry.serving = (value, version)
+                entry.stamp = stamp
+                entry.load_ms = (time.perf_counter() - start) * 1000
+                entry.reloads += 1
+                entry.reload_error = None
+                print(f"🔁 Reloaded {entry.name} ({version})")
+                return True
+            finally:
+                entry.reloading = False
+
+    def reload_async(self, name):
+        thread = threading.Thread(
+            target=self.reload, args=(name,),
+            name=f"medhive-reload-{name}", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def changed(self):
+        # Entries whose artifact on disk no longer matches what was loaded
+        return [
+            name for name, entry in self.entries.items()
+            if entry.state in (READY, FAILED)
+            and entry.path is not None
+            and artifact_stamp(entry.path) is not None
+            and artifact_stamp(entry.path) != entry.stamp
+        ]
+
+    def watch(self, interval_s=2.0):
+        # Poll instead of depending on inotify/watchdog; a file must look
+        # the same on two consecutive polls before it is reloaded so we
+        # never pick up a half-copied artifact.
+        def loop():
+            pending = {}
+            while True:
+                time.sleep(interval_s)
+                for name in self.changed():
+                    stamp = artifact_stamp(self.entries[name].path)
+                    if pending.get(name) == stamp:
+                        pending.pop(name)
+                        self.reload(name)
+                    else:
+                        pending[name] = stamp
+
+        thread = threading.Thread(target=loop, name="medhive-model-watcher", daemon=True)
+        thread.start()
+        return thread
+
+    def warm_up(self, names=None):
+        names = list(names or self.entries)
+        thread = threading.Thread(
+            target=lambda: [self.get(name) for name in names],
+            name="medhive-warmup",
+            daemon=True
+        )
+        thread.start()
+        return thread
+
+    def status(self):
+        return {name: entry.status() for name, entry in self.entries.items()}
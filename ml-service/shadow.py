@@ -0,0 +1,132 @@
+# =====================================================
+# SHADOW / CANARY EVALUATION
+# =====================================================
+# A candidate artifact scores a sampled fraction of live traffic next to
+# the serving model without touching user latency:
+#   - sampling is one random() call on the request path; sampled rows and
+#     the primary results are parked on the request and only handed to
+#     the background executor after the response has been sent
+#   - that executor is small and bounded; when it is full the shadow job
+#     is dropped and counted, never queued behind
+#   - only aggregates are kept (agreement, probability deltas, candidate
+#     latency over the last LATENCY_WINDOW jobs), never the inputs
+import random
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from executors import Overloaded
+from inference import is_positive_label
+
+LATENCY_WINDOW = 1024
+
+
+class ShadowStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sampled = 0
+        self.dropped = 0
+        self.errors = 0
+        self.jobs = 0
+        self.rows = 0
+        self.agree = 0
+        self.delta_sum = 0.0
+        self.abs_delta_sum = 0.0
+        self.max_abs_delta = 0.0
+        self.latencies_ms = deque(maxlen=LATENCY_WINDOW)
+
+    def incr(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def record(self, agree, deltas, latency_ms):
+        with self._lock:
+            self.jobs += 1
+            self.rows += len(agree)
+            self.agree += int(sum(agree))
+            if len(deltas):
+                self.delta_sum += float(np.sum(deltas))
+                self.abs_delta_sum += float(np.sum(np.abs(deltas)))
+                self.max_abs_delta = max(self.max_abs_delta, float(np.max(np.abs(deltas))))
+            self.latencies_ms.append(latency_ms)
+
+
+class ShadowEvaluator:
+    def __init__(self, name, candidate, rate, executor, source=None):
+        # candidate() returns the loaded runner (or None while unavailable)
+        self.name = name
+        self.candidate = candidate
+        self.rate = max(0.0, min(1.0, rate))
+        self.executor = executor
+        self.source = source
+        self.stats = ShadowStats()
+
+    def sample(self):
+        return self.rate > 0 and random.random() < self.rate
+
+    def submit(self, rows, results):
+        try:
+            self.executor.submit(self.evaluate, rows, results)
+        except Overloaded:
+            self.stats.incr("dropped")
+
+    def evaluate(self, rows, results):
+        runner = self.candidate()
+        if runner is None:
+            self.stats.incr("errors")
+            return
+        try:
+            start = time.perf_counter()
+            labels, positive = runner.predict(runner.assemble(rows))
+            latency_ms = (time.perf_counter() - start) * 1000
+        except Exception:
+            self.stats.incr("errors")
+            return
+
+        agree = [
+            is_positive_label(label) == is_positive_label(result["raw_model_label"])
+            for label, result in zip(labels, results)
+        ]
+        # Probability deltas in percentage points, like the API reports
+        deltas = np.empty(0)
+        if positive is not None:
+            deltas = np.asarray(positive, dtype=float) * 100 - [r["probability"] for r in results]
+        self.stats.record(agree, deltas, latency_ms)
+
+    def snapshot(self):
+        s = self.stats
+        with s._lock:
+            latencies = np.asarray(s.latencies_ms)
+            return {
+                "candidate": self.source,
+                "rate": self.rate,
+                "sampled": s.sampled,
+                "dropped": s.dropped,
+                "errors": s.errors,
+                "evaluated_requests": s.jobs,
+                "evaluated_rows": s.rows,
+                "agreement_rate": round(s.agree / s.rows, 4) if s.rows else None,
+                "probability_delta_mean": round(s.delta_sum / s.rows, 4) if s.rows else None,
+                "probability_delta_abs_mean": round(s.abs_delta_sum / s.rows, 4) if s.rows else None,
+                "probability_delta_abs_max": round(s.max_abs_delta, 4),
+                "candidate_latency_ms": {
+                    "p50": round(float(np.percentile(latencies, 50)), 3),
+                    "p95": round(float(np.percentile(latencies, 95)), 3),
+                    "max": round(float(latencies.max()), 3),
+                } if len(latencies) else None,
+            }
+
+
+def defer_shadow(state, evaluator, rows, results):
+    """Park a sampled job on the request until the response is sent."""
+    if evaluator is None or not evaluator.sample():
+        return
+    evaluator.stats.incr("sampled")
+    state.setdefault("shadow", []).append((evaluator, rows, results))
+
+
+def flush_shadow(state):
+    for evaluator, rows, results in state.pop("shadow", ()):
+        evaluator.submit(rows, results)
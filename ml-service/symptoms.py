@@ -0,0 +1,230 @@
+# =====================================================
+# SYMPTOM VOCABULARY INDEX
+# =====================================================
+# Built once from symptom_columns.pkl: normalized name (and alias) ->
+# column id. A request only touches the columns it names: ids are looked
+# up in a dict, set in a per-thread preallocated row, and cleared again
+# after the model call, so nothing scales with the vocabulary size.
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+# Common lay / clinical synonyms. Only kept when the target column exists.
+DEFAULT_ALIASES = {
+    "breathlessness": "shortness of breath",
+    "dyspnea": "shortness of breath",
+    "dyspnoea": "shortness of breath",
+    "short of breath": "shortness of breath",
+    "pyrexia": "fever",
+    "high temperature": "fever",
+    "tiredness": "fatigue",
+    "exhaustion": "fatigue",
+    "emesis": "vomiting",
+    "throwing up": "vomiting",
+    "lightheadedness": "dizziness",
+    "syncope": "fainting",
+    "passing out": "fainting",
+    "rash": "skin rash",
+    "itching": "itching of skin",
+    "pruritus": "itching of skin",
+    "sleeplessness": "insomnia",
+    "runny nose": "coryza",
+    "stuffy nose": "nasal congestion",
+    "blocked nose": "nasal congestion",
+    "epistaxis": "nosebleed",
+    "hematuria": "blood in urine",
+    "haematuria": "blood in urine",
+    "dysuria": "painful urination",
+    "polyuria": "frequent urination",
+    "myalgia": "muscle pain",
+    "arthralgia": "joint pain",
+    "cephalalgia": "headache",
+    "weight loss": "recent weight loss",
+    "throat pain": "sore throat",
+    "convulsions": "seizures",
+    "fits": "seizures",
+    "perspiration": "sweating",
+}
+
+
+def normalize_symptom(name):
+    return "_".join(str(name).lower().replace("-", " ").split())
+
+
+def load_aliases(path):
+    # Optional deployment-specific synonyms: {"alias": "column name"}
+    if path is None or not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+class SymptomIndex:
+    def __init__(self, columns, aliases=None):
+        self.columns = [str(c) for c in columns]
+        self.sorted_columns = sorted(self.columns)
+        self.ids = {normalize_symptom(c): i for i, c in enumerate(self.columns)}
+
+        self.aliases = {}
+        for alias, target in {**DEFAULT_ALIASES, **(aliases or {})}.items():
+            key, target_id = normalize_symptom(alias), self.ids.get(normalize_symptom(target))
+            if target_id is not None and key not in self.ids:
+                self.aliases[key] = target_id
+
+        self.finder = SymptomSearch(self.columns, self.aliases)
+        # /symptoms payload serialized once; the ETag changes with the list
+        self.list_body = json.dumps({"symptoms": self.sorted_columns}).encode()
+        self.etag = '"' + hashlib.sha256(self.list_body).hexdigest()[:16] + '"'
+
+        self._local = threading.local()
+
+    def __len__(self):
+        return len(self.columns)
+
+    def __bool__(self):
+        return bool(self.columns)
+
+    def resolve(self, name):
+        key = normalize_symptom(name)
+        column = self.ids.get(key)
+        return self.aliases.get(key) if column is None else column
+
+    def search(self, query, limit=10):
+        return self.finder.search(query, limit)
+
+    def lookup(self, symptoms):
+        """Column ids of recognized symptoms (deduplicated) and the rest."""
+        ids, unrecognized = [], []
+        for name in symptoms:
+            column = self.resolve(name)
+            if column is None:
+                unrecognized.append(name)
+            elif column not in ids:
+                ids.append(column)
+        return ids, unrecognized
+
+    def _row(self):
+        row = getattr(self._local, "row", None)
+        if row is None:
+            row = self._local.row = np.zeros((1, len(self.columns)), dtype=np.float64)
+        return row
+
+    def predict_proba(self, model, ids):
+        # Reuses this thread's zeroed row; only the set entries are reset
+        row = self._row()
+        row[0, ids] = 1.0
+        try:
+            return np.asarray(model.predict_proba(row))[0]
+        finally:
+            row[0, ids] = 0.0
+
+
+def top_k(probs, classes, k=3):
+    k = min(k, len(probs))
+    if k <= 0:
+        return []
+    candidates = np.argpartition(-probs, k - 1)[:k] if k < len(probs) else np.arange(len(probs))
+    # Highest probability first; ties keep class order like a stable sort
+    candidates = candidates[np.lexsort((candidates, -probs[candidates]))]
+    return [
+        {"disease": str(classes[i]), "probability": round(float(probs[i]) * 100, 2)}
+        for i in candidates
+    ]
+
+
+# =====================================================
+# AUTOCOMPLETE (prefix trie + trigram index)
+# =====================================================
+# Both indexes are built once per vocabulary. Prefix lookups walk the
+# trie (every word start of every name and alias is inserted), substring
+# candidates come from intersecting trigram posting lists, and typos are
+# scored by trigram overlap, so a query never scans the whole list.
+PREFIX, WORD_PREFIX, SUBSTRING, FUZZY = range(4)
+MATCH_KINDS = ("prefix", "word_prefix", "substring", "fuzzy")
+
+FUZZY_MIN_SCORE = 0.4
+
+
+def search_key(name):
+    return " ".join(str(name).lower().replace("_", " ").replace("-", " ").split())
+
+
+def trigrams(text):
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SymptomSearch:
+    def __init__(self, columns, aliases=None):
+        self.columns = list(columns)
+        # (search key, column id) for every name and alias
+        self.terms = [(search_key(c), i) for i, c in enumerate(self.columns)]
+        self.terms += [(search_key(a), i) for a, i in (aliases or {}).items()]
+
+        self.trie = {}
+        self.grams = {}
+        for term_id, (key, _) in enumerate(self.terms):
+            for start in [0] + [i + 1 for i, ch in enumerate(key) if ch == " "]:
+                node = self.trie
+                for ch in key[start:]:
+                    node = node.setdefault(ch, {})
+                    node.setdefault("", []).append(term_id)
+            for gram in trigrams(key):
+                self.grams.setdefault(gram, set()).add(term_id)
+        self.gram_counts = [len(trigrams(key)) for key, _ in self.terms]
+
+    def _prefixed(self, q):
+        node = self.trie
+        for ch in q:
+            node = node.get(ch)
+            if node is None:
+                return []
+        return node[""]
+
+    def _candidates(self, q):
+        grams = trigrams(q)
+        postings = [self.grams.get(g, set()) for g in grams]
+        # Substring matches must contain every inner trigram of the query
+        inner = [self.grams.get(q[i:i + 3], set()) for i in range(len(q) - 2)]
+        substring = set.intersection(*inner) if inner else set()
+
+        overlap = {}
+        for posting in postings:
+            for term_id in posting:
+                overlap[term_id] = overlap.get(term_id, 0) + 1
+        return substring, overlap, len(grams)
+
+    def search(self, query, limit=10):
+        q = search_key(query)
+        if not q or limit <= 0:
+            return []
+
+        best = {}  # column id -> (kind, score, term)
+
+        def offer(term_id, kind, score=0.0):
+            key, column = self.terms[term_id]
+            rank = (kind, -score, len(key), key)
+            if column not in best or rank < best[column]:
+                best[column] = rank
+
+        for term_id in self._prefixed(q):
+            offer(term_id, PREFIX if self.terms[term_id][0].startswith(q) else WORD_PREFIX)
+
+        if len(q) >= 3:
+            substring, overlap, n_grams = self._candidates(q)
+            for term_id in substring:
+                if q in self.terms[term_id][0]:
+                    offer(term_id, SUBSTRING)
+            for term_id, shared in overlap.items():
+                score = 2 * shared / (n_grams + self.gram_counts[term_id])
+                if score >= FUZZY_MIN_SCORE:
+                    offer(term_id, FUZZY, score)
+
+        ranked = sorted(best.items(), key=lambda item: (item[1], self.columns[item[0]]))[:limit]
+        return [
+            {"symptom": self.columns[column], "match": MATCH_KINDS[rank[0]]}
+            for column, rank in ranked
+        ]
@@ -21,8 +21,12 @@ try:
 except Exception:
     pass
 
-# Now import app (which will apply its own patches and load models)
-from app import heart_model, diabetes_model, liver_model
+# Now import app and force the lazy registry to load each model
+from app import MODELS
+
+heart_model = MODELS.get("heart")
+diabetes_model = MODELS.get("diabetes")
+liver_model = MODELS.get("liver")
 
 print("\n=== Model Loading Status ===")
 print(f"Heart model: {'✅ Loaded' if heart_model is not None else '❌ Failed'}")
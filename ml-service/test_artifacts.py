@@ -0,0 +1,120 @@
+import json
+import os
+import shutil
+import tempfile
+import warnings
+
+import joblib
+import numpy as np
+
+warnings.filterwarnings("ignore")
+
+from app import MODEL_DIR, WARM_INPUTS
+from artifacts import (
+    UnsupportedModel, check_parity, current_export, export, export_kind, load_export, parity_inputs
+)
+from tree_engine import FlatForest
+
+PICKLES = ["heart_model.pkl", "diabetes_model_cleaned.pkl", "liver_model.pkl", "symptom_columns.pkl"]
+
+
+def copy_pickles(tmp):
+    paths = []
+    for name in PICKLES:
+        source = os.path.join(MODEL_DIR, name)
+        if os.path.exists(source):
+            paths.append(shutil.copy(source, tmp))
+    return paths
+
+
+def test_export_matches_original_pickles():
+    print("\n--- Testing export parity against the pickles ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        for path in copy_pickles(tmp):
+            original = joblib.load(path)
+            directory = export(path, original)
+            assert current_export(path) == directory
+            for mmap in (False, True):
+                loaded = load_export(directory, mmap=mmap)
+                X = None if isinstance(original, list) else parity_inputs(original)
+                assert check_parity(original, loaded, X) == 0.0, (path, mmap)
+
+            name = os.path.basename(path).split("_")[0]
+            if name in WARM_INPUTS:
+                X = np.array([WARM_INPUTS[name]], dtype=float)
+                assert check_parity(original, loaded, X) == 0.0
+            print(f"{os.path.basename(path)}: {export_kind(directory)} OK")
+
+        liver = os.path.join(tmp, "liver_model.pkl")
+        if os.path.exists(liver):
+            forest = load_export(current_export(liver), mmap=True)
+            assert isinstance(forest, FlatForest) and isinstance(forest.left, np.memmap)
+            # Against sklearn's own trees, not a FlatForest compiled from them
+            original = joblib.load(liver)
+            X = parity_inputs(original)
+            assert np.array_equal(original.predict_proba(X), forest.predict_proba(X))
+
+            # An export that no longer matches the trees must fail the check
+            forest.proba = np.ascontiguousarray(forest.proba[:, ::-1])
+            assert check_parity(original, forest, X) > 0.0
+    print("SUCCESS")
+
+
+def test_stale_or_foreign_exports_are_ignored():
+    print("\n--- Testing export freshness and safety ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "heart_model.pkl")
+        if not os.path.exists(os.path.join(MODEL_DIR, "heart_model.pkl")):
+            print("Heart model not present.")
+            return
+        shutil.copy(os.path.join(MODEL_DIR, "heart_model.pkl"), path)
+        directory = export(path)
+
+        # A replaced pickle must not be shadowed by the old export
+        model = joblib.load(path)
+        model.coef_ = model.coef_ * 2
+        joblib.dump(model, path)
+        assert current_export(path) is None
+
+        # With the pickle gone the export stands alone
+        os.remove(path)
+        assert current_export(path) == directory
+
+        meta_path = os.path.join(directory, "meta.json")
+        meta = json.load(open(meta_path))
+        meta["model"]["class"] = "os.system"
+        json.dump(meta, open(meta_path, "w"))
+        try:
+            load_export(directory)
+            assert False, "expected UnsupportedModel"
+        except UnsupportedModel:
+            pass
+
+        meta["format_version"] = 99
+        json.dump(meta, open(meta_path, "w"))
+        assert current_export(path) is None
+    print("SUCCESS")
+
+
+def test_unsupported_models_raise():
+    print("\n--- Testing unsupported estimators ---")
+    from sklearn.svm import SVC
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "svc.pkl")
+        X = np.random.default_rng(0).normal(size=(40, 3))
+        joblib.dump(SVC().fit(X, X[:, 0] > 0), path)
+        try:
+            export(path)
+            assert False, "expected UnsupportedModel"
+        except UnsupportedModel:
+            pass
+        assert not os.path.exists(os.path.join(tmp, "svc.medhive"))
+        assert [f for f in os.listdir(tmp) if f.endswith(".tmp")] == []
+    print("SUCCESS")
+
+
+if __name__ == "__main__":
+    test_export_matches_original_pickles()
+    test_stale_or_foreign_exports_are_ignored()
+    test_unsupported_models_raise()
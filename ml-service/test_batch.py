@@ -0,0 +1,113 @@
+import json
+import warnings
+
+from fastapi.testclient import TestClient
+
+warnings.filterwarnings("ignore")
+
+from app import app, MODELS
+
+client = TestClient(app)
+
+HEART = [
+    {"age": 30, "sex": 1, "cp": 0, "trestbps": 120, "chol": 200, "fbs": 0, "restecg": 0,
+     "thalach": 150, "exang": 0, "oldpeak": 0.0, "slope": 2, "ca": 0, "thal": 2},
+    {"age": 70, "sex": 1, "cp": 0, "trestbps": 160, "chol": 300, "fbs": 1, "restecg": 1,
+     "thalach": 100, "exang": 1, "oldpeak": 3.0, "slope": 1, "ca": 2, "thal": 3},
+]
+
+DIABETES = [
+    {"Pregnancies": 0, "Glucose": 85, "BloodPressure": 66, "SkinThickness": 29,
+     "Insulin": 0, "BMI": 26.6, "DiabetesPedigreeFunction": 0.351, "Age": 31},
+    {"Pregnancies": 6, "Glucose": 148, "BloodPressure": 72, "SkinThickness": 35,
+     "Insulin": 0, "BMI": 33.6, "DiabetesPedigreeFunction": 0.627, "Age": 50},
+]
+
+LIVER = [
+    {"age": 28, "gender": 0, "total_bilirubin": 0.7, "direct_bilirubin": 0.2,
+     "alkaline_phosphotase": 95, "alt": 22, "ast": 20, "total_proteins": 7.4,
+     "albumin": 4.4, "ag_ratio": 1.6},
+    {"age": 52, "gender": 1, "total_bilirubin": 2.4, "direct_bilirubin": 1.1,
+     "alkaline_phosphotase": 230, "alt": 72, "ast": 68, "total_proteins": 6.1,
+     "albumin": 3.0, "ag_ratio": 0.8},
+]
+
+
+def check_batch_matches_single(model, records):
+    print(f"\n--- Testing {model} batch ---")
+    if MODELS.get(model) is None:
+        print(f"{model} model not loaded.")
+        return
+
+    singles = [client.post(f"/predict/{model}", json=r).json() for r in records]
+    res = client.post(f"/predict/{model}/batch", json=records)
+    assert res.status_code == 200, res.text
+
+    body = res.json()
+    assert body["count"] == len(records) and body["failed"] == 0
+    for i, (single, batched) in enumerate(zip(singles, body["results"])):
+        assert batched.pop("index") == i
+        assert batched == single, (batched, single)
+
+    print("SUCCESS")
+
+
+def test_heart_batch():
+    check_batch_matches_single("heart", HEART)
+
+
+def test_diabetes_batch():
+    check_batch_matches_single("diabetes", DIABETES)
+
+
+def test_liver_batch():
+    check_batch_matches_single("liver", LIVER)
+
+
+def test_batch_reports_invalid_records():
+    print("\n--- Testing per-record validation errors ---")
+    if MODELS.get("liver") is None:
+        print("liver model not loaded.")
+        return
+
+    broken = dict(LIVER[1], alt="high")
+    res = client.post("/predict/liver/batch", json=[LIVER[0], broken, "nope", LIVER[1]])
+    assert res.status_code == 200, res.text
+
+    body = res.json()
+    assert (body["succeeded"], body["failed"]) == (2, 2)
+    assert "prediction" in body["results"][0]
+    assert body["results"][1]["error"][0]["loc"] == ["alt"]
+    assert "error" in body["results"][2]
+    assert body["results"][3]["index"] == 3
+
+    print("SUCCESS")
+
+
+def test_batch_rejects_non_finite_values():
+    print("\n--- Testing NaN / Infinity records ---")
+    for name, records, field in (("liver", LIVER, "total_bilirubin"), ("heart", HEART, "oldpeak")):
+        if MODELS.get(name) is None:
+            print(f"{name} model not loaded.")
+            continue
+        # Python's JSON reads these bare tokens
+        body = json.dumps([records[0], dict(records[1], **{field: float("inf")}),
+                           dict(records[1], **{field: float("nan")}), records[1]])
+        assert "Infinity" in body and "NaN" in body
+        res = client.post(f"/predict/{name}/batch", content=body, headers={"content-type": "application/json"})
+        assert res.status_code == 200, res.text
+
+        results = res.json()["results"]
+        assert "prediction" in results[0] and "prediction" in results[3]
+        for bad in results[1:3]:
+            assert bad["error"] == [{"loc": [field], "msg": "Input should be a finite number", "type": "finite_number"}]
+        print(f"{name}: {field} rejected per record")
+    print("SUCCESS")
+
+
+if __name__ == "__main__":
+    test_heart_batch()
+    test_diabetes_batch()
+    test_liver_batch()
+    test_batch_reports_invalid_records()
+    test_batch_rejects_non_finite_values()
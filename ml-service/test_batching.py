@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+import numpy as np
+
+from batching import MicroBatcher
+
+
+def test_concurrent_requests_share_batches():
+    print("\n--- Testing micro-batcher ---")
+    calls = []
+
+    def forward(X):
+        calls.append(len(X))
+        time.sleep(0.01)
+        return X.reshape(len(X), -1).sum(axis=1)
+
+    batcher = MicroBatcher("test", forward, max_batch_size=8, max_wait_ms=20)
+
+    async def run():
+        inputs = [np.full((4, 4), i, dtype=np.float32) for i in range(20)]
+        return await asyncio.gather(*(batcher.submit(x) for x in inputs))
+
+    results = asyncio.run(run())
+
+    assert [float(r) for r in results] == [i * 16.0 for i in range(20)]
+    assert sum(calls) == 20 and max(calls) <= 8 and len(calls) < 20
+
+    stats = batcher.snapshot()
+    assert stats["items"] == 20 and stats["batches"] == len(calls)
+    print(f"Batch sizes: {calls}, Stats: {stats}")
+    print("SUCCESS")
+
+
+def test_forward_errors_reach_every_caller():
+    print("\n--- Testing micro-batcher error propagation ---")
+
+    def forward(X):
+        raise RuntimeError("boom")
+
+    batcher = MicroBatcher("test", forward, max_batch_size=4, max_wait_ms=5)
+
+    async def run():
+        x = np.zeros(3)
+        return await asyncio.gather(*(batcher.submit(x) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert batcher.snapshot()["errors"] >= 1
+    print("SUCCESS")
+
+
+if __name__ == "__main__":
+    test_concurrent_requests_share_batches()
+    test_forward_errors_reach_every_caller()
@@ -0,0 +1,61 @@
+import asyncio
+import io
+import warnings
+
+import numpy as np
+
+warnings.filterwarnings("ignore")
+
+from app import MODELS
+from benchmarks import synthetic
+from benchmarks.loadgen import build_requests, load_test
+from benchmarks.results import compare
+
+
+def test_baseline_comparison_flags_regressions():
+    print("\n--- Testing baseline comparison ---")
+    baseline = {"meta": {"commit": "a"}, "load": {"inprocess": {"heart": {"p95_ms": 10.0, "rps": 500.0}}},
+                "inference": {"heart": {"1": {"us_per_call": 50.0}}}}
+    current = {"meta": {"commit": "b"}, "load": {"inprocess": {"heart": {"p95_ms": 11.0, "rps": 300.0},
+                                                               "ecg": {"p95_ms": 99.0}}},
+               "inference": {"heart": {"1": {"us_per_call": 80.0}}}}
+
+    rows = {metric: regressed for metric, _, _, _, regressed in compare(baseline, current, threshold=0.2)}
+    assert rows == {
+        "inference.heart.1.us_per_call": True,
+        "load.inprocess.heart.p95_ms": False,
+        "load.inprocess.heart.rps": True,
+    }
+    print("SUCCESS")
+
+
+def test_synthetic_payloads_are_valid_and_unique():
+    print("\n--- Testing synthetic payloads ---")
+    heart = build_requests("heart", 50)
+    assert len({str(kwargs["json"]) for _, _, kwargs in heart}) == 50
+    assert set(heart[0][2]["json"]) == set(synthetic.HEART_RANGES)
+    assert synthetic.ecg_image(np.random.default_rng(0))[:8] == b"\x89PNG\r\n\x1a\n"
+
+    runner = synthetic.synthetic_tabular("liver")
+    labels, positive = runner.predict(runner.assemble([list(synthetic.records("liver", 1)[0].values())]))
+    assert len(labels) == 1 and 0.0 <= positive[0] <= 1.0
+    print("SUCCESS")
+
+
+def test_in_process_load_reports_percentiles():
+    print("\n--- Testing in-process load generator ---")
+    if MODELS.get("heart") is None:
+        print("Heart model not loaded.")
+        return
+    results = asyncio.run(load_test("inprocess", ["heart"], 20, 4, synthetic_models=False, log=io.StringIO()))
+    stats = results["heart"]
+    assert stats["requests"] == 20 and stats["errors"] == 0
+    assert 0 < stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"] <= stats["max_ms"]
+    print(f"Stats: {stats}")
+    print("SUCCESS")
+
+
+if __name__ == "__main__":
+    test_baseline_comparison_flags_regressions()
+    test_synthetic_payloads_are_valid_and_unique()
+    test_in_process_load_reports_percentiles()
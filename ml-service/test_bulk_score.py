@@ -0,0 +1,150 @@
+import gc
+import io
+import os
+import sys
+import tempfile
+import warnings
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+warnings.filterwarnings("ignore")
+
+from app import app, MODELS, HEART_FEATURES
+from bulk_score import feature_columns, run
+from test_batch import DIABETES, HEART, LIVER
+
+client = TestClient(app)
+
+
+def heart_frame(n=50):
+    rows = [HEART[i % len(HEART)] for i in range(n)]
+    return pd.DataFrame(rows)
+
+
+def test_columns_match_api_or_training_names():
+    print("\n--- Testing bulk column mapping ---")
+    fields = list(HEART[0])
+    assert feature_columns(fields, fields) == fields
+    assert feature_columns([c.upper() for c in HEART_FEATURES], fields, HEART_FEATURES) == [c.upper() for c in HEART_FEATURES]
+    try:
+        feature_columns(fields[:-1], fields)
+        assert False, "expected ValueError"
+    except ValueError as e:
+        assert "thal" in str(e)
+    print("SUCCESS")
+
+
+def test_bulk_endpoint_matches_batch_endpoint():
+    print("\n--- Testing /predict/{model}/bulk ---")
+    for name, records in (("heart", HEART), ("diabetes", DIABETES), ("liver", LIVER)):
+        if MODELS.get(name) is None:
+            print(f"{name} model not loaded.")
+            continue
+        df = pd.DataFrame(records * 5)
+        df.loc[3, df.columns[1]] = None
+        upload = {"file": (f"{name}.csv", df.to_csv(index=False).encode(), "text/csv")}
+        response = client.post(f"/predict/{name}/bulk", files=upload, params={"chunk_rows": 4})
+        assert response.status_code == 200, response.text
+
+        scored = pd.read_csv(io.StringIO(response.text), keep_default_na=False)
+        assert len(scored) == len(df) and scored.loc[3, "error"] != ""
+        batch = client.post(f"/predict/{name}/batch", json=records * 5).json()["results"]
+        for i, row in scored.iterrows():
+            if i != 3:
+                assert row["prediction"] == batch[i]["prediction"]
+                assert float(row["probability"]) == batch[i]["probability"]
+
+    bad = client.post("/predict/heart/bulk", files={"file": ("x.csv", b"age,sex\n1,2\n", "text/csv")})
+    assert bad.status_code == 400 and "missing columns" in bad.json()["detail"]
+    print("SUCCESS")
+
+
+def test_bulk_endpoint_releases_the_spool():
+    print("\n--- Testing bulk spool cleanup ---")
+    if MODELS.get("heart") is None:
+        print("Heart model not loaded.")
+        return
+    # A chunk reader outliving its spool only fails when collected, as
+    # an unraisable exception rather than a request error
+    unraisable = []
+    saved, sys.unraisablehook = sys.unraisablehook, unraisable.append
+    try:
+        heart = heart_frame(20).to_csv(index=False).encode()
+        cases = [
+            (b"age,sex\n1,2\n3,4\n", 400),
+            (b"age,sex\n", 400),
+            (heart, 200),
+        ]
+        for body, status in cases:
+            upload = {"file": ("heart.csv", body, "text/csv")}
+            response = client.post("/predict/heart/bulk", files=upload, params={"chunk_rows": 4})
+            assert response.status_code == status, response.text
+        gc.collect()
+    finally:
+        sys.unraisablehook = saved
+    assert not unraisable, [str(u.exc_value) for u in unraisable]
+    print("SUCCESS")
+
+
+def test_bad_values_get_row_errors():
+    print("\n--- Testing bulk rows with bad values ---")
+    if MODELS.get("liver") is None:
+        print("Liver model not loaded.")
+        return
+    df = pd.DataFrame(LIVER * 3).astype(object)
+    df.loc[1, "total_bilirubin"] = "inf"
+    df.loc[2, "alt"] = 1e300  # beyond float32, which the trees run in
+    df.loc[3, "age"] = 41.5
+    df.loc[4, "ast"] = "n/a"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source, target = os.path.join(tmp, "in.csv"), os.path.join(tmp, "out.csv")
+        df.to_csv(source, index=False)
+        rows, failed = run("liver", source, target, chunk_rows=4, log=io.StringIO())
+        assert (rows, failed) == (6, 4)
+        scored = pd.read_csv(target, keep_default_na=False)
+
+        upload = {"file": ("liver.csv", open(source, "rb").read(), "text/csv")}
+        response = client.post("/predict/liver/bulk", files=upload, params={"chunk_rows": 4})
+        assert response.status_code == 200, response.text
+        assert pd.read_csv(io.StringIO(response.text), keep_default_na=False)["error"].tolist() == scored["error"].tolist()
+
+    errors = scored["error"].tolist()
+    assert errors[0] == errors[5] == ""
+    assert errors[1] == "total_bilirubin: Input should be a finite number"
+    assert errors[2] == "alt: Input should be within the float32 range"
+    assert errors[3].startswith("age: Input should be a valid integer")
+    assert errors[4] == "ast: Input should be a valid integer"
+    assert scored.loc[1:4, "prediction"].eq("").all() and scored.loc[0, "prediction"] != ""
+    print("SUCCESS")
+
+
+def test_cli_scores_in_order_with_workers():
+    print("\n--- Testing bulk_score CLI ---")
+    if MODELS.get("heart") is None:
+        print("Heart model not loaded.")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "in.csv")
+        df = heart_frame(300)
+        df["patient_id"] = range(len(df))
+        df.to_csv(source, index=False)
+
+        outputs = []
+        for workers in (1, 2):
+            target = os.path.join(tmp, f"out{workers}.csv")
+            rows, failed = run("heart", source, target, workers=workers, chunk_rows=64, log=io.StringIO())
+            assert rows == 300 and failed == 0
+            outputs.append(pd.read_csv(target))
+        assert list(outputs[1]["patient_id"]) == list(range(300))
+        assert outputs[0].equals(outputs[1])
+    print("SUCCESS")
+
+
+if __name__ == "__main__":
+    test_columns_match_api_or_training_names()
+    test_bulk_endpoint_matches_batch_endpoint()
+    test_bulk_endpoint_releases_the_spool()
+    test_bad_values_get_row_errors()
+    test_cli_scores_in_order_with_workers()
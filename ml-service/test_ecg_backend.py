@@ -0,0 +1,97 @@
+import os
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+import ecg_backend
+from ecg_backend import (
+    ParityError, build_backend, compiled_cache_path, parity_check, parity_images, split_calibration, synthetic_images
+)
+from memory import memory_report
+
+
+class StubModel:
+    def __init__(self, noise=0.0):
+        self.noise = noise
+
+    def predict_on_batch(self, X):
+        return X.mean(axis=(1, 2, 3))[:, None] + self.noise
+
+
+def test_parity_check_enforces_tolerance():
+    print("\n--- Testing ECG backend parity check ---")
+    images = synthetic_images(8)
+    report = parity_check(StubModel(), StubModel(0.001), images, tolerance=0.01)
+    assert report["samples"] == len(images) and report["max_abs_error"] <= 0.01
+    try:
+        parity_check(StubModel(), StubModel(0.05), images, tolerance=0.01)
+        assert False, "expected ParityError"
+    except ParityError:
+        pass
+    print(f"Report: {report}")
+    print("SUCCESS")
+
+
+def test_parity_images_are_preprocessed_like_requests():
+    print("\n--- Testing ECG parity image loading ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(3):
+            Image.new("RGB", (640, 480), (i * 80, 0, 0)).save(os.path.join(tmp, f"{i}.png"))
+        images = parity_images(tmp)
+    assert images.shape == (3, 224, 224, 3) and images.dtype == np.float32
+    assert np.allclose(images[:, 0, 0, 0], [0, 80 / 255, 160 / 255])
+    assert parity_images(None) is None
+
+    # int8 never gets checked on the images it was calibrated on
+    calibration, held_out = split_calibration(images)
+    assert np.allclose(calibration[:, 0, 0, 0], [80 / 255])
+    assert np.allclose(held_out[:, 0, 0, 0], [0, 160 / 255])
+    try:
+        split_calibration(images[:1])
+        assert False, "expected ParityError"
+    except ParityError:
+        pass
+    print("SUCCESS")
+
+
+def test_no_parity_images_keeps_keras():
+    print("\n--- Testing ECG backend without parity images ---")
+    model = StubModel()
+    saved, ecg_backend.SYNTHETIC_PARITY = ecg_backend.SYNTHETIC_PARITY, False
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            # Rejected before any conversion, so this holds without TensorFlow
+            for backend in ("tflite", "tflite-int8", "xla"):
+                assert build_backend(model, os.path.join(tmp, "ecg.keras"), "abc", backend=backend) is model
+            assert not os.path.exists(os.path.join(tmp, ".compiled"))
+    finally:
+        ecg_backend.SYNTHETIC_PARITY = saved
+    print("SUCCESS")
+
+
+def test_keras_backend_is_a_passthrough():
+    print("\n--- Testing default ECG backend ---")
+    model = StubModel()
+    assert build_backend(model, "models/ecg.keras", "abc", backend="keras") is model
+    assert compiled_cache_path("models/ecg.keras", "abc", "tflite").endswith(".compiled/ecg.keras.abc.dynamic.tflite")
+
+    # int8 artifacts are keyed by their calibration images too
+    images = synthetic_images(4)
+    int8 = compiled_cache_path("models/ecg.keras", "abc", "tflite-int8", images)
+    assert int8 == compiled_cache_path("models/ecg.keras", "abc", "tflite-int8", images.copy())
+    assert ".abc.int8-" in int8
+    assert int8 != compiled_cache_path("models/ecg.keras", "abc", "tflite-int8", images[:3])
+    assert int8 != compiled_cache_path("models/ecg.keras", "abc", "tflite-int8", images[::-1])
+
+    class Compiled:
+        model_bytes = 3 * 2**20
+    assert memory_report(Compiled())["mapped_mb"] == 3.0
+    print("SUCCESS")
+
+
+if __name__ == "__main__":
+    test_parity_check_enforces_tolerance()
+    test_parity_images_are_preprocessed_like_requests()
+    test_no_parity_images_keeps_keras()
+    test_keras_backend_is_a_passthrough()
@@ -0,0 +1,150 @@
+import asyncio
+import io
+import warnings
+
+import numpy as np
+from fastapi.testclient import TestClient
+from PIL import Image
+
+warnings.filterwarnings("ignore")
+
+from app import app, MODELS
+from batching import MicroBatcher
+from ecg_preprocess import (
+    ECG_SIZE, BatchBuffer, ImageTooLarge, InvalidImage,
+    decode_ecg_image, load_ecg_image, read_upload
+)
+
+client = TestClient(app)
+
+
+def ecg_like(size=(1600, 1200), fmt="PNG"):
+    # Grid paper with a trace, roughly what users upload
+    rng = np.random.default_rng(0)
+    w, h = size
+    img = np.full((h, w, 3), 250, dtype=np.uint8)
+    img[::40, :, 0] = 200
+    img[:, ::40, 0] = 200
+    ys = (h / 2 + 200 * np.sin(np.arange(w) / 25) + rng.normal(0, 5, w)).astype(int).clip(0, h - 1)
+    img[ys, np.arange(w)] = 0
+    buf = io.BytesIO()
+    Image.fromarray(img).save(buf, format=fmt)
+    return buf.getvalue()
+
+
+class FakeUpload:
+    def __init__(self, data):
+        self.stream = io.BytesIO(data)
+
+    async def read(self, n=-1):
+        return self.stream.read(n)
+
+
+def test_normalization_matches_previous_pipeline():
+    print("\n--- Testing ECG normalization parity ---")
+    contents = ecg_like(fmt="PNG")
+    expected = np.asarray(
+        Image.open(io.BytesIO(contents)).convert("RGB").resize(ECG_SIZE), dtype=np.float32
+    ) / 255.0
+    assert np.array_equal(load_ecg_image(contents), expected)
+
+    arr, timings = decode_ecg_image(contents)
+    assert arr.dtype == np.uint8 and arr.shape == (224, 224, 3)
+    assert set(timings) == {"decode", "resize"}
+    print("SUCCESS")
+
+
+def test_draft_decode_stays_close_to_full_decode():
+    print("\n--- Testing reduced-size JPEG decode ---")
+    contents = ecg_like(size=(2400, 1800), fmt="JPEG")
+    full, full_t = decode_ecg_image(contents, draft=False)
+    fast, fast_t = decode_ecg_image(contents, draft=True)
+    diff = np.abs(full.astype(int) - fast.astype(int)).mean()
+    print(f"decode {full_t['decode']:.1f} ms -> {fast_t['decode']:.1f} ms, mean abs diff {diff:.2f}/255")
+    assert diff < 8
+    print("SUCCESS")
+
+
+def test_limits_are_enforced_before_decoding():
+    print("\n--- Testing ECG upload limits ---")
+    contents = ecg_like(size=(800, 600))
+    try:
+        decode_ecg_image(contents, max_pixels=100_000)
+        assert False, "expected ImageTooLarge"
+    except ImageTooLarge:
+        pass
+    try:
+        decode_ecg_image(b"not an image")
+        assert False, "expected InvalidImage"
+    except InvalidImage:
+        pass
+
+    assert asyncio.run(read_upload(FakeUpload(contents), max_bytes=len(contents))) == contents
+    try:
+        asyncio.run(read_upload(FakeUpload(contents), max_bytes=len(contents) - 1))
+        assert False, "expected ImageTooLarge"
+    except ImageTooLarge:
+        pass
+    print("SUCCESS")
+
+
+def test_batch_buffer_is_reused():
+    print("\n--- Testing preallocated ECG batch buffer ---")
+    rng = np.random.default_rng(1)
+    items = [rng.integers(0, 256, size=(224, 224, 3), dtype=np.uint8) for _ in range(3)]
+    buffer = BatchBuffer(4)
+
+    X = buffer.collate(items)
+    assert X.shape == (3, 224, 224, 3) and np.shares_memory(X, buffer.data)
+    assert np.array_equal(X, np.stack([i.astype(np.float32) / 255.0 for i in items]))
+
+    seen = []
+    batcher = MicroBatcher("t", lambda X: seen.append(X.ctypes.data) or X.mean(axis=(1, 2, 3)),
+                           max_batch_size=4, max_wait_ms=20, collate=buffer.collate)
+
+    async def run():
+        timings = [{} for _ in items]
+        results = await asyncio.gather(*[batcher.submit(i, timings=t) for i, t in zip(items, timings)])
+        return results, timings
+
+    results, timings = asyncio.run(run())
+    assert np.allclose(results, [i.mean() / 255.0 for i in items], atol=1e-6)
+    assert seen == [buffer.data.ctypes.data]
+    assert all(set(t) == {"wait", "collate", "forward"} for t in timings)
+    print("SUCCESS")
+
+
+class StubEcgModel:
+    def predict_on_batch(self, X):
+        return 1.0 - X.mean(axis=(1, 2, 3))[:, None]
+
+
+def test_ecg_endpoint_reports_stage_timings():
+    print("\n--- Testing /predict/ecg stages ---")
+    entry = MODELS.entries["ecg"]
+    saved = (entry.state, entry.serving)
+    entry.state, entry.serving = "ready", (StubEcgModel(), "stub")
+    try:
+        response = client.post("/predict/ecg", files={"file": ("ecg.jpg", ecg_like(fmt="JPEG"), "image/jpeg")})
+        assert response.status_code == 200, response.text
+        assert response.json()["model_version"] == "stub"
+        stages = [part.split(";")[0] for part in response.headers["server-timing"].split(", ")]
+        assert stages == ["read", "decode", "resize", "wait", "normalize", "infer"]
+
+        bad = client.post("/predict/ecg", files={"file": ("ecg.jpg", b"garbage", "image/jpeg")})
+        assert bad.status_code == 400
+    finally:
+        entry.state, entry.serving = saved
+
+    stats = client.get("/stats").json()
+    assert stats["ecg_stages"]["requests"] >= 1
+    print(f"Stages: {response.headers['server-timing']}")
+    print("SUCCESS")
+
+
+if __name__ == "__main__":
+    test_normalization_matches_previous_pipeline()
+    test_draft_decode_stays_close_to_full_decode()
+    test_limits_are_enforced_before_decoding()
+    test_batch_buffer_is_reused()
+    test_ecg_endpoint_reports_stage_timings()
@@ -0,0 +1,173 @@
+import asyncio
+import json
+import time
+import warnings
+
+import numpy as np
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+warnings.filterwarnings("ignore")
+
+from app import app, MODELS
+from ecg_stream import FrameQueue, StreamTotals, serve_stream
+from registry import DISABLED
+from test_ecg_preprocess import StubEcgModel, ecg_like
+
+client = TestClient(app)
+
+
+class SlowEcgModel(StubEcgModel):
+    def predict_on_batch(self, X):
+        time.sleep(0.2)
+        return super().predict_on_batch(X)
+
+
+def serving(model):
+    entry = MODELS.entries["ecg"]
+    saved = (entry.state, entry.serving)
+    entry.state, entry.serving = "ready", (model, "stub")
+    return entry, saved
+
+
+def signal(i):
+    return {"type": "signal", "samples": np.sin(np.arange(1000) / (10 + i)).tolist()}
+
+
+def test_frame_queue_drops_oldest():
+    print("\n--- Testing drop-oldest queue ---")
+
+    async def run():
+        queue = FrameQueue(2)
+        assert queue.put(1) is None and queue.put(2) is None
+        assert queue.put(3) == 1
+        assert [await queue.get(), await queue.get()] == [2, 3]
+        getter = asyncio.ensure_future(queue.get())
+        await asyncio.sleep(0)
+        queue.put(4)
+        assert await getter == 4
+
+    asyncio.run(run())
+    print("SUCCESS")
+
+
+class StalledSocket:
+    """Delivers its messages, but never completes a send until it runs out."""
+
+    def __init__(self, messages):
+        self.incoming = [{"type": "websocket.receive", **m} for m in messages]
+        self.sent = []
+        self.reading = asyncio.Event()
+
+    async def receive(self):
+        if self.incoming:
+            return self.incoming.pop(0)
+        self.reading.set()
+        return {"type": "websocket.disconnect"}
+
+    async def send_json(self, message):
+        await self.reading.wait()
+        self.sent.append(message)
+
+
+def test_unread_replies_never_block_ingestion():
+    print("\n--- Testing a client that stops reading ---")
+
+    async def score(kind, payload):
+        return {"raw_score": 0.5}
+
+    messages = [{"text": "not json"} for _ in range(50)]
+    messages += [{"text": json.dumps({"type": "signal", "samples": [0.0]})} for _ in range(10)]
+    messages += [{"text": json.dumps({"type": "stats"})}]
+    socket = StalledSocket(messages)
+    totals = StreamTotals()
+
+    async def run():
+        # Before the outbox, the first error reply blocked the receive loop
+        return await asyncio.wait_for(serve_stream(socket, score, totals, max_queue=2, max_outbox=4), 5)
+
+    stats = asyncio.run(run())
+    assert not socket.incoming and stats.received == 10
+    assert stats.dropped_replies >= 40 and stats.dropped >= 1
+    assert totals.snapshot()["dropped_replies"] == stats.dropped_replies
+    print(f"Dropped {stats.dropped_replies} replies and {stats.dropped} frames")
+    print("SUCCESS")
+
+
+def test_stream_scores_images_and_signals():
+    print("\n--- Testing /ws/ecg ---")
+    entry, saved = serving(StubEcgModel())
+    try:
+        expected = client.post("/predict/ecg", files={"file": ("ecg.png", ecg_like(), "image/png")}).json()
+        with client.websocket_connect("/ws/ecg") as ws:
+            ws.send_bytes(ecg_like())
+            result = ws.receive_json()
+            assert result["type"] == "result" and result["seq"] == 0
+            assert result["raw_score"] == expected["raw_score"]
+
+            ws.send_json(signal(0))
+            assert ws.receive_json()["type"] == "result"
+            ws.send_json({"type": "signal", "samples": ["a", "b"]})
+            assert ws.receive_json()["type"] == "error"
+            ws.send_bytes(b"garbage")
+            error = ws.receive_json()
+            assert error["type"] == "error" and error["seq"] == 3
+
+            ws.send_json({"type": "stats"})
+            stats = ws.receive_json()
+            assert stats["received"] == 4 and stats["scored"] == 2 and stats["errors"] == 2
+            assert stats["latency_ms"]["max"] > 0
+    finally:
+        entry.state, entry.serving = saved
+    print(f"Connection stats: {stats}")
+    print("SUCCESS")
+
+
+def test_fast_client_loses_oldest_frames():
+    print("\n--- Testing /ws/ecg drop-oldest ---")
+    entry, saved = serving(SlowEcgModel())
+    try:
+        with client.websocket_connect("/ws/ecg") as ws:
+            for i in range(12):
+                ws.send_json(signal(i))
+            ws.send_json({"type": "stats"})
+            results = []
+            stats = None
+            while stats is None or len(results) + stats["dropped"] < 12:
+                message = ws.receive_json()
+                if message["type"] == "stats":
+                    stats = message
+                else:
+                    results.append(message)
+        seqs = [r["seq"] for r in results]
+        assert seqs == sorted(seqs) and seqs[-1] == 11
+        assert stats["dropped"] >= 1 and len(seqs) + stats["dropped"] == 12
+        print(f"Scored {seqs}, dropped {stats['dropped']}")
+    finally:
+        entry.state, entry.serving = saved
+    print("SUCCESS")
+
+
+def test_unavailable_model_closes_with_retry_code():
+    print("\n--- Testing /ws/ecg without a model ---")
+    entry = MODELS.entries["ecg"]
+    saved = (entry.state, entry.serving)
+    entry.state = DISABLED
+    try:
+        with client.websocket_connect("/ws/ecg") as ws:
+            try:
+                ws.receive_json()
+                assert False, "expected close"
+            except WebSocketDisconnect as e:
+                assert e.code == 1013
+    finally:
+        entry.state, entry.serving = saved
+    print("SUCCESS")
+
+
+if __name__ == "__main__":
+    test_frame_queue_drops_oldest()
+    test_unread_replies_never_block_ingestion()
+    test_stream_scores_images_and_signals()
+    test_fast_client_loses_oldest_frames()
+    test_unavailable_model_closes_with_retry_code()
@@ -0,0 +1,55 @@
+import asyncio
+import threading
+import time
+
+from executors import DeadlineExceeded, ModelExecutor, Overloaded, deadline_from
+
+
+def test_saturated_executor_rejects():
+    print("\n--- Testing admission control ---")
+    gate = threading.Event()
+    executor = ModelExecutor("test", workers=1, queue_size=1)
+
+    async def run():
+        running = [asyncio.ensure_future(executor.run(gate.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        try:
+            await executor.run(gate.wait)
+            rejected = False
+        except Overloaded:
+            rejected = True
+        gate.set()
+        await asyncio.gather(*running)
+        return rejected
+
+    assert asyncio.run(run())
+    stats = executor.snapshot()
+    assert stats["rejected"] == 1 and stats["inflight"] == 0
+    print(f"Stats: {stats}")
+    print("SUCCESS")
+
+
+def test_queued_work_dropped_after_deadline():
+    print("\n--- Testing request deadlines ---")
+    ran = []
+    executor = ModelExecutor("test", workers=1, queue_size=4)
+
+    async def run():
+        slow = asyncio.ensure_future(executor.run(time.sleep, 0.2))
+        await asyncio.sleep(0.01)
+        try:
+            await executor.run(ran.append, 1, deadline=deadline_from(0.05))
+        except DeadlineExceeded:
+            pass
+        await slow
+        await asyncio.sleep(0.05)
+
+    asyncio.run(run())
+    assert ran == []
+    assert executor.snapshot()["expired"] == 1
+    print("SUCCESS")
+
+
+if __name__ == "__main__":
+    test_saturated_executor_rejects()
+    test_queued_work_dropped_after_deadline()
@@ -0,0 +1,132 @@
+import warnings
+
+import numpy as np
+from fastapi.testclient import TestClient
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+warnings.filterwarnings("ignore")
+
+import app as service
+from explain import LinearExplainer, TreeExplainer, build_explainer, explanations
+from test_batch import DIABETES, HEART, LIVER
+from tree_engine import FlatForest
+
+client = TestClient(service.app)
+
+
+def saabas_reference(model, X, class_index):
+    # Straight from the sklearn trees, one decision path at a time
+    out = np.zeros(X.shape)
+    for est in model.estimators_:
+        tree = est.tree_
+        value = tree.value[:, 0, :] / tree.value[:, 0, :].sum(axis=1, keepdims=True)
+        for i, x in enumerate(X.astype(np.float32)):
+            node = 0
+            while tree.children_left[node] != -1:
+                f = tree.feature[node]
+                child = tree.children_left[node] if x[f] <= tree.threshold[node] else tree.children_right[node]
+                out[i, f] += value[child, class_index] - value[node, class_index]
+                node = child
+    return out / len(model.estimators_) * 100
+
+
+def test_tree_contributions_are_exact():
+    print("\n--- Testing Saabas attributions ---")
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 6))
+    y = (X[:, 0] + X[:, 1] * X[:, 2] > 0).astype(int)
+    model = RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0).fit(X, y)
+
+    explainer = build_explainer(model, 1)
+    assert isinstance(explainer, TreeExplainer)
+    rows = rng.normal(size=(100, 6))
+    base, contributions = explainer.explain(rows)
+    assert np.allclose(base + contributions.sum(axis=1), model.predict_proba(rows)[:, 1] * 100, atol=1e-9)
+    assert np.allclose(contributions, saabas_reference(model, rows, 1), atol=1e-9)
+    # Feature 0 drives the label; the noise features stay small
+    assert np.abs(contributions[:, 0]).mean() > 3 * np.abs(contributions[:, 3:]).mean()
+    print("SUCCESS")
+
+
+def test_linear_contributions_fold_the_scaler():
+    print("\n--- Testing linear attributions ---")
+    rng = np.random.default_rng(1)
+    X = rng.normal(50, 10, size=(200, 4))
+    y = (X[:, 0] - X[:, 1] > 0).astype(int)
+    for model in (LogisticRegression().fit(X, y), make_pipeline(StandardScaler(), LogisticRegression()).fit(X, y)):
+        explainer = build_explainer(model, 1)
+        assert isinstance(explainer, LinearExplainer)
+        base, contributions = explainer.explain(X)
+        assert np.allclose(base + contributions.sum(axis=1), model.decision_function(X))
+
+        # Positive class first: everything flips sign
+        flipped_base, flipped = build_explainer(model, 0).explain(X)
+        assert np.allclose(flipped_base + flipped.sum(axis=1), -model.decision_function(X))
+
+    scaler = make_pipeline(StandardScaler(), LogisticRegression()).fit(X, y)
+    _, at_mean = build_explainer(scaler, 1).explain(X.mean(axis=0, keepdims=True))
+    assert np.allclose(at_mean, 0)
+    print("SUCCESS")
+
+
+def test_explain_routes():
+    print("\n--- Testing ?explain=true ---")
+    for name, samples in [("heart", HEART), ("diabetes", DIABETES), ("liver", LIVER)]:
+        runner = service.MODELS.get(name)
+        if runner is None:
+            print(f"{name} model not loaded.")
+            continue
+        assert runner.explainer is not None
+
+        plain = client.post(f"/predict/{name}", json=samples[0]).json()
+        explained = client.post(f"/predict/{name}", json=samples[0], params={"explain": True}).json()
+        assert "explanation" not in plain
+        assert explained["probability"] == plain["probability"]
+        explanation = explained["explanation"]
+        assert set(explanation["contributions"]) == set(service.EXPLAIN_FIELDS[name])
+        magnitudes = [abs(v) for v in explanation["contributions"].values()]
+        assert magnitudes == sorted(magnitudes, reverse=True)
+
+        total = explanation["base"] + sum(explanation["contributions"].values())
+        if explanation["units"] == "log_odds":
+            total = 100 / (1 + np.exp(-total))
+        assert abs(total - plain["probability"]) < 0.05, (name, total, plain["probability"])
+
+        # The cached answer must not pick up the explanation
+        assert "explanation" not in client.post(f"/predict/{name}", json=samples[0]).json()
+
+        batch = client.post(f"/predict/{name}/batch", json=samples + [{}], params={"explain": True}).json()
+        assert all("explanation" in r for r in batch["results"][:-1])
+        assert "explanation" not in batch["results"][-1]
+        print(f"{name}: {explanation['units']}, top {next(iter(explanation['contributions']))}")
+
+    runner = service.MODELS.get("heart")
+    if runner is not None:
+        saved, runner.explainer = runner.explainer, None
+        try:
+            r = client.post("/predict/heart", json={**HEART[0], "age": 41}, params={"explain": True})
+            assert r.status_code == 501
+        finally:
+            runner.explainer = saved
+    print("SUCCESS")
+
+
+def test_explanations_format():
+    print("\n--- Testing explanation payload ---")
+    explainer = LinearExplainer(np.array([1.0, -2.0, 0.5]), np.zeros(3), 0.25)
+    out = explanations(explainer, np.array([[1.0, 1.0, 1.0], [0.0, 0.0, 4.0]]), ["a", "b", "c"])
+    assert out[0] == {"base": 0.25, "units": "log_odds", "contributions": {"b": -2.0, "a": 1.0, "c": 0.5}}
+    assert list(out[1]["contributions"]) == ["c", "a", "b"]
+    assert isinstance(build_explainer(FlatForest.from_sklearn(
+        RandomForestClassifier(n_estimators=2).fit([[0], [1]], [0, 1])), 1), TreeExplainer)
+    print("SUCCESS")
+
+
+if __name__ == "__main__":
+    test_tree_contributions_are_exact()
+    test_linear_contributions_fold_the_scaler()
+    test_explain_routes()
+    test_explanations_format()
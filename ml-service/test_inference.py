@@ -0,0 +1,83 @@
+import os
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from inference import TabularModel
+
+warnings.filterwarnings("ignore")
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(BASE_DIR, "models")
+
+SAMPLES = {
+    "heart_model.pkl": [
+        [30, 1, 0, 120, 200, 0, 0, 150, 0, 0.0, 2, 0, 2],
+        [70, 1, 0, 160, 300, 1, 1, 100, 1, 3.0, 1, 2, 3],
+    ],
+    "diabetes_model_cleaned.pkl": [
+        [0, 85, 66, 29, 0, 26.6, 0.351, 31],
+        [6, 148, 72, 35, 0, 33.6, 0.627, 50],
+    ],
+    "liver_model.pkl": [
+        [28, 0, 0.7, 0.2, 95, 22, 20, 7.4, 4.4, 1.6],
+        [52, 1, 2.4, 1.1, 230, 72, 68, 6.1, 3.0, 0.8],
+    ],
+}
+
+
+def test_single_pass_matches_predict():
+    for filename, rows in SAMPLES.items():
+        print(f"\n--- Single-pass parity: {filename} ---")
+        path = os.path.join(MODEL_DIR, filename)
+        if not os.path.exists(path):
+            print("Model not found.")
+            continue
+
+        model = joblib.load(path)
+        runner = TabularModel(filename, model)
+        X = np.array(rows, dtype=float)
+
+        labels, positive = runner.predict(X)
+
+        assert list(labels) == list(model.predict(X))
+        assert runner.positive_index is not None
+        assert np.array_equal(positive, model.predict_proba(X)[:, runner.positive_index])
+        print(f"Labels: {list(labels)}, Positive probs: {positive}")
+        print("SUCCESS")
+
+
+def test_names_checked_once_then_plain_arrays():
+    print("\n--- Feature names validated at load ---")
+    path = os.path.join(MODEL_DIR, "heart_model.pkl")
+    if not os.path.exists(path):
+        print("Model not found.")
+        return
+
+    names = list(joblib.load(path).feature_names_in_)
+    rows = SAMPLES["heart_model.pkl"]
+    expected = joblib.load(path).predict_proba(pd.DataFrame(rows, columns=names))
+
+    runner = TabularModel("heart", joblib.load(path), names)
+    assert not hasattr(runner.model, "feature_names_in_")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        _, positive = runner.predict(runner.assemble(rows))
+        assert np.allclose(positive, expected[:, runner.positive_index], rtol=1e-12, atol=0)
+
+        single = runner.assemble(rows[:1])
+        assert single is runner.assemble(rows[1:]) and single.flags.c_contiguous
+
+    try:
+        TabularModel("heart", joblib.load(path), names[::-1])
+        assert False, "expected ValueError"
+    except ValueError as e:
+        print(f"Rejected: {str(e)[:60]}...")
+    print("SUCCESS")
+
+
+if __name__ == "__main__":
+    test_single_pass_matches_predict()
+    test_names_checked_once_then_plain_arrays()
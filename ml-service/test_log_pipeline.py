@@ -0,0 +1,126 @@
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import warnings
+
+from fastapi.testclient import TestClient
+
+warnings.filterwarnings("ignore")
+
+import app as service
+from log_pipeline import AuditLog, JSONLSink, LogPipeline, SQLiteSink
+from test_batch import HEART
+
+client = TestClient(service.app)
+
+
+def isolated_logger(name):
+    logger = logging.getLogger(name)
+    logger.propagate = False  # keep test records out of medhive_errors.log
+    return logger
+
+
+def fail():
+    raise ValueError("model exploded")
+
+
+def test_identical_tracebacks_are_deduplicated():
+    print("\n--- Testing traceback dedup ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "errors.log")
+        logger = isolated_logger("medhive.test.dedup")
+        pipeline = LogPipeline(path, dedup_window_s=60).start(logger)
+        for _ in range(50):
+            try:
+                fail()
+            except ValueError:
+                logger.error("Prediction failed", exc_info=True)
+        logger.error("Different failure")
+        pipeline.stop()
+        logger.removeHandler(pipeline.handler)
+
+        text = open(path).read()
+        assert text.count("Traceback") == 1
+        assert "Different failure" in text
+        assert "'Prediction failed' repeated 49 more times" in text
+        assert pipeline.snapshot()["suppressed_duplicates"] == 49
+    print("SUCCESS")
+
+
+def test_rotation_and_full_queue_never_block():
+    print("\n--- Testing rotation and drop-on-full ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "errors.log")
+        logger = isolated_logger("medhive.test.rotate")
+        pipeline = LogPipeline(path, max_bytes=2000, backups=2).start(logger)
+        for i in range(200):
+            logger.error(f"distinct failure {i}")
+        pipeline.stop()
+        logger.removeHandler(pipeline.handler)
+        assert os.path.exists(path + ".1") and os.path.exists(path + ".2")
+        assert not os.path.exists(path + ".3")
+        assert os.path.getsize(path) <= 2000
+
+        # Listener never started: the queue fills and records are dropped
+        stalled = LogPipeline(os.path.join(tmp, "stalled.log"), queue_size=5)
+        logger = isolated_logger("medhive.test.stalled")
+        logger.addHandler(stalled.handler)
+        for i in range(20):
+            logger.error(f"failure {i}")
+        logger.removeHandler(stalled.handler)
+        assert stalled.snapshot()["dropped"] == 15
+    print("SUCCESS")
+
+
+def test_audit_sinks_write_batches():
+    print("\n--- Testing audit sinks ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        for sink in (JSONLSink(os.path.join(tmp, "audit.jsonl")), SQLiteSink(os.path.join(tmp, "audit.db"))):
+            audit = AuditLog(sink, batch_size=8, flush_s=0.05)
+            for status in [200] * 10 + [422, 503]:
+                audit.record("/predict/heart", "heart", "abc123", status, 3.5)
+            audit.close()
+            assert audit.snapshot()["written"] == 12
+
+            if isinstance(sink, JSONLSink):
+                rows = [json.loads(line) for line in open(sink.path)]
+                outcomes = [r["outcome"] for r in rows]
+            else:
+                outcomes = [r[0] for r in sqlite3.connect(sink.path).execute("SELECT outcome FROM audit")]
+            assert outcomes == ["ok"] * 10 + ["invalid", "rejected"]
+    print("SUCCESS")
+
+
+def test_prediction_requests_are_audited_without_content():
+    print("\n--- Testing request audit ---")
+    if service.MODELS.get("heart") is None:
+        print("Heart model not loaded.")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "audit.jsonl")
+        original = service.AUDIT_LOG
+        service.AUDIT_LOG = AuditLog(JSONLSink(path), flush_s=0.05)
+        try:
+            client.post("/predict/heart", json=HEART[1])
+            client.post("/predict/heart", json={"age": "x"})
+            client.get("/health")
+            service.AUDIT_LOG.close()
+        finally:
+            service.AUDIT_LOG = original
+
+        rows = [json.loads(line) for line in open(path)]
+        assert [(r["model"], r["status"], r["outcome"]) for r in rows] == [
+            ("heart", 200, "ok"), ("heart", 422, "invalid")
+        ]
+        assert rows[0]["version"] == service.MODELS.entries["heart"].version
+        assert set(rows[0]) == {"ts", "route", "model", "version", "outcome", "status", "latency_ms"}
+    print("SUCCESS")
+
+
+if __name__ == "__main__":
+    test_identical_tracebacks_are_deduplicated()
+    test_rotation_and_full_queue_never_block()
+    test_audit_sinks_write_batches()
+    test_prediction_requests_are_audited_without_content()
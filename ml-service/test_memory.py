@@ -0,0 +1,43 @@
+import os
+import shutil
+import tempfile
+import warnings
+
+import joblib
+import numpy as np
+
+from memory import array_footprint, load_artifact, memory_report
+
+warnings.filterwarnings("ignore")
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(BASE_DIR, "models")
+
+
+def test_mmap_load_matches_pickle():
+    print("\n--- Testing memory-mapped model loading ---")
+    src = os.path.join(MODEL_DIR, "heart_model.pkl")
+    if not os.path.exists(src):
+        print("Heart model not found.")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "heart_model.pkl")
+        shutil.copy(src, path)
+
+        original = joblib.load(path)
+        mapped = load_artifact(path, version="test", mmap=True)
+        assert os.path.exists(os.path.join(tmp, ".mmap", "heart_model.pkl.test.joblib"))
+
+        X = np.array([[70, 1, 0, 160, 300, 1, 1, 100, 1, 3.0, 1, 2, 3]], dtype=float)
+        assert np.array_equal(original.predict_proba(X), mapped.predict_proba(X))
+
+        total, shared = array_footprint(mapped)
+        assert shared > 0 and shared <= total
+        assert array_footprint(original)[1] == 0
+        print(f"Report: {memory_report(mapped)}")
+        print("SUCCESS")
+
+
+if __name__ == "__main__":
+    test_mmap_load_matches_pickle()
@@ -0,0 +1,81 @@
+import threading
+import warnings
+
+from fastapi.testclient import TestClient
+
+warnings.filterwarnings("ignore")
+
+from app import app, MODELS
+from metrics import Counter, Histogram
+from test_batch import HEART
+
+client = TestClient(app)
+
+
+def sample(text, prefix):
+    """Value of the first exposition line starting with prefix."""
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+def test_sharded_counters_sum_across_threads():
+    print("\n--- Testing per-thread metric shards ---")
+    counter = Counter("c_total", "test", ("model",))
+    hist = Histogram("h_seconds", "test", ("model",), buckets=(0.1, 1.0))
+
+    def work():
+        for _ in range(1000):
+            counter.inc("heart")
+            hist.observe(0.5, "heart")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert counter.values() == {("heart",): 4000}
+    text = "\n".join(hist.render())
+    assert 'h_seconds_bucket{model="heart",le="0.1"} 0' in text
+    assert 'h_seconds_bucket{model="heart",le="1.0"} 4000' in text
+    assert 'h_seconds_bucket{model="heart",le="+Inf"} 4000' in text
+    assert sample(text, 'h_seconds_sum{model="heart"}') == 2000.0
+    print("SUCCESS")
+
+
+def test_every_route_is_instrumented():
+    print("\n--- Testing /metrics exposition ---")
+    client.get("/health")
+    client.post("/predict/heart", json={"age": "not a number"})
+    if MODELS.get("heart") is not None:
+        client.post("/predict/heart", json=HEART[0])
+    client.get("/no/such/route")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+
+    assert sample(text, 'medhive_requests_total{route="/health",method="GET",status="200"}') >= 1
+    assert sample(text, 'medhive_requests_total{route="/predict/heart",method="POST",status="422"}') >= 1
+    assert sample(text, 'medhive_requests_total{route="unmatched",method="GET",status="404"}') >= 1
+    assert sample(text, 'medhive_request_seconds_count{route="/health"}') >= 1
+    for stage in ("validation", "handler", "serialization"):
+        assert sample(text, f'medhive_request_stage_seconds_count{{route="/health",stage="{stage}"}}') >= 1
+    assert "medhive_requests_in_flight 1" in text  # the /metrics request itself
+    assert 'medhive_executor_inflight{executor="heart"}' in text
+    assert "medhive_cache_lookups_total" in text
+
+    if MODELS.get("heart") is not None:
+        assert sample(text, 'medhive_requests_total{route="/predict/heart",method="POST",status="200"}') >= 1
+        assert sample(text, 'medhive_model_stage_seconds_count{model="heart",stage="inference"}') >= 1
+        assert sample(text, 'medhive_model_ready{model="heart"}') == 1.0
+        assert sample(text, 'medhive_model_load_seconds{model="heart"}') > 0
+    print("SUCCESS")
+
+
+if __name__ == "__main__":
+    test_sharded_counters_sum_across_threads()
+    test_every_route_is_instrumented()
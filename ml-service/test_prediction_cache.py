@@ -0,0 +1,164 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+import warnings
+
+from fastapi.testclient import TestClient
+
+warnings.filterwarnings("ignore")
+
+from app import app, MODELS, PREDICTIONS
+from prediction_cache import LRUCache, PredictionCache, SQLiteCache, cache_key
+
+client = TestClient(app)
+
+
+def test_keys_are_canonical_and_versioned():
+    print("\n--- Testing cache keys ---")
+    assert cache_key("heart", "v1", {"a": 1, "b": 2}) == cache_key("heart", "v1", {"b": 2, "a": 1})
+    assert cache_key("heart", "v1", [1, 2]) != cache_key("heart", "v2", [1, 2])
+    assert cache_key("ecg", "v1", b"image") != cache_key("ecg", "v1", b"image2")
+    print("SUCCESS")
+
+
+def test_lru_eviction_and_ttl():
+    print("\n--- Testing LRU eviction and TTL ---")
+    cache = LRUCache(max_entries=2, ttl_s=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats.evictions == 1
+
+    short = LRUCache(max_entries=2, ttl_s=0.01)
+    short.set("a", 1)
+    time.sleep(0.02)
+    assert short.get("a") is None and short.stats.expired == 1
+    print("SUCCESS")
+
+
+def test_sqlite_tier_is_shared():
+    print("\n--- Testing shared SQLite tier ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.db")
+        worker_a = PredictionCache(LRUCache(16, 60), SQLiteCache(path))
+        worker_b = PredictionCache(LRUCache(16, 60), SQLiteCache(path))
+
+        async def compute():
+            return {"prediction": "x", "probability": 12.5}
+
+        asyncio.run(worker_a.get_or_compute("k", compute))
+        worker_a.flush()  # stores are write-behind
+        assert worker_b.get("k") == {"prediction": "x", "probability": 12.5}
+        assert worker_b.stats.shared_hits == 1 and worker_a.stats.misses == 1
+    print("SUCCESS")
+
+
+def test_locked_sqlite_tier_does_not_block_the_loop():
+    print("\n--- Testing shared tier under a held write lock ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.db")
+        cache = PredictionCache(LRUCache(16, 60), SQLiteCache(path))
+        cache.shared.set("k", {"ok": True})
+
+        # Another worker holds the write lock past the 1 s busy timeout
+        locker = sqlite3.connect(path, isolation_level=None)
+        locker.execute("BEGIN IMMEDIATE")
+
+        async def compute():
+            return {"ok": True}
+
+        async def run():
+            gaps, done = [], False
+
+            async def ticker():
+                last = time.perf_counter()
+                while not done:
+                    await asyncio.sleep(0.005)
+                    now = time.perf_counter()
+                    gaps.append(now - last)
+                    last = now
+
+            task = asyncio.create_task(ticker())
+            results = [await cache.get_or_compute("k", compute)]
+            results += [await cache.get_or_compute(f"new{i}", compute) for i in range(5)]
+            done = True
+            await task
+            return results, gaps
+
+        start = time.perf_counter()
+        results, gaps = asyncio.run(run())
+        elapsed = time.perf_counter() - start
+        locker.execute("ROLLBACK")
+        locker.close()
+        cache.flush()
+
+        assert all(r == {"ok": True} for r in results)
+        assert elapsed > 0.9 and max(gaps) < 0.2, (elapsed, max(gaps))
+        assert cache.shared.get("new4") == {"ok": True}
+        print(f"{elapsed:.2f}s behind the lock, longest loop stall {max(gaps) * 1000:.0f} ms")
+    print("SUCCESS")
+
+
+def test_single_flight_and_errors_not_cached():
+    print("\n--- Testing single-flight ---")
+    cache = PredictionCache(LRUCache(16, 60))
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"ok": True}
+
+    async def burst():
+        return await asyncio.gather(*[cache.get_or_compute("same", compute) for _ in range(10)])
+
+    results = asyncio.run(burst())
+    assert calls == [1] and all(r == {"ok": True} for r in results)
+    assert cache.stats.coalesced == 9
+
+    async def failing():
+        calls.append(2)
+        raise ValueError("boom")
+
+    for _ in range(2):
+        try:
+            asyncio.run(cache.get_or_compute("bad", failing))
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+    assert calls.count(2) == 2 and cache.get("bad") is None
+    print(f"Stats: {cache.snapshot()}")
+    print("SUCCESS")
+
+
+def test_repeated_form_is_served_from_cache():
+    print("\n--- Testing cached /predict/heart ---")
+    if MODELS.get("heart") is None:
+        print("Heart model not loaded.")
+        return
+
+    record = {"age": 61, "sex": 1, "cp": 2, "trestbps": 140, "chol": 250, "fbs": 0, "restecg": 1,
+              "thalach": 120, "exang": 1, "oldpeak": 1.5, "slope": 1, "ca": 1, "thal": 3}
+    runner = MODELS.get("heart")
+    calls = runner.stats.calls
+    hits = PREDICTIONS.stats.hits
+
+    first = client.post("/predict/heart", json=record).json()
+    second = client.post("/predict/heart", json={**record, "age": "61"}).json()
+    assert first == second
+    assert runner.stats.calls == calls + 1 and PREDICTIONS.stats.hits == hits + 1
+    assert client.get("/stats").json()["cache"]["hits"] >= 1
+    print("SUCCESS")
+
+
+if __name__ == "__main__":
+    test_keys_are_canonical_and_versioned()
+    test_lru_eviction_and_ttl()
+    test_sqlite_tier_is_shared()
+    test_locked_sqlite_tier_does_not_block_the_loop()
+    test_single_flight_and_errors_not_cached()
+    test_repeated_form_is_served_from_cache()
@@ -0,0 +1,87 @@
+import asyncio
+import os
+import tempfile
+import time
+
+from registry import ModelRegistry
+
+
+def test_models_load_on_first_use():
+    print("\n--- Testing lazy registry ---")
+    loads = []
+    registry = ModelRegistry()
+    registry.register("ok", lambda: loads.append(1) or "model")
+    registry.register("missing", lambda: None)
+    registry.register("broken", lambda: 1 / 0)
+
+    assert registry.state("ok") == "unloaded" and loads == []
+    assert registry.get("ok") == "model" and registry.get("ok") == "model"
+    assert loads == [1]
+    assert asyncio.run(registry.aget("ok")) == "model"
+
+    assert registry.get("missing") is None and registry.state("missing") == "failed"
+    assert registry.get("broken") is None
+    status = registry.status()
+    assert status["broken"]["state"] == "failed" and "division" in status["broken"]["error"]
+    assert "load_ms" in status["ok"]
+    print(f"Status: {status}")
+    print("SUCCESS")
+
+
+def test_hosted_models_restrict_worker():
+    print("\n--- Testing hosted model filter ---")
+    registry = ModelRegistry(hosted=["heart"])
+    registry.register("heart", lambda: "heart")
+    registry.register("liver", lambda: "liver")
+
+    registry.warm_up().join()
+
+    assert registry.state("heart") == "ready"
+    assert registry.state("liver") == "disabled" and registry.get("liver") is None
+    print("SUCCESS")
+
+
+def test_reload_swaps_version_and_keeps_old_model():
+    print("\n--- Testing hot reload ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.txt")
+        with open(path, "w") as f:
+            f.write("v1")
+
+        def loader():
+            with open(path) as f:
+                return {"weights": f.read()}
+
+        warmed = []
+        registry = ModelRegistry()
+        registry.register("m", loader, path=path, warm=warmed.append)
+
+        in_flight, v1 = registry.get_versioned("m")
+        assert in_flight == {"weights": "v1"} and v1
+
+        with open(path, "w") as f:
+            f.write("v2-longer")
+        registry.watch(interval_s=0.05)
+        for _ in range(100):
+            if registry.entries["m"].reloads:
+                break
+            time.sleep(0.02)
+
+        model, v2 = registry.get_versioned("m")
+        assert model == {"weights": "v2-longer"} and v2 != v1
+        assert in_flight == {"weights": "v1"}
+        assert len(warmed) == 2
+
+        # A broken artifact must not replace the serving model
+        registry.entries["m"].loader = lambda: 1 / 0
+        assert registry.reload("m") is False
+        assert registry.get("m") == {"weights": "v2-longer"}
+        assert "reload_error" in registry.status()["m"]
+        print(f"Versions: {v1} -> {v2}")
+        print("SUCCESS")
+
+
+if __name__ == "__main__":
+    test_models_load_on_first_use()
+    test_hosted_models_restrict_worker()
+    test_reload_swaps_version_and_keeps_old_model()
@@ -0,0 +1,56 @@
+import warnings
+
+from fastapi.testclient import TestClient
+
+warnings.filterwarnings("ignore")
+
+from app import app, MODELS
+from test_batch import DIABETES, HEART, LIVER
+
+client = TestClient(app)
+
+
+def visit(heart, diabetes, liver):
+    # One combined payload: age/sex given once, Age/gender derived
+    payload = {**heart, **diabetes, **{k: v for k, v in liver.items() if k not in ("age", "gender")}}
+    payload.pop("Age")
+    return payload
+
+
+def test_screen_matches_individual_endpoints():
+    print("\n--- Testing /screen fan-out ---")
+    if any(MODELS.get(name) is None for name in ("heart", "diabetes", "liver")):
+        print("Tabular models not loaded.")
+        return
+
+    heart, diabetes, liver = HEART[1], {**DIABETES[1], "Age": 70}, {**LIVER[1], "age": 70, "gender": 1}
+    response = client.post("/screen", json=visit(heart, diabetes, liver))
+    assert response.status_code == 200
+    body = response.json()
+
+    assert body["screened"] == ["heart", "diabetes", "liver"]
+    assert body["results"]["heart"]["result"] == client.post("/predict/heart", json=heart).json()
+    assert body["results"]["diabetes"]["result"] == client.post("/predict/diabetes", json=diabetes).json()
+    assert body["results"]["liver"]["result"] == client.post("/predict/liver", json=liver).json()
+    assert body["results"]["symptoms"] == {"status": "skipped", "missing": ["symptoms"]}
+    assert all("latency_ms" in body["results"][name] for name in body["screened"])
+    print(f"Flagged: {body['flagged']}, total {body['total_ms']} ms")
+    print("SUCCESS")
+
+
+def test_screen_skips_models_with_missing_inputs():
+    print("\n--- Testing /screen partial payload ---")
+    payload = {"age": 45, "sex": 0, "Glucose": "not a number"}
+    body = client.post("/screen", json=payload).json()
+
+    assert body["screened"] == []
+    assert body["results"]["heart"]["status"] == "skipped"
+    assert "cp" in body["results"]["heart"]["missing"] and "age" not in body["results"]["heart"]["missing"]
+    assert "Age" not in body["results"]["diabetes"]["missing"]
+    assert "gender" not in body["results"]["liver"]["missing"]
+    print("SUCCESS")
+
+
+if __name__ == "__main__":
+    test_screen_matches_individual_endpoints()
+    test_screen_skips_models_with_missing_inputs()
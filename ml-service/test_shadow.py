@@ -0,0 +1,110 @@
+import threading
+import time
+import warnings
+
+from fastapi.testclient import TestClient
+
+warnings.filterwarnings("ignore")
+
+import app as service
+from executors import ModelExecutor
+from shadow import ShadowEvaluator
+from test_batch import HEART
+
+client = TestClient(service.app)
+
+
+def install_candidate(rate, executor, candidate=None):
+    service.MODELS.register("heart-shadow", lambda: service.load_candidate("heart", "heart_model.pkl"),
+                            path=service.model_path("heart_model.pkl"))
+    evaluator = ShadowEvaluator(
+        "heart", candidate or (lambda: service.MODELS.get("heart-shadow")),
+        rate=rate, executor=executor, source="heart_model.pkl"
+    )
+    service.SHADOWS["heart"] = evaluator
+    return evaluator
+
+
+def remove_candidate():
+    service.SHADOWS.pop("heart", None)
+    service.MODELS.entries.pop("heart-shadow", None)
+
+
+def wait_idle(executor, timeout_s=5):
+    deadline = time.monotonic() + timeout_s
+    while executor.inflight and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_identical_candidate_agrees_everywhere():
+    print("\n--- Testing shadow scoring ---")
+    if service.MODELS.get("heart") is None:
+        print("Heart model not loaded.")
+        return
+    executor = ModelExecutor("shadow-test", workers=1, queue_size=8)
+    try:
+        install_candidate(1.0, executor)
+        records = [{**HEART[i % 2], "chol": 200 + i} for i in range(10)]
+        for record in records:
+            assert client.post("/predict/heart", json=record).status_code == 200
+        assert client.post("/predict/heart/batch", json=records).status_code == 200
+        wait_idle(executor)
+
+        report = client.get("/shadow").json()["heart"]
+        assert report["state"] == "ready" and report["sampled"] == 11
+        assert report["evaluated_rows"] == 20 and report["dropped"] == 0
+        assert report["agreement_rate"] == 1.0
+        assert report["probability_delta_abs_max"] < 0.01  # API rounds to 2 dp
+        assert report["candidate_latency_ms"]["p50"] > 0
+        print(f"Report: {report}")
+    finally:
+        remove_candidate()
+        executor.shutdown()
+    print("SUCCESS")
+
+
+def test_saturated_pool_drops_instead_of_queueing():
+    print("\n--- Testing shadow drop-on-full ---")
+    if service.MODELS.get("heart") is None:
+        print("Heart model not loaded.")
+        return
+    release = threading.Event()
+
+    def stuck_candidate():
+        release.wait(5)
+        return service.MODELS.get("heart")
+
+    executor = ModelExecutor("shadow-test", workers=1, queue_size=1)
+    try:
+        evaluator = install_candidate(1.0, executor, stuck_candidate)
+        start = time.perf_counter()
+        for i in range(10):
+            assert client.post("/predict/heart", json={**HEART[0], "chol": 300 + i}).status_code == 200
+        elapsed = time.perf_counter() - start
+        assert elapsed < 2.5  # primary requests never waited on the stuck candidate
+
+        stats = evaluator.snapshot()
+        assert stats["sampled"] == 10 and stats["dropped"] == 8
+        release.set()
+        wait_idle(executor)
+        assert evaluator.snapshot()["evaluated_requests"] == 2
+    finally:
+        release.set()
+        remove_candidate()
+        executor.shutdown()
+    print("SUCCESS")
+
+
+def test_rate_zero_never_samples():
+    print("\n--- Testing shadow sampling rate ---")
+    evaluator = ShadowEvaluator("heart", lambda: None, rate=0.0, executor=None)
+    assert not any(evaluator.sample() for _ in range(1000))
+    half = ShadowEvaluator("heart", lambda: None, rate=0.5, executor=None)
+    assert 400 < sum(half.sample() for _ in range(2000)) < 1600
+    print("SUCCESS")
+
+
+if __name__ == "__main__":
+    test_identical_candidate_agrees_everywhere()
+    test_saturated_pool_drops_instead_of_queueing()
+    test_rate_zero_never_samples()
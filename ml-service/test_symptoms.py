@@ -0,0 +1,146 @@
+import os
+import warnings
+
+import joblib
+import numpy as np
+from fastapi.testclient import TestClient
+from sklearn.tree import DecisionTreeClassifier
+
+warnings.filterwarnings("ignore")
+
+from app import app, MODELS
+from symptoms import SymptomIndex, normalize_symptom, top_k
+
+client = TestClient(app)
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+
+
+def vocabulary():
+    return joblib.load(os.path.join(MODEL_DIR, "symptom_columns.pkl"))
+
+
+def test_lookup_normalizes_and_resolves_aliases():
+    print("\n--- Testing symptom index lookup ---")
+    index = SymptomIndex(vocabulary(), aliases={"sob": "shortness of breath", "x": "not a column"})
+
+    ids, unrecognized = index.lookup(
+        ["  Shortness of Breath ", "shortness_of_breath", "dyspnea", "sob", "Flu-Like Syndrome", "gibberish"]
+    )
+    assert [index.columns[i] for i in ids] == ["shortness of breath", "flu-like syndrome"]
+    assert unrecognized == ["gibberish"]
+    assert index.resolve("x") is None
+    assert normalize_symptom("Sharp  chest-pain") == "sharp_chest_pain"
+    print(f"Aliases: {len(index.aliases)}, unrecognized: {unrecognized}")
+    print("SUCCESS")
+
+
+def test_row_buffer_matches_dense_vector():
+    print("\n--- Testing preallocated symptom row ---")
+    columns = vocabulary()
+    index = SymptomIndex(columns)
+    rng = np.random.default_rng(0)
+    X = rng.integers(0, 2, size=(200, len(columns)))
+    model = DecisionTreeClassifier(random_state=0).fit(X, rng.integers(0, 5, size=200))
+
+    for row in X[:20]:
+        ids = list(np.flatnonzero(row))
+        expected = model.predict_proba([row])[0]
+        assert np.array_equal(index.predict_proba(model, ids), expected)
+        assert not index._row().any()
+    print("SUCCESS")
+
+
+def test_top_k_matches_full_sort():
+    print("\n--- Testing top-k selection ---")
+    rng = np.random.default_rng(1)
+    classes = np.array([f"d{i}" for i in range(40)])
+    for probs in [rng.random(40), np.repeat([0.2, 0.1], 20), rng.random(2)]:
+        expected = sorted(
+            [{"disease": str(c), "probability": round(float(p) * 100, 2)} for c, p in zip(classes, probs)],
+            key=lambda x: x["probability"], reverse=True
+        )[:3]
+        assert top_k(probs, classes[:len(probs)]) == expected
+    print("SUCCESS")
+
+
+def test_predict_endpoint_reports_unrecognized():
+    print("\n--- Testing /predict ---")
+    index = MODELS.get("symptom_columns")
+    if not index:
+        print("Symptom columns not loaded.")
+        return
+
+    rng = np.random.default_rng(2)
+    X = rng.integers(0, 2, size=(100, len(index)))
+    model = DecisionTreeClassifier(random_state=0).fit(X, rng.choice(["a", "b", "c", "d"], size=100))
+
+    entry = MODELS.entries["symptom"]
+    saved = (entry.state, entry.serving)
+    entry.state, entry.serving = "ready", (model, "test")
+    try:
+        response = client.post("/predict", json={"symptoms": ["fever", "tiredness", "made up"]})
+        assert response.status_code == 200
+        body = response.json()
+        assert body["matched"] == 2 and body["unrecognized"] == ["made up"]
+        assert len(body["top_predictions"]) == 3
+
+        response = client.post("/predict", json={"symptoms": ["made up"]})
+        assert response.json() == {"matched": 0, "top_predictions": [], "unrecognized": ["made up"]}
+    finally:
+        entry.state, entry.serving = saved
+
+    assert client.get("/symptoms").json()["symptoms"] == sorted(index.columns)
+    print(f"Result: {body}")
+    print("SUCCESS")
+
+
+def test_search_ranks_prefix_substring_and_typos():
+    print("\n--- Testing symptom search ---")
+    index = SymptomIndex(vocabulary())
+
+    def names(q, limit=10):
+        return [r["symptom"] for r in index.search(q, limit)]
+
+    assert names("fev")[0] == "fever"
+    assert index.search("feber")[0] == {"symptom": "fever", "match": "fuzzy"}
+    assert index.search("dizines")[0]["symptom"] == "dizziness"
+    assert "shortness of breath" in names("dyspnea")
+
+    chest = index.search("chest", 50)
+    kinds = [r["match"] for r in chest]
+    assert kinds == sorted(kinds, key=["prefix", "word_prefix", "substring", "fuzzy"].index)
+    assert all("chest" in r["symptom"] for r in chest if r["match"] != "fuzzy")
+    assert len(names("pain", 5)) == 5 and names("") == [] and names("zzzzqqq") == []
+    print(f"chest: {[r['symptom'] for r in chest[:4]]}")
+    print("SUCCESS")
+
+
+def test_search_and_cached_list_endpoints():
+    print("\n--- Testing /symptoms/search and ETag ---")
+    if not MODELS.get("symptom_columns"):
+        print("Symptom columns not loaded.")
+        return
+
+    response = client.get("/symptoms/search", params={"q": "head", "limit": 3})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0] == {"symptom": "headache", "match": "prefix"} and len(results) <= 3
+    assert client.get("/symptoms/search", params={"q": "x", "limit": 0}).status_code == 422
+
+    full = client.get("/symptoms")
+    etag = full.headers["etag"]
+    assert full.json()["symptoms"] == sorted(vocabulary())
+    cached = client.get("/symptoms", headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.headers["etag"] == etag
+    assert client.get("/symptoms", headers={"If-None-Match": '"stale"'}).status_code == 200
+    print("SUCCESS")
+
+
+if __name__ == "__main__":
+    test_lookup_normalizes_and_resolves_aliases()
+    test_row_buffer_matches_dense_vector()
+    test_top_k_matches_full_sort()
+    test_predict_endpoint_reports_unrecognized()
+    test_search_ranks_prefix_substring_and_typos()
+    test_search_and_cached_list_endpoints()
@@ -0,0 +1,116 @@
+import os
+import subprocess
+import sys
+import tempfile
+import warnings
+
+import joblib
+import numpy as np
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+
+from tree_engine import FlatForest
+
+warnings.filterwarnings("ignore")
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(BASE_DIR, "models")
+liver_path = os.path.join(MODEL_DIR, "liver_model.pkl")
+
+# Same samples as test_models.py, plus plausible ranges per liver feature
+LIVER_SAMPLES = np.array([
+    [28, 0, 0.7, 0.2, 95, 22, 20, 7.4, 4.4, 1.6],
+    [52, 1, 2.4, 1.1, 230, 72, 68, 6.1, 3.0, 0.8],
+])
+LIVER_RANGES = [(4, 90), (0, 1), (0.4, 75), (0.1, 20), (60, 2100),
+                (10, 2000), (10, 5000), (2.7, 9.6), (0.9, 5.5), (0.3, 2.8)]
+
+
+def random_liver_rows(rng, n):
+    X = np.column_stack([rng.uniform(lo, hi, n) for lo, hi in LIVER_RANGES])
+    X[:, 1] = np.round(X[:, 1])
+    return X
+
+
+def assert_parity(model, flat, X):
+    assert np.array_equal(model.predict_proba(X), flat.predict_proba(X))
+    assert np.array_equal(model.predict(X), flat.predict(X))
+
+
+def test_liver_parity():
+    print("\n--- FlatForest parity: liver model ---")
+    if not os.path.exists(liver_path):
+        print("Liver model not found.")
+        return
+
+    model = joblib.load(liver_path)
+    flat = FlatForest.from_sklearn(model)
+    rng = np.random.default_rng(42)
+
+    assert_parity(model, flat, LIVER_SAMPLES)
+    assert_parity(model, flat, random_liver_rows(rng, 5000))
+
+    # Inputs sitting exactly on split thresholds exercise the <= boundary
+    X = random_liver_rows(rng, 2000)
+    internal = np.flatnonzero(np.isfinite(flat.threshold))[:2000]
+    X[np.arange(len(internal)), flat.feature[internal]] = flat.threshold[internal]
+    assert_parity(model, flat, X)
+
+    print(f"Trees: {flat.n_trees}, Nodes: {len(flat.feature)}, Depth: {flat.max_depth}")
+    print("SUCCESS")
+
+
+def test_synthetic_parity_with_missing_values():
+    print("\n--- FlatForest parity: synthetic forests ---")
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 6))
+    y = (X[:, 0] + X[:, 1] ** 2 > 1).astype(int) + (X[:, 2] > 0.5)
+    X[rng.random(X.shape) < 0.1] = np.nan
+
+    for model in [
+        RandomForestClassifier(n_estimators=25, max_depth=8, random_state=0),
+        ExtraTreesClassifier(n_estimators=25, random_state=0),
+    ]:
+        if isinstance(model, ExtraTreesClassifier):
+            X = np.nan_to_num(X)
+        model.fit(X, y)
+        flat = FlatForest.from_sklearn(model)
+
+        X_test = rng.normal(size=(1000, 6))
+        if not isinstance(model, ExtraTreesClassifier):
+            X_test[rng.random(X_test.shape) < 0.1] = np.nan
+        assert_parity(model, flat, X_test)
+        print(f"{type(model).__name__}: OK")
+
+    print("SUCCESS")
+
+
+def test_save_load_is_memory_mapped():
+    print("\n--- FlatForest persistence ---")
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(200, 4))
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, X[:, 0] > 0)
+    flat = FlatForest.from_sklearn(model)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        loaded = FlatForest.load(flat.save(os.path.join(tmp, "forest.flat")))
+        assert isinstance(loaded.left, np.memmap)
+        assert np.array_equal(model.predict_proba(X), loaded.predict_proba(X))
+        del loaded
+
+    print("SUCCESS")
+
+
+def test_app_import_skips_sklearn():
+    print("\n--- Testing cold import path ---")
+    # Models pull sklearn in on first use; importing the service must not
+    probe = "import sys, app; print(sorted(m for m in ('sklearn', 'pandas', 'pyarrow') if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", probe], cwd=BASE_DIR, capture_output=True, text=True, check=True)
+    assert out.stdout.strip().splitlines()[-1] == "[]", out.stdout
+    print("SUCCESS")
+
+
+if __name__ == "__main__":
+    test_liver_parity()
+    test_synthetic_parity_with_missing_values()
+    test_save_load_is_memory_mapped()
+    test_app_import_skips_sklearn()
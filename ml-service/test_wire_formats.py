@@ -0,0 +1,142 @@
+import warnings
+
+from fastapi.testclient import TestClient
+
+warnings.filterwarnings("ignore")
+
+import app as service
+from test_batch import DIABETES, HEART, LIVER
+from wire_formats import ARROW, MSGPACK, validate_columns
+
+client = TestClient(service.app)
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+def arrow_body(records):
+    table = pa.table({k: [r[k] for r in records] for k in records[0]})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def arrow_rows(content):
+    return pa.ipc.open_stream(content).read_all().to_pylist()
+
+
+def test_column_validation_matches_pydantic():
+    print("\n--- Testing vectorized validation ---")
+    from pydantic import ValidationError
+
+    records = [
+        HEART[0],
+        {**HEART[0], "age": 40.5},
+        {**HEART[0], "age": "61", "oldpeak": "1.5"},
+        {**HEART[0], "chol": None},
+        {**HEART[0], "thal": "x", "oldpeak": float("inf")},
+        {**HEART[0], "sex": True},
+        {**HEART[0], "oldpeak": 1e39},
+    ]
+    columns = {f: [r[f] for r in records] for f in service.HeartInput.model_fields}
+    X, errors = validate_columns(columns, service.HeartInput, len(records))
+
+    for i, record in enumerate(records):
+        try:
+            expected = service.heart_features(service.HeartInput.model_validate(record))
+        except ValidationError as e:
+            expected = None
+            fields = {err["loc"][0] for err in e.errors()}
+        if i == 6:
+            # Valid for Pydantic, but beyond the float32 the trees run in
+            assert errors[i] == [{"loc": ["oldpeak"], "msg": "Input should be within the float32 range",
+                                  "type": "float32_range"}]
+        elif expected is None:
+            assert {e["loc"][0] for e in errors[i]} == fields, (i, errors.get(i))
+        else:
+            assert i not in errors and X[i].tolist() == [float(v) for v in expected]
+    assert errors[1][0]["type"] == "int_from_float"
+    print("SUCCESS")
+
+
+def test_msgpack_matches_json():
+    print("\n--- Testing MessagePack bodies ---")
+    if msgpack is None:
+        print("msgpack not installed.")
+        return
+    for name, samples in [("heart", HEART), ("diabetes", DIABETES), ("liver", LIVER)]:
+        if service.MODELS.get(name) is None:
+            continue
+        records = samples + [{**samples[0], next(iter(samples[0])): None}]
+        expected = client.post(f"/predict/{name}/batch", json=records).json()
+
+        # Records and the columnar map give the same answer
+        columns = {k: [r[k] for r in records] for k in samples[0]}
+        for body in (records, columns):
+            r = client.post(f"/predict/{name}/batch", content=msgpack.packb(body),
+                            headers={"Content-Type": MSGPACK})
+            assert r.status_code == 200 and r.headers["content-type"] == MSGPACK
+            assert msgpack.unpackb(r.content) == expected
+
+        r = client.post(f"/predict/{name}", content=msgpack.packb(samples[0]),
+                        headers={"Content-Type": MSGPACK, "Accept": "application/json"})
+        assert r.json() == client.post(f"/predict/{name}", json=samples[0]).json()
+        print(f"{name}: OK")
+
+    bad = client.post("/predict/heart", content=msgpack.packb({**HEART[0], "age": 1.5}),
+                      headers={"Content-Type": MSGPACK})
+    assert bad.status_code == 422 and bad.json()["detail"][0]["loc"] == ["body", "age"]
+    garbage = client.post("/predict/heart/batch", content=b"\xc1", headers={"Content-Type": MSGPACK})
+    assert garbage.status_code == 400
+    print("SUCCESS")
+
+
+def test_arrow_round_trip():
+    print("\n--- Testing Arrow IPC bodies ---")
+    if pa is None:
+        print("pyarrow not installed.")
+        return
+    if service.MODELS.get("heart") is None:
+        print("Heart model not loaded.")
+        return
+    records = [{**HEART[i % 2], "chol": 200 + i} for i in range(50)]
+    expected = client.post("/predict/heart/batch", json=records).json()
+
+    r = client.post("/predict/heart/batch", content=arrow_body(records), headers={"Content-Type": ARROW})
+    assert r.status_code == 200 and r.headers["content-type"] == ARROW
+    rows = arrow_rows(r.content)
+    assert [row.pop("error") for row in rows] == [None] * 50
+    assert rows == expected["results"]
+    meta = pa.ipc.open_stream(r.content).schema.metadata
+    assert meta[b"count"] == b"50" and meta[b"failed"] == b"0"
+
+    # Nulls are per-row errors; missing columns reject the request
+    table = pa.table({k: [r[k] for r in records[:3]] for k in HEART[0]})
+    table = table.set_column(table.column_names.index("chol"), "chol", pa.array([200, None, 210]))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    r = client.post("/predict/heart/batch", content=sink.getvalue().to_pybytes(),
+                    headers={"Content-Type": ARROW, "Accept": "application/json"})
+    assert r.json()["failed"] == 1 and r.json()["results"][1]["error"][0]["loc"] == ["chol"]
+
+    partial = [{k: v for k, v in rec.items() if k != "thal"} for rec in records[:2]]
+    r = client.post("/predict/heart/batch", content=arrow_body(partial), headers={"Content-Type": ARROW})
+    assert r.status_code == 400 and "thal" in r.json()["detail"]
+
+    single = client.post("/predict/heart", content=arrow_body(records[:1]), headers={"Content-Type": ARROW})
+    assert arrow_rows(single.content)[0]["probability"] == expected["results"][0]["probability"]
+    print("SUCCESS")
+
+
+if __name__ == "__main__":
+    test_column_validation_matches_pydantic()
+    test_msgpack_matches_json()
+    test_arrow_round_trip()
@@ -0,0 +1,251 @@
+# =====================================================
+# ARRAY-BACKED TREE ENSEMBLE ENGINE
+# =====================================================
+# Fitted sklearn forests are flattened once into plain node arrays
+# (feature, threshold, left, right, per-node class probabilities) shared
+# by all trees. Prediction walks every (row, tree) pair one level per
+# step with vectorized NumPy, so a request costs max_depth array ops
+# instead of one Python/joblib dispatch per tree.
+#
+# Results are bit-identical to sklearn's predict_proba: inputs are cast
+# to float32 and compared against float64 thresholds exactly like the
+# Cython tree, leaf probabilities are taken as sklearn would, and trees
+# are summed sequentially in estimator order before averaging.
+#
+# Nodes are renumbered breadth-first so a node's right child always sits
+# right after its left child; one step is then left[node] + go_right.
+import json
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+from importlib import metadata
+
+import numpy as np
+
+# Rows per traversal pass; keeps the (rows x trees) working set in cache
+ROW_CHUNK = 64
+
+ARRAYS = ("feature", "threshold", "left", "missing_left", "proba", "roots", "classes")
+
+
+@lru_cache(maxsize=None)
+def normalize_leaves():
+    # Before 1.4 tree_.value held raw counts and predict_proba normalized
+    # them. Read from package metadata: importing sklearn here would pull
+    # it (and pandas) into every service start.
+    version = tuple(int(p) for p in metadata.version("scikit-learn").split(".")[:2] if p.isdigit())
+    return version < (1, 4)
+
+
+def _breadth_first(tree):
+    order = [0]
+    for node in order:
+        if tree.children_left[node] != -1:
+            order.append(tree.children_left[node])
+            order.append(tree.children_right[node])
+    return np.asarray(order, dtype=np.intp)
+
+
+class FlatForest:
+    def __init__(self, feature, threshold, left, missing_left, proba,
+                 roots, classes, n_features, max_depth, feature_names=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.missing_left = missing_left
+        self.proba = proba
+        self.roots = roots
+        self.classes_ = classes
+        self.n_classes_ = len(classes)
+        self.n_features_in_ = n_features
+        self.max_depth = max_depth
+        if feature_names is not None:
+            self.feature_names_in_ = feature_names
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    # -------------------------------------------------
+    # CONVERSION
+    # -------------------------------------------------
+    @classmethod
+    def from_sklearn(cls, model):
+        """Flatten a fitted tree classifier, or return None if unsupported."""
+        name = type(model).__name__
+        if name in ("RandomForestClassifier", "ExtraTreesClassifier"):
+            trees = [est.tree_ for est in model.estimators_]
+        elif name in ("DecisionTreeClassifier", "ExtraTreeClassifier"):
+            trees = [model.tree_]
+        else:
+            return None
+        if getattr(model, "n_outputs_", 1) != 1 or not trees:
+            return None
+
+        n_classes = len(model.classes_)
+        features, thresholds, lefts, missing, probas, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for tree in trees:
+            order = _breadth_first(tree)
+            n = len(order)
+            new_id = np.empty(tree.node_count, dtype=np.intp)
+            new_id[order] = np.arange(n) + offset
+
+            old_left = tree.children_left[order]
+            leaf = old_left == -1
+
+            # Leaves point at themselves with a split nothing can pass
+            # (x > inf is never true, NaN follows missing_left=True), so
+            # rows that reach one early stay put for the remaining levels.
+            left = np.where(leaf, np.arange(n) + offset, new_id[np.where(leaf, 0, old_left)])
+            feature = np.where(leaf, 0, tree.feature[order])
+            threshold = np.where(leaf, np.inf, tree.threshold[order])
+            miss = getattr(tree, "missing_go_to_left", None)
+            miss = np.zeros(n, dtype=bool) if miss is None else np.asarray(miss, dtype=bool)[order]
+
+            value = np.asarray(tree.value, dtype=np.float64)[order, 0, :n_classes]
+            if normalize_leaves():
+                normalizer = value.sum(axis=1)[:, np.newaxis]
+                normalizer[normalizer == 0.0] = 1.0
+                value = value / normalizer
+
+            features.append(feature.astype(np.intp))
+            thresholds.append(threshold.astype(np.float64))
+            lefts.append(left.astype(np.intp))
+            missing.append(miss | leaf)
+            probas.append(np.ascontiguousarray(value))
+            roots.append(offset)
+            offset += n
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            missing_left=np.concatenate(missing),
+            proba=np.concatenate(probas),
+            roots=np.asarray(roots, dtype=np.intp),
+            classes=np.asarray(model.classes_),
+            n_features=model.n_features_in_,
+            max_depth=max_depth,
+            feature_names=getattr(model, "feature_names_in_", None),
+        )
+
+    # -------------------------------------------------
+    # INFERENCE
+    # -------------------------------------------------
+    def _validate(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X has {X.shape[-1] if X.ndim else 0} features, "
+                f"but FlatForest is expecting {self.n_features_in_} features as input."
+            )
+        if np.isinf(X).any():
+            raise ValueError("Input X contains infinity or a value too large for dtype('float32').")
+        return X
+
+    def walk(self, X):
+        """Node of every (row, tree) pair level by level, root first;
+        flat arrays ordered row-major, rows that hit a leaf stay on it."""
+        X = self._validate(X)
+        n = X.shape[0]
+        # float32 -> float64 is exact; doing it once avoids a cast per level
+        flat = X.astype(np.float64).ravel()
+        base = np.repeat(np.arange(n, dtype=np.intp) * self.n_features_in_, self.n_trees)
+        node = np.tile(self.roots, n)
+        has_nan = np.isnan(flat).any()
+
+        yield node
+        for _ in range(self.max_depth):
+            x = flat.take(base + self.feature.take(node))
+            go_right = x > self.threshold.take(node)
+            if has_nan:
+                go_right = np.where(np.isnan(x), ~self.missing_left.take(node), go_right)
+            node = self.left.take(node) + go_right
+            yield node
+
+    def apply(self, X):
+        """Leaf index of every (row, tree) pair, shape (n_rows, n_trees)."""
+        for node in self.walk(X):
+            pass
+        return node.reshape(-1, self.n_trees)
+
+    def predict_proba(self, X):
+        X = self._validate(X)
+        if len(X) > ROW_CHUNK:
+            return np.concatenate([
+                self.predict_proba(X[i:i + ROW_CHUNK]) for i in range(0, len(X), ROW_CHUNK)
+            ])
+
+        leaves = self.apply(X)
+        # cumsum adds trees strictly in estimator order, matching sklearn's
+        # sequential accumulation bit for bit (np.sum would pair-sum).
+        proba = np.cumsum(self.proba[leaves], axis=1)[:, -1, :]
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X):
+        return self.classes_.take(self.predict_proba(X).argmax(axis=1))
+
+    # -------------------------------------------------
+    # PERSISTENCE (memory-mappable, see memory.py)
+    # -------------------------------------------------
+    def save(self, directory):
+        parent = os.path.dirname(os.path.abspath(directory))
+        os.makedirs(parent, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=parent, suffix=".tmp")
+        try:
+            for name in ARRAYS:
+                arr = getattr(self, "classes_" if name == "classes" else name)
+                if arr.dtype == object:
+                    arr = arr.astype(str)
+                np.save(os.path.join(tmp, f"{name}.npy"), arr, allow_pickle=False)
+            meta = {
+                "format": "medhive-flat-forest",
+                "version": 1,
+                "n_features": int(self.n_features_in_),
+                "max_depth": int(self.max_depth),
+                "feature_names": None if getattr(self, "feature_names_in_", None) is None
+                else [str(f) for f in self.feature_names_in_],
+            }
+            with open(os.path.join(tmp, "meta.json"), "w") as f:
+                json.dump(meta, f)
+            try:
+                os.replace(tmp, directory)
+            except OSError:
+                # Another worker published the same version first
+                if not os.path.isdir(directory):
+                    raise
+        finally:
+            if os.path.exists(tmp):
+                shutil.rmtree(tmp, ignore_errors=True)
+        return directory
+
+    @classmethod
+    def load(cls, directory, mmap_mode="r"):
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode, allow_pickle=False)
+            for name in ARRAYS
+        }
+        names = meta.get("feature_names")
+        return cls(
+            **arrays,
+            n_features=meta["n_features"],
+            max_depth=meta["max_depth"],
+            feature_names=None if names is None else np.asarray(names, dtype=object),
+        )
+
+
+def compile_trees(model):
+    """FlatForest for supported tree ensembles, otherwise the model as-is."""
+    try:
+        flat = FlatForest.from_sklearn(model)
+    except Exception:
+        flat = None
+    return model if flat is None else flat
@@ -0,0 +1,283 @@
+# =====================================================
+# BINARY WIRE FORMATS (ARROW IPC / MESSAGEPACK)
+# =====================================================
+# The tabular predict and batch routes also accept
+#   application/vnd.apache.arrow.stream   Arrow IPC stream, one column per field
+#   application/msgpack                   a map of field -> values, a list of
+#                                         records, or one record
+# JSON stays the default and keeps its own FastAPI/Pydantic path. Binary
+# responses use the Accept header when it names one of these formats,
+# otherwise the request's format.
+#
+# Binary bodies skip JSON parsing and per-record Pydantic validation:
+# each input column becomes one float64 array (numeric Arrow columns are
+# zero-copy views over the request buffer), is checked against the
+# schema's field type in one vectorized pass and written once into the
+# model's feature matrix. Rows that fail carry Pydantic-style errors,
+# like the JSON batch routes.
+#
+# pyarrow and msgpack are optional; without them those content types
+# get a 415 naming the missing package.
+import numpy as np
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse, Response
+
+from metrics import InstrumentedRoute, timed_endpoint
+
+ARROW = "application/vnd.apache.arrow.stream"
+MSGPACK = "application/msgpack"
+JSON = "application/json"
+
+MEDIA_TYPES = {JSON: "json", ARROW: "arrow", MSGPACK: "msgpack", "application/x-msgpack": "msgpack"}
+FORMAT_MEDIA = {"json": JSON, "arrow": ARROW, "msgpack": MSGPACK}
+
+FLOAT32_MAX = float(np.finfo(np.float32).max)
+
+RESULT_FIELDS = ["prediction", "probability", "is_danger", "raw_model_label", "model_version"]
+
+# Extra request body content types for the OpenAPI docs
+OPENAPI_EXTRA = {
+    "requestBody": {
+        "content": {
+            ARROW: {"schema": {"type": "string", "format": "binary"}},
+            MSGPACK: {"schema": {"type": "string", "format": "binary"}},
+        }
+    }
+}
+
+
+class UnsupportedFormat(Exception):
+    pass
+
+
+class MalformedBody(ValueError):
+    pass
+
+
+def media_format(media_type):
+    """'json', 'arrow' or 'msgpack' for a Content-Type / Accept entry, else None."""
+    return MEDIA_TYPES.get((media_type or "").split(";")[0].strip().lower())
+
+
+def response_format(accept, default):
+    # First listed supported type wins; q-values are not weighed
+    for part in (accept or "").split(","):
+        fmt = media_format(part)
+        if fmt is not None:
+            return fmt
+    return default
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise UnsupportedFormat("Arrow bodies need pyarrow (pip install pyarrow)")
+    return pa
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise UnsupportedFormat("MessagePack bodies need msgpack (pip install msgpack)")
+    return msgpack
+
+
+# =====================================================
+# DECODING
+# =====================================================
+def decode_columns(body, fmt, fields):
+    """(row count, {field: values}) for every schema field."""
+    columns = _arrow_columns(body, fields) if fmt == "arrow" else _msgpack_columns(body, fields)
+    lengths = {len(values) for values in columns.values()}
+    if len(lengths) > 1:
+        raise MalformedBody("columns have different lengths")
+    return (lengths.pop() if lengths else 0), columns
+
+
+def _arrow_columns(body, fields):
+    pa = _pyarrow()
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except (pa.ArrowInvalid, OSError) as e:
+        raise MalformedBody(f"unreadable Arrow stream: {e}")
+
+    missing = [f for f in fields if f not in table.column_names]
+    if missing:
+        raise MalformedBody(f"missing columns: {missing}")
+
+    columns = {}
+    for field in fields:
+        column = table.column(field)
+        array = column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+        kind = array.type
+        if not (pa.types.is_integer(kind) or pa.types.is_floating(kind) or pa.types.is_boolean(kind)):
+            raise MalformedBody(f"column {field} must be numeric, got {kind}")
+        # Zero-copy for numeric columns without nulls; nulls come back as NaN
+        columns[field] = array.to_numpy(zero_copy_only=False)
+    return columns
+
+
+def _msgpack_columns(body, fields):
+    msgpack = _msgpack()
+    try:
+        data = msgpack.unpackb(body)
+    except Exception as e:
+        raise MalformedBody(f"unreadable MessagePack body: {e or type(e).__name__}")
+
+    if isinstance(data, list):
+        # Records: non-map entries fail validation on every field
+        return {f: [r.get(f) if isinstance(r, dict) else None for r in data] for f in fields}
+    if not isinstance(data, dict):
+        raise MalformedBody("expected a map or a list of records")
+    if any(isinstance(v, list) for v in data.values()):
+        missing = [f for f in fields if f not in data]
+        if missing:
+            raise MalformedBody(f"missing columns: {missing}")
+        if not all(isinstance(data[f], list) for f in fields):
+            raise MalformedBody("every column must be an array")
+        return {f: data[f] for f in fields}
+    return {f: [data.get(f)] for f in fields}
+
+
+def _as_float(values):
+    if isinstance(values, np.ndarray) and values.dtype.kind in "biuf":
+        return values  # cast while copying into the feature matrix
+    try:
+        # None becomes NaN here and is rejected with the non-finite values
+        out = np.asarray(values, dtype=np.float64)
+        if out.ndim == 1:
+            return out
+    except (TypeError, ValueError):
+        pass
+    out = np.full(len(values), np.nan)
+    for i, v in enumerate(values):
+        try:
+            out[i] = float(v)
+        except (TypeError, ValueError):
+            pass
+    return out
+
+
+# =====================================================
+# VALIDATION
+# =====================================================
+def validate_columns(columns, schema, n):
+    """(X, errors): the float64 feature matrix in schema field order and
+    {row: [error, ...]} for rows that fail the schema's field types."""
+    fields = schema.model_fields
+    X = np.empty((n, len(fields)), dtype=np.float64)
+    failures = []
+    for j, (name, info) in enumerate(fields.items()):
+        col = X[:, j]
+        col[:] = _as_float(columns[name])
+        bad = ~np.isfinite(col)
+        # Tree models run in float32 and reject anything beyond it
+        huge = ~bad & (np.abs(col) > FLOAT32_MAX)
+        failures.append((huge, name, "float32_range", "Input should be within the float32 range"))
+        if info.annotation is int:
+            fractional = ~bad & (col != np.floor(col))
+            failures.append((bad, name, "int_type", "Input should be a valid integer"))
+            failures.append((fractional, name, "int_from_float",
+                             "Input should be a valid integer, got a number with a fractional part"))
+        else:
+            failures.append((bad, name, "finite_number", "Input should be a finite number"))
+
+    errors = {}
+    for mask, name, kind, msg in failures:
+        for i in np.flatnonzero(mask).tolist():
+            errors.setdefault(i, []).append({"loc": [name], "msg": msg, "type": kind})
+    return X, errors
+
+
+def record_values(row, schema):
+    """One validated row as the list the JSON path's *_features() builds."""
+    return [
+        int(v) if info.annotation is int else float(v)
+        for v, info in zip(row.tolist(), schema.model_fields.values())
+    ]
+
+
+# =====================================================
+# ENCODING
+# =====================================================
+def error_text(errors):
+    return "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in errors)
+
+
+def results_table(results, metadata=None):
+    pa = _pyarrow()
+    names = (["index"] if results and "index" in results[0] else []) + RESULT_FIELDS
+    arrays = []
+    for name in names:
+        values = [r.get(name) for r in results]
+        try:
+            arrays.append(pa.array(values))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            arrays.append(pa.array([None if v is None else str(v) for v in values], pa.string()))
+    names.append("error")
+    arrays.append(pa.array([error_text(r["error"]) if "error" in r else None for r in results], pa.string()))
+    if any("explanation" in r for r in results):
+        # Contributions as a struct column, one field per input
+        names.append("explanation_base")
+        arrays.append(pa.array([r["explanation"]["base"] if "explanation" in r else None for r in results]))
+        names.append("contributions")
+        arrays.append(pa.array([r["explanation"]["contributions"] if "explanation" in r else None for r in results]))
+
+    table = pa.Table.from_arrays(arrays, names=names)
+    if metadata:
+        table = table.replace_schema_metadata({k: str(v) for k, v in metadata.items()})
+    return table
+
+
+def encode_response(payload, fmt):
+    if fmt == "json":
+        return JSONResponse(payload)
+    if fmt == "msgpack":
+        return Response(_msgpack().packb(payload), media_type=MSGPACK)
+
+    pa = _pyarrow()
+    if "results" in payload:
+        table = results_table(payload["results"], {k: v for k, v in payload.items() if k != "results"})
+    else:
+        table = results_table([payload])
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return Response(sink.getvalue().to_pybytes(), media_type=ARROW)
+
+
+# =====================================================
+# ROUTING
+# =====================================================
+def binary_body(handler):
+    """Route Arrow / MessagePack bodies for this endpoint to handler(request, fmt)."""
+    def decorate(endpoint):
+        endpoint.binary_handler = handler
+        return endpoint
+    return decorate
+
+
+class NegotiatedRoute(InstrumentedRoute):
+    # JSON (and anything unrecognized) takes the normal FastAPI path
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        binary = getattr(self.endpoint, "binary_handler", None)
+        if binary is None:
+            return handler
+        binary = timed_endpoint(binary)
+
+        async def route(request):
+            fmt = media_format(request.headers.get("content-type"))
+            if fmt in (None, "json"):
+                return await handler(request)
+            try:
+                return await binary(request, fmt)
+            except UnsupportedFormat as e:
+                raise HTTPException(415, str(e))
+            except MalformedBody as e:
+                raise HTTPException(400, str(e))
+
+        return route